@@ -17,10 +17,15 @@ import uuid
 import numpy as np
 from pathlib import Path
 from datetime import datetime
-from typing import List, Optional, Tuple, Callable, Any, Dict
+from typing import TYPE_CHECKING, List, Optional, Tuple, Callable, Any, Dict
 
 from numpy.typing import NDArray
 
+from .cancellation import CancellationToken
+
+if TYPE_CHECKING:
+    from .rst_parser import RstData
+
 import sys
 
 
@@ -529,6 +534,8 @@ class BaseAnalyzer:
         test_mode: bool = False,
         progress_callback: Optional[Callable[[float, str], None]] = None,
         info_callback: Optional[Callable[[str], None]] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        file_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
     ) -> None:
         self.rootdir: str = os.path.dirname(os.path.abspath(__file__))
         if datadir:
@@ -537,6 +544,8 @@ class BaseAnalyzer:
             self.data_path: str = os.path.join(self.rootdir, "datapath")
         self._cached_file_list: Optional[List[str]] = None
         self.lines: List[str] = []
+        # Parsed .rst text export (None until read_file() loads a .rst file)
+        self.rst_data: Optional["RstData"] = None
         self.filename: str = ""
         self.sample_name: str = ""
         self.mw_data: list = []
@@ -554,16 +563,31 @@ class BaseAnalyzer:
         # 回调
         self.progress_callback = progress_callback
         self.info_callback = info_callback
+        # 调用方置位后，运行在下一个检查点（文件之间、绘图步骤之间）抛出 AnalysisCancelled
+        self.cancel_token = cancel_token
+        # 每个输入文件处理完成时调用，参数见 report_file
+        self.file_callback = file_callback
 
         # 集成日志器和验证器
         self.logger: Logger = logger
         self.validator: DataValidator = DataValidator(self.logger)
 
+    def check_cancelled(self) -> None:
+        """已请求取消时抛出 AnalysisCancelled"""
+        if self.cancel_token is not None:
+            self.cancel_token.raise_if_cancelled()
+
+    def report_file(self, filename: str, error: str = "", **details: Any) -> None:
+        """向 file_callback 报告单个文件的处理结果（可 JSON 序列化的字典）"""
+        if self.file_callback is not None:
+            self.file_callback({"file": filename, "success": not error, "error": error or None, **details})
+
     # -- reset / clear -----------------------------------------------------
 
     def reset(self, reset_peak_data: bool = True) -> None:
         """重置所有数据属性"""
         self.lines = []
+        self.rst_data = None
         self.filename = ""
         self.sample_name = ""
         self.mw_data = []
@@ -589,18 +613,19 @@ class BaseAnalyzer:
     # -- file I/O ----------------------------------------------------------
 
     def read_file(self, name: str, reset_peak_data: bool = True) -> bool:
-        """读取数据文件（ASCII 编码，过滤空行）"""
+        """读取数据文件（.rst 为 ASCII 编码，单遍流式解析；结果经解析缓存复用）"""
         self.reset(reset_peak_data=reset_peak_data)
         self.filename = name
 
         try:
             file_path = resolve_contained_file(self.data_path, name)
-            if Path(name).suffix.lower() in {".xls", ".xlsx"}:
-                from .excel_reader import parse_gpc_excel
-                self.excel_samples = parse_gpc_excel(file_path)
-                return True
-            with open(file_path, "r", encoding="ascii") as file:
-                self.lines = [line.strip() for line in file if line.strip()]
+            from .parse_cache import cached_parse
+            kind, version, parse, encode, decode = self.input_codec(name)
+            dataset = cached_parse(kind, version, file_path, parse, encode, decode)
+            if kind == "gpc_excel":
+                self.excel_samples = dataset
+            else:
+                self.rst_data = dataset
             return True
         except FileNotFoundError:
             self.logger.error(f"文件未找到: {name}", show_ui=True)
@@ -614,6 +639,28 @@ class BaseAnalyzer:
             self.logger.error(f"读取文件失败 {name}", show_ui=True, exception=e)
             return False
 
+    @staticmethod
+    def input_codec(name: str) -> Tuple[str, int, Callable, Callable, Callable]:
+        """返回输入文件的解析缓存参数 ``(kind, version, parse, encode, decode)``"""
+        if Path(name).suffix.lower() in {".xls", ".xlsx"}:
+            from .excel_reader import (
+                EXCEL_PARSER_VERSION,
+                decode_gpc_excel,
+                encode_gpc_excel,
+                parse_gpc_excel,
+            )
+            return (
+                "gpc_excel", EXCEL_PARSER_VERSION,
+                parse_gpc_excel, encode_gpc_excel, decode_gpc_excel,
+            )
+        from .rst_parser import (
+            RST_PARSER_VERSION,
+            decode_rst_data,
+            encode_rst_data,
+            parse_rst_file,
+        )
+        return "rst", RST_PARSER_VERSION, parse_rst_file, encode_rst_data, decode_rst_data
+
     def read_file_list(self, force_refresh: bool = False) -> List[str]:
         """读取数据目录中的 GPC 数据文件列表（.rst/.xls/.xlsx，带缓存）"""
         if self._cached_file_list is None or force_refresh:
@@ -660,25 +707,16 @@ class BaseAnalyzer:
         Returns:
             (mw_start, mw_end, slice_table_start)
         """
-        mw_start = 0
-        mw_end = 0
-        slice_table_start = 0
-
-        if not self.validator.validate_data_lines(self.lines):
+        data = self.rst_data
+        if data is None or data.line_count == 0:
+            self.logger.error("数据文件为空，无法处理")
             raise ValueError("数据文件为空，无法处理")
 
-        for pos, line in enumerate(self.lines):
-            if "Sample Name" in line:
-                parts = line.split("\t")
-                if len(parts) > 1:
-                    self.sample_name = parts[1]
-            elif "<MW_Averages>" in line:
-                mw_start = pos
-            elif "</MW_Averages>" in line:
-                mw_end = pos
-            elif "<Slice_Table>" in line:
-                slice_table_start = pos
-                break
+        if data.sample_name:
+            self.sample_name = data.sample_name
+        mw_start = data.mw_start
+        mw_end = data.mw_end
+        slice_table_start = data.slice_table_start
 
         if not self.validator.validate_markers(mw_start, mw_end, slice_table_start):
             raise ValueError("数据文件格式错误")
@@ -0,0 +1,32 @@
+"""Cooperative cancellation for long analyzer runs."""
+
+from __future__ import annotations
+
+import threading
+
+
+class AnalysisCancelled(Exception):
+    """Raised inside an analyzer run once its cancellation token is set."""
+
+
+class CancellationToken:
+    """Thread-safe flag a caller sets to ask a running analysis to stop.
+
+    Analyzers poll it between files and render steps (``raise_if_cancelled``),
+    so a cancelled run stops at the next checkpoint and unwinds through its
+    normal cleanup: staging directories are removed, worker pools shut down.
+    """
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise AnalysisCancelled("Analysis cancelled")
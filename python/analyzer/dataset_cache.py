@@ -0,0 +1,122 @@
+"""
+Process-wide in-memory LRU of parsed datasets.
+
+The long-lived JSON-RPC sidecar turns it on (see ``api.serve``) so repeated
+analyses of unchanged inputs skip both parsing and the on-disk parse cache.
+Entries are keyed by parser kind/version and the file identity
+``(st_dev, st_ino, st_size, st_mtime_ns)``; least-recently-used datasets are
+evicted once their estimated size exceeds the byte budget. The budget is 0
+(disabled) until configured, so one-shot CLI runs never hold parsed data.
+
+Cached arrays are marked read-only because every caller shares them.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+DEFAULT_DATASET_CACHE_MB: int = 256
+
+FileIdentity = Tuple[int, int, int, int]
+
+
+def file_identity(path: str) -> FileIdentity:
+    """Return ``(st_dev, st_ino, st_size, st_mtime_ns)`` for ``path``."""
+    st = os.stat(path)
+    return st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns
+
+
+def dataset_cache_budget_from_env() -> int:
+    """Byte budget from ``POLYANALYZER_DATASET_CACHE_MB`` (default 256 MB)."""
+    raw = os.environ.get("POLYANALYZER_DATASET_CACHE_MB")
+    try:
+        megabytes = int(raw) if raw else DEFAULT_DATASET_CACHE_MB
+    except ValueError:
+        megabytes = DEFAULT_DATASET_CACHE_MB
+    return max(0, megabytes) * 1024 * 1024
+
+
+class DatasetCache:
+    """Thread-safe LRU mapping of cache keys to parsed datasets."""
+
+    def __init__(self, max_bytes: int = 0) -> None:
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self.max_bytes = max(0, int(max_bytes))
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def configure(self, max_bytes: int) -> None:
+        """Change the byte budget, evicting entries that no longer fit."""
+        with self._lock:
+            self.max_bytes = max(0, int(max_bytes))
+            self._evict_locked()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any, size: int) -> None:
+        """Store ``value`` (estimated ``size`` bytes); oversized values are skipped."""
+        with self._lock:
+            if size > self.max_bytes:
+                return
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            self._evict_locked()
+
+    def contains_file(self, path: str) -> bool:
+        """True when any dataset parsed from ``path``'s current content is cached."""
+        try:
+            identity = file_identity(path)
+        except OSError:
+            return False
+        with self._lock:
+            return any(key[2:] == identity for key in self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _evict_locked(self) -> None:
+        while self._entries and self._bytes > self.max_bytes:
+            _key, (_value, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+
+
+_DATASET_CACHE = DatasetCache()
+
+
+def get_dataset_cache() -> DatasetCache:
+    """Return the process-wide dataset cache."""
+    return _DATASET_CACHE
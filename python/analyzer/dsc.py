@@ -5,16 +5,23 @@ Extracted from the monolithic main.py for the v2 refactoring.
 All Streamlit dependencies have been removed; UI feedback is handled via callbacks.
 """
 
+import codecs
 import os
 import re
 import glob
 import shutil
 import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from itertools import compress, islice, repeat
+from operator import contains, methodcaller
 import numpy as np
-import chardet
 import matplotlib.pyplot as plt
 
-from typing import List, Optional, Tuple, Callable, Dict, Any
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
 
 from .base import (
     BaseAnalyzer,
@@ -31,10 +38,584 @@ from .base import (
     resolve_contained_file,
 )
 
+from .cancellation import AnalysisCancelled, CancellationToken
+from .dataset_cache import FileIdentity, file_identity
+from .parallel import resolve_parse_workers, run_ordered
+from .parse_cache import cached_parse
+from .plotting import FigureTemplate, FigureTemplates, configure_plotting, decimate_line
+
 # Color palette for cycle overlay plots — shared with the GPC analyzer.
 from .cnames import clist as _COLOR_LIST
 
 
+# Bump when parsing behaviour changes so stale parse-cache entries are ignored
+DSC_PARSER_VERSION = 3
+
+# 分段数据的导出格式：文本 CSV、可内存映射的 .npy，或两者都写
+SEGMENT_FORMATS: Tuple[str, ...] = ("csv", "npy", "both")
+
+# 工作进程需要复制的分析器属性（运行模式、裁剪长度、绘图样式与暂存目录）
+_WORKER_ATTRIBUTES: Tuple[str, ...] = (
+    "test_mode",
+    "save_seg_mode",
+    "segment_format",
+    "draw_seg_mode",
+    "peaks_upward",
+    "center_peak",
+    "left_length",
+    "right_length",
+    "curve_color",
+    "transparent_back",
+    "line_width",
+    "axis_width",
+    "title_font_size",
+    "axis_font_size",
+    "cycle_dir",
+    "pic_dir",
+)
+
+# 决定切片图模板外观的属性；变化时重建模板
+_CYCLE_STYLE_ATTRIBUTES: Tuple[str, ...] = (
+    "curve_color",
+    "transparent_back",
+    "line_width",
+    "axis_width",
+    "axis_font_size",
+)
+
+# 工作进程内的分析器实例（由 _init_dsc_worker 在每个子进程中创建一次）
+_DSC_WORKER: Optional["DSCAnalyzer"] = None
+
+
+@dataclass
+class DscParseResult:
+    """Length-independent content of one DSC export.
+
+    ``boundaries`` holds ``(start_time, end_time, isothermal)`` per cycle; the
+    analyzer turns it into ``[start + left_length, end - right_length -
+    isothermal]`` regions, so trimming changes never require a re-parse.
+    """
+
+    heads: Dict[int, str] = field(default_factory=dict)
+    method: Dict[int, Tuple[float, float, float, float]] = field(default_factory=dict)
+    cycle: List[List[int]] = field(default_factory=list)
+    data: Optional[np.ndarray] = None
+    data_error: str = ""
+    boundaries: List[Tuple[float, float, float]] = field(default_factory=list)
+    peak: List[List[str]] = field(default_factory=list)
+
+
+# 编码探测只读取文件开头的这部分字节
+ENCODING_SNIFF_BYTES = 64 * 1024
+# 按文件标识缓存探测结果的条目上限
+_ENCODING_MEMO_SIZE = 256
+
+_BOMS: Tuple[Tuple[bytes, str], ...] = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+_encoding_memo: "OrderedDict[FileIdentity, str]" = OrderedDict()
+_encoding_memo_lock = threading.Lock()
+
+
+def sniff_encoding(prefix: bytes) -> str:
+    """Guess the text encoding of a DSC export from its first bytes.
+
+    Checks, in order: a BOM, the NUL-byte pattern of BOM-less UTF-16, strict
+    UTF-8 (a multi-byte sequence cut off at the end of the prefix is allowed),
+    and only then ``chardet`` on the prefix.
+    """
+    for bom, encoding in _BOMS:
+        if prefix.startswith(bom):
+            return encoding
+
+    # 无 BOM 的 UTF-16：ASCII 字符的高位字节为 0，集中在偶数或奇数位置
+    sample = prefix[: len(prefix) & ~1]
+    if sample:
+        even_nuls = sample[0::2].count(0)
+        odd_nuls = sample[1::2].count(0)
+        half = len(sample) // 2
+        if odd_nuls > half * 0.4 and even_nuls < half * 0.1:
+            return "utf-16-le"
+        if even_nuls > half * 0.4 and odd_nuls < half * 0.1:
+            return "utf-16-be"
+
+    if b"\x00" not in prefix:
+        try:
+            codecs.getincrementaldecoder("utf-8")().decode(prefix, final=False)
+            return "utf-8"
+        except UnicodeDecodeError:
+            pass
+
+    import chardet
+
+    result = chardet.detect(prefix)
+    encoding = result["encoding"]
+    # 如果置信度太低，或者检测失败，回退到 utf-8
+    if not encoding or result["confidence"] < 0.5:
+        encoding = "utf-8"
+    return encoding
+
+
+def detect_dsc_encoding(file_path: str) -> str:
+    """Return the encoding of ``file_path``, memoized per file identity."""
+    identity = file_identity(file_path)
+    with _encoding_memo_lock:
+        encoding = _encoding_memo.get(identity)
+        if encoding is not None:
+            _encoding_memo.move_to_end(identity)
+            return encoding
+
+    with open(file_path, "rb") as f:
+        encoding = sniff_encoding(f.read(ENCODING_SNIFF_BYTES))
+
+    with _encoding_memo_lock:
+        _encoding_memo[identity] = encoding
+        while len(_encoding_memo) > _ENCODING_MEMO_SIZE:
+            _encoding_memo.popitem(last=False)
+    return encoding
+
+
+def read_dsc_lines(file_path: str) -> List[str]:
+    """读取 DSC 导出文件 (自动检测编码)，返回去除空行后的行列表"""
+    with open_dsc_text(file_path) as file:
+        return [line.strip() for line in file if line.strip()]
+
+
+def open_dsc_text(file_path: str) -> TextIO:
+    """以探测到的编码打开 DSC 导出文件，返回逐行读取的文本流"""
+    encoding = detect_dsc_encoding(file_path)
+    logger.debug(f"文件 {os.path.basename(file_path)} 检测到的编码: {encoding}")
+    return open(file_path, "r", encoding=encoding, errors="replace")
+
+
+# 数据段每次解析的行数；内存中同时存在的文本不超过这么多行
+DATA_CHUNK_LINES = 65536
+# 数据段开头保留的行数，供落在 StartOfData 之后的 Peak 行查找使用
+_DATA_HEAD_LINES = 64
+
+
+def _classify_data_lines(data_lines: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Return boolean masks of cycle separator rows (``-2...``) and of data rows.
+
+    Data rows are the non-separator lines with at least two tab-separated
+    fields. Both masks are built with C-level ``map`` calls instead of
+    splitting every line in Python.
+    """
+    count = len(data_lines)
+    is_separator = np.fromiter(
+        map(methodcaller("startswith", "-2"), data_lines), dtype=bool, count=count
+    )
+    has_tab = np.fromiter(
+        map(contains, data_lines, repeat("\t")), dtype=bool, count=count
+    )
+    return is_separator, has_tab & ~is_separator
+
+
+def _load_data_rows(data_lines: List[str], is_row: np.ndarray) -> np.ndarray:
+    """Parse the selected data rows into one float32 table in a single call.
+
+    Raises ``ValueError`` for non-numeric fields or ragged rows, like the
+    former ``np.array(rows, dtype="float32")`` conversion.
+    """
+    if not is_row.any():
+        return np.array([], dtype="float32")
+    return np.loadtxt(
+        compress(data_lines, is_row),
+        delimiter="\t",
+        dtype=np.float32,
+        comments=None,
+        ndmin=2,
+    )
+
+
+def _first_field(line: str) -> str:
+    return line.split("\t")[0]
+
+
+@dataclass
+class _DataBlock:
+    """Result of streaming the lines after ``StartOfData``.
+
+    ``separators`` holds, per cycle separator, the first field of the last
+    data row before it (``None`` if there was none) and the line right after
+    it (``None`` at end of input).
+    """
+
+    data: Optional[np.ndarray] = None
+    error: str = ""
+    first_line: Optional[str] = None
+    head: List[str] = field(default_factory=list)
+    separators: List[List[Optional[str]]] = field(default_factory=list)
+    last_row_field: Optional[str] = None
+
+
+def _read_data_block(lines: Iterator[str], chunk_lines: int) -> _DataBlock:
+    """Stream the data section chunk by chunk into a single float32 array.
+
+    Only ``chunk_lines`` lines of text are held at a time; the parsed chunks
+    are copied into one preallocated array at the end, so the peak memory is
+    roughly one copy of the table plus one chunk.
+    """
+    block = _DataBlock()
+    chunks: List[np.ndarray] = []
+    columns: Optional[int] = None
+    row_count = 0
+    waiting_for_next = False
+
+    for chunk in iter(lambda: list(islice(lines, chunk_lines)), []):
+        if block.first_line is None:
+            block.first_line = chunk[0]
+        if len(block.head) < _DATA_HEAD_LINES:
+            block.head.extend(chunk[:_DATA_HEAD_LINES - len(block.head)])
+        if waiting_for_next:
+            block.separators[-1][1] = chunk[0]
+
+        is_separator, is_row = _classify_data_lines(chunk)
+        row_positions = np.flatnonzero(is_row)
+        separator_positions = np.flatnonzero(is_separator).tolist()
+        # 分隔行只有每个 cycle 一行，逐个记录即可
+        for pos in separator_positions:
+            last_row = int(np.searchsorted(row_positions, pos)) - 1
+            end_field = (
+                _first_field(chunk[row_positions[last_row]])
+                if last_row >= 0
+                else block.last_row_field
+            )
+            next_line = chunk[pos + 1] if pos + 1 < len(chunk) else None
+            block.separators.append([end_field, next_line])
+        waiting_for_next = bool(separator_positions) and separator_positions[-1] == len(chunk) - 1
+        if row_positions.size:
+            block.last_row_field = _first_field(chunk[row_positions[-1]])
+
+        if block.error:
+            continue
+        try:
+            rows = _load_data_rows(chunk, is_row)
+        except ValueError as e:
+            block.error = str(e)
+            chunks = []
+            continue
+        if rows.ndim != 2:
+            continue
+        if columns is not None and rows.shape[1] != columns:
+            block.error = (
+                f"the number of columns changed from {columns} to {rows.shape[1]} "
+                f"at row {row_count + 1}"
+            )
+            chunks = []
+            continue
+        columns = rows.shape[1]
+        row_count += rows.shape[0]
+        chunks.append(rows)
+
+    if block.error:
+        return block
+    if not chunks:
+        block.data = np.array([], dtype="float32")
+    elif len(chunks) == 1:
+        block.data = chunks[0]
+    else:
+        block.data = np.empty((row_count, columns), dtype=np.float32)
+        offset = 0
+        # 逐块拷贝并释放，避免 np.concatenate 期间同时持有两份完整数据
+        chunks.reverse()
+        while chunks:
+            rows = chunks.pop()
+            block.data[offset:offset + rows.shape[0]] = rows
+            offset += rows.shape[0]
+    return block
+
+
+def parse_dsc_lines(lines: List[str]) -> DscParseResult:
+    """解析表头、方法段与数据表 (与裁剪长度无关的部分)"""
+    return parse_dsc_stream(lines)
+
+
+def parse_dsc_stream(
+    lines: Iterable[str], chunk_lines: int = DATA_CHUNK_LINES
+) -> DscParseResult:
+    """逐行解析 DSC 导出内容：表头逐行扫描，数据段分块直接转为 float32 数组。
+
+    ``lines`` 可以是打开的文本文件；空行与首尾空白会被忽略，整份文本不会驻留内存。
+    """
+    parsed = DscParseResult()
+    peak_pos: int = 0
+    org_method: List[str] = []
+    header: List[str] = []
+    stripped = filter(None, map(str.strip, lines))
+    found_data = False
+
+    # 找到表头
+    for pos, line in enumerate(stripped):
+        header.append(line)
+        if "Peak" in line:
+            peak_pos = pos + 3
+        if "Sig" in line:
+            l = line.split()
+            if len(l) > 1:
+                title = " ".join(l[1:-1])
+                unit = l[-1]
+                try:
+                    idx = int(l[0][3:])
+                    parsed.heads[idx] = title + "/" + unit
+                except ValueError:
+                    pass
+        if "OrgMethod" in line:
+            parts = line.split(":")
+            if len(parts) > 1:
+                org_method.append(parts[1])
+        if "StartOfData" in line:
+            found_data = True
+            break
+
+    # 没有 StartOfData 时沿用旧行为：第一行之后全部视为数据
+    block = _read_data_block(
+        stripped if found_data else iter(header[1:]), chunk_lines
+    )
+
+    # 优化正则：只匹配数字
+    re_float = re.compile(r"(-?\d+\.\d+)")
+    end: float = 0.0
+    cycle: List[int] = []
+    start: float = 0.0
+
+    # 记录每个 cycle 的结束时间（累积）
+    accumulated_time: float = 0.0
+    cycle_end_times: List[float] = []
+
+    # 分类方法
+    for item, m in enumerate(org_method):
+        grad: float = 0.0
+        t: float = 0.0
+
+        # 提取行中所有浮点数
+        nums = [float(n) for n in re.findall(re_float, m)]
+
+        if "Equilibrate" in m:
+            start = end
+            if nums:
+                end = nums[0]
+            parsed.cycle.append([item])
+        elif "Ramp" in m:
+            start = end
+            if len(nums) >= 2:
+                grad = nums[0]
+                end = nums[1]
+            elif len(nums) == 1:
+                end = nums[0]
+
+            if start > end:
+                grad = -abs(grad)
+            else:
+                grad = abs(grad)
+
+            if grad != 0:
+                t = abs(end - start) / abs(grad)
+
+            cycle.append(item)
+            accumulated_time += t
+        elif "Isothermal" in m:
+            start = end
+            if nums:
+                t = nums[0]
+            cycle.append(item)
+            accumulated_time += t
+        elif "Mark" in m:
+            cycle.append(item)
+            parsed.cycle.append(cycle)
+            cycle = []
+            start = end
+            cycle_end_times.append(accumulated_time)
+
+        # 记录方法
+        parsed.method[item] = (start, end, grad, t)
+
+    start_time = 0.0
+    if block.first_line is not None:
+        try:
+            start_time = float(_first_field(block.first_line))
+            if 1 in parsed.method:
+                start_time += parsed.method[1][3]
+        except (ValueError, IndexError):
+            start_time = 0.0
+
+    # 由分隔行记录推出各 cycle 的边界 (按原文本解析，保持 float64 精度)
+    current_start_time: float = start_time
+    count_cycle: int = 3
+    for end_field, next_line in block.separators:
+        try:
+            if end_field is not None:
+                end_time = float(end_field)
+            else:
+                end_time = current_start_time
+
+            isothermal = 0.0
+            if count_cycle in parsed.method:
+                isothermal = parsed.method[count_cycle][3]
+
+            parsed.boundaries.append((current_start_time, end_time, isothermal))
+
+            if next_line is not None:
+                current_start_time = float(_first_field(next_line))
+
+            count_cycle += 3
+        except (ValueError, IndexError):
+            pass
+
+    # 处理最后一个区域
+    if block.last_row_field is not None:
+        try:
+            last_time = float(block.last_row_field)
+            parsed.boundaries.append((current_start_time, last_time, 0.0))
+        except (ValueError, IndexError):
+            pass
+
+    if peak_pos != 0:
+        peak_lines = header + block.head if found_data else header
+        for i in range(len(parsed.boundaries) - 1):
+            if peak_pos + i < len(peak_lines):
+                parsed.peak.append(
+                    list(filter(None, peak_lines[peak_pos + i].split(" ")))
+                )
+
+    parsed.data = block.data
+    parsed.data_error = block.error
+    return parsed
+
+
+def _region_row_bounds(
+    time: np.ndarray, regions: List[List[float]]
+) -> Optional[List[Tuple[int, int]]]:
+    """Row ranges ``[lo, hi)`` holding ``left < time < right`` for every region.
+
+    Uses one ``np.searchsorted`` per side for all regions. Returns ``None``
+    when the time column is not non-decreasing (or contains NaN), in which
+    case the caller falls back to boolean masks.
+    """
+    if not regions:
+        return []
+    if time.size > 1 and not np.all(time[1:] >= time[:-1]):
+        return None
+    edges = np.asarray(regions, dtype=time.dtype)
+    lo = np.searchsorted(time, edges[:, 0], side="right")
+    hi = np.maximum(np.searchsorted(time, edges[:, 1], side="left"), lo)
+    return list(zip(lo.tolist(), hi.tolist()))
+
+
+def parse_dsc_file(file_path: str) -> DscParseResult:
+    """读取并解析一个 DSC 导出文件 (流式读取，不保留全文行列表)"""
+    with open_dsc_text(file_path) as file:
+        return parse_dsc_stream(file)
+
+
+def encode_dsc_parse(
+    parsed: DscParseResult,
+) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+    """Split a :class:`DscParseResult` into arrays and JSON metadata for the parse cache."""
+    arrays: Dict[str, np.ndarray] = {}
+    if parsed.data is not None:
+        arrays["data"] = parsed.data
+    meta = {
+        "heads": [[idx, head] for idx, head in parsed.heads.items()],
+        "method": [[item, list(values)] for item, values in parsed.method.items()],
+        "cycle": parsed.cycle,
+        "data_error": parsed.data_error,
+        "boundaries": [list(bound) for bound in parsed.boundaries],
+        "peak": parsed.peak,
+    }
+    return arrays, meta
+
+
+def decode_dsc_parse(
+    payload: Tuple[Dict[str, np.ndarray], Dict[str, Any]],
+) -> DscParseResult:
+    """Inverse of :func:`encode_dsc_parse`."""
+    arrays, meta = payload
+    return DscParseResult(
+        heads={int(idx): head for idx, head in meta["heads"]},
+        method={int(item): tuple(values) for item, values in meta["method"]},
+        cycle=meta["cycle"],
+        data=arrays.get("data"),
+        data_error=meta["data_error"],
+        boundaries=[tuple(bound) for bound in meta["boundaries"]],
+        peak=meta["peak"],
+    )
+
+
+def segment_files(cycle_path: str) -> List[Tuple[str, str]]:
+    """List ``(sample name, path)`` of the segments saved in one ``CycleN`` directory.
+
+    A sample saved in both formats is listed once, preferring the ``.npy`` file.
+    """
+    files: Dict[str, str] = {}
+    for extension in (".csv", ".npy"):
+        for path in sorted(glob.glob(os.path.join(cycle_path, "*" + extension))):
+            if os.path.isfile(path):
+                files[os.path.splitext(os.path.basename(path))[0]] = path
+    return sorted(files.items())
+
+
+def load_segment(path: str) -> np.ndarray:
+    """Load one saved ``(N, 2)`` temperature/heat-flow segment.
+
+    ``.npy`` files are memory-mapped read-only (no parsing); CSV files are
+    parsed as float64.
+    """
+    if path.lower().endswith(".npy"):
+        return np.load(path, mmap_mode="r")
+    return np.loadtxt(path, delimiter=",")
+
+
+@dataclass
+class DscFileResult:
+    """单个 DSC 文件在工作进程中的处理结果（可跨进程传递）。
+
+    ``cycle_segments`` 为 ``{循环序号: (N, 2) 温度/热流}``，由父进程按文件顺序汇总后绘制叠加图。
+    """
+
+    filename: str
+    processed: bool = False
+    error: str = ""
+    cycle_segments: Dict[int, np.ndarray] = field(default_factory=dict)
+
+
+def _init_dsc_worker(data_path: str, state: Dict[str, Any]) -> None:
+    """Process-pool initializer: build one configured DSC analyzer per worker."""
+    global _DSC_WORKER
+    configure_plotting()
+    worker = DSCAnalyzer(data_path)
+    vars(worker).update(state)
+    _DSC_WORKER = worker
+
+
+def process_dsc_file(filename: str) -> DscFileResult:
+    """Read, preprocess, save and draw one DSC file in a worker process.
+
+    Failures are reported through ``DscFileResult.error`` instead of raising.
+    """
+    worker = _DSC_WORKER
+    if worker is None:
+        raise RuntimeError("DSC worker is not initialized")
+    result = DscFileResult(filename=filename)
+    worker.cycle_segments = {}
+    try:
+        result.processed = worker._process_file(filename)
+    except Exception as e:
+        result.error = str(e) or type(e).__name__
+    # 与串行模式一致：出错前已保存的循环仍参与叠加图
+    name = os.path.splitext(filename)[0]
+    result.cycle_segments = {
+        index: segments[name]
+        for index, segments in worker.cycle_segments.items()
+        if name in segments
+    }
+    worker.cycle_segments = {}
+    return result
+
+
 class DSCAnalyzer(BaseAnalyzer):
     """DSC分析器 - 处理DSC数据"""
 
@@ -57,11 +638,20 @@ class DSCAnalyzer(BaseAnalyzer):
         title_font_size: Optional[int] = None,
         axis_font_size: Optional[int] = None,
         transparent_back: Optional[bool] = None,
+        jobs: Optional[int] = None,
+        segment_format: str = "csv",
         progress_callback: Optional[Callable[[float, str], None]] = None,
         info_callback: Optional[Callable[[str], None]] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        file_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
     ) -> None:
         """初始化DSC分析器"""
-        super().__init__(datadir, progress_callback=progress_callback)
+        super().__init__(
+            datadir,
+            progress_callback=progress_callback,
+            cancel_token=cancel_token,
+            file_callback=file_callback,
+        )
 
         self.cycle_dir: str = os.path.join(os.path.dirname(self.data_path), "DSC_Cycle")
         self.pic_dir: str = os.path.join(os.path.dirname(self.data_path), "DSC_Pic")
@@ -74,16 +664,30 @@ class DSCAnalyzer(BaseAnalyzer):
         self.region: List[List[float]] = []
         self.peak: List[List[str]] = []
         self.data: Optional[np.ndarray] = None
+        self.parsed: Optional[DscParseResult] = None
         self.selected_file: Optional[List[str]] = None
 
+        # 本次运行产生的各循环数据 {循环序号: {样品名: (N, 2) 温度/热流}}，供叠加图直接使用
+        self.cycle_segments: Dict[int, Dict[str, np.ndarray]] = {}
+        # 运行期间分段导出交给后台线程，与绘图并行
+        self._export_executor: Optional[ThreadPoolExecutor] = None
+        self._export_pending: List[Tuple[str, Future]] = []
+        # 按样式缓存的切片图模板，批量绘图时逐段只替换数据
+        self._templates = FigureTemplates()
+
         # 运行模式设置
         self.test_mode: bool = test_mode
         self.save_seg_mode: bool = save_seg_mode
+        if segment_format not in SEGMENT_FORMATS:
+            raise ValueError(f"不支持的分段数据格式: {segment_format}")
+        self.segment_format: str = segment_format
         self.draw_seg_mode: bool = draw_seg_mode
         self.draw_cycle: bool = draw_cycle
         self.save_cycle_pic: bool = save_cycle_pic
         self.peaks_upward: bool = peaks_upward
         self.center_peak: bool = center_peak
+        # 处理进程数：None/0 表示按 CPU 核数自动选择，1 表示在当前进程串行处理
+        self.jobs: Optional[int] = jobs
 
         # 参数设置
         self.left_length: float = left_length
@@ -162,6 +766,7 @@ class DSCAnalyzer(BaseAnalyzer):
         self.region = []
         self.peak = []
         self.data = None
+        self.parsed = None
 
     def clear_dir(self) -> None:  # type: ignore[override]
         """清空输出目录"""
@@ -192,30 +797,16 @@ class DSCAnalyzer(BaseAnalyzer):
     # -- file I/O ----------------------------------------------------------
 
     def read_file(self, name: str, reset_peak_data: bool = True) -> bool:
-        """读取数据文件 (自动检测编码)"""
+        """读取并解析数据文件 (自动检测编码；结果经解析缓存复用)"""
         self.reset()
         self.filename = name
 
         try:
             file_path = resolve_contained_file(self.data_path, name)
-            # 检测编码
-            with open(file_path, "rb") as f:
-                raw_data = f.read()
-                result = chardet.detect(raw_data)
-                encoding = result["encoding"]
-                # 如果置信度太低，或者检测失败，回退到 utf-16 (常见于 DSC) 或 utf-8
-                if not encoding or result["confidence"] < 0.5:
-                    if raw_data.startswith(b"\xff\xfe") or raw_data.startswith(
-                        b"\xfe\xff"
-                    ):
-                        encoding = "utf-16"
-                    else:
-                        encoding = "utf-8"
-
-            self.logger.debug(f"文件 {name} 检测到的编码: {encoding}")
-
-            with open(file_path, "r", encoding=encoding, errors="replace") as file:
-                self.lines = [line.strip() for line in file if line.strip()]
+            self.parsed = cached_parse(
+                "dsc", DSC_PARSER_VERSION, file_path,
+                parse_dsc_file, encode_dsc_parse, decode_dsc_parse,
+            )
             return True
         except Exception as e:
             self.logger.error(f"读取文件失败 {name}", show_ui=True, exception=e)
@@ -244,212 +835,129 @@ class DSCAnalyzer(BaseAnalyzer):
     # -- preprocessing -----------------------------------------------------
 
     def preprocess(self) -> None:
-        """预处理数据"""
-        table_pos: int = 0
-        peak_pos: int = 0
-        org_method: List[str] = []
-
-        # 找到表头
-        for pos, line in enumerate(self.lines):
-            if "Peak" in line:
-                peak_pos = pos + 3
-            if "Sig" in line:
-                l = line.split()
-                if len(l) > 1:
-                    title = " ".join(l[1:-1])
-                    unit = l[-1]
-                    try:
-                        idx = int(l[0][3:])
-                        self.heads[idx] = title + "/" + unit
-                    except ValueError:
-                        pass
-            if "OrgMethod" in line:
-                parts = line.split(":")
-                if len(parts) > 1:
-                    org_method.append(parts[1])
-            if "StartOfData" in line:
-                table_pos = pos
-                break
-
-        # 优化正则：只匹配数字
-        re_float = re.compile(r"(-?\d+\.\d+)")
-
-        end: float = 0.0
-        cycle: List[int] = []
-        start: float = 0.0
-
-        # 记录每个 cycle 的结束时间（累积）
-        accumulated_time: float = 0.0
-        cycle_end_times: List[float] = []
-
-        # 分类方法
-        for item, m in enumerate(org_method):
-            grad: float = 0.0
-            t: float = 0.0
-
-            # 提取行中所有浮点数
-            nums = [float(n) for n in re.findall(re_float, m)]
-
-            if "Equilibrate" in m:
-                start = end
-                if nums:
-                    end = nums[0]
-                self.cycle.append([item])
-            elif "Ramp" in m:
-                start = end
-                if len(nums) >= 2:
-                    grad = nums[0]
-                    end = nums[1]
-                elif len(nums) == 1:
-                    end = nums[0]
-
-                if start > end:
-                    grad = -abs(grad)
-                else:
-                    grad = abs(grad)
-
-                if grad != 0:
-                    t = abs(end - start) / abs(grad)
-
-                cycle.append(item)
-                accumulated_time += t
-            elif "Isothermal" in m:
-                start = end
-                if nums:
-                    t = nums[0]
-                cycle.append(item)
-                accumulated_time += t
-            elif "Mark" in m:
-                cycle.append(item)
-                self.cycle.append(cycle)
-                cycle = []
-                start = end
-                cycle_end_times.append(accumulated_time)
-
-            # 记录方法
-            self.method[item] = (start, end, grad, t)
-
-        if table_pos + 1 < len(self.lines):
-            try:
-                start_time = float(self.lines[table_pos + 1].split("\t")[0])
-                if 1 in self.method:
-                    start_time += self.method[1][3]
-            except (ValueError, IndexError):
-                start_time = 0.0
-        else:
-            start_time = 0.0
-
-        # 整理数据格式
-        table: List[List[str]] = []
-        current_start_time: float = start_time
-        count_cycle: int = 3
-
-        data_lines = self.lines[table_pos + 1 :]
-
-        for pos, line in enumerate(data_lines):
-            l = line.split("\t")
-            is_separator = False
-            if l and len(l) > 0:
-                val_str = l[0].strip()
-                if val_str.startswith("-2"):
-                    is_separator = True
-
-            if is_separator:
-                try:
-                    if table:
-                        end_time = float(table[-1][0])
-                    else:
-                        end_time = current_start_time
-
-                    left_side = current_start_time + self.left_length
-                    right_side = end_time - self.right_length
-                    if count_cycle in self.method:
-                        right_side -= self.method[count_cycle][3]
-
-                    self.region.append([left_side, right_side])
-
-                    if pos + 1 < len(data_lines):
-                        next_line = data_lines[pos + 1]
-                        next_l = next_line.split("\t")
-                        if next_l and len(next_l) > 0:
-                            current_start_time = float(next_l[0])
-
-                    count_cycle += 3
-                except (ValueError, IndexError):
-                    pass
-                continue
+        """按左右裁剪长度切分各循环数据"""
+        parsed = self.parsed
+        if parsed is None:
+            raise ValueError("数据文件为空，无法处理")
+
+        self.heads = dict(parsed.heads)
+        self.method = dict(parsed.method)
+        self.cycle = [list(item) for item in parsed.cycle]
+        self.peak = [list(item) for item in parsed.peak]
+        self.data = parsed.data
+
+        for start_time, end_time, isothermal in parsed.boundaries:
+            left_side = start_time + self.left_length
+            right_side = end_time - self.right_length
+            right_side -= isothermal
+            self.region.append([left_side, right_side])
+
+        if parsed.data_error:
+            self.logger.error(f"数据转换失败: {parsed.data_error}")
+            return
 
-            # 只有非分隔符行才加入 table
-            if len(l) >= 2:
-                table.append(l)
+        if self.data is None or self.data.size == 0 or self.data.shape[1] == 0:
+            return
 
-        # 处理最后一个区域
-        if table:
-            try:
-                last_time = float(table[-1][0])
-                left_side = current_start_time + self.left_length
-                right_side = last_time - self.right_length
-                self.region.append([left_side, right_side])
-            except (ValueError, IndexError):
-                pass
-
-        if peak_pos != 0:
-            for i in range(len(self.region) - 1):
-                if peak_pos + i < len(self.lines):
-                    self.peak.append(
-                        list(filter(None, self.lines[peak_pos + i].split(" ")))
-                    )
+        time = np.ascontiguousarray(self.data[:, 0])
+        bounds = _region_row_bounds(time, self.region)
+        if bounds is not None:
+            # 时间列单调递增：每个区域对应一段连续行，切片为零拷贝视图
+            self.data_seg.extend(self.data[lo:hi] for lo, hi in bounds)
+            return
 
-        try:
-            valid_table = [row for row in table if len(row) >= 2]
-            self.data = np.array(valid_table, dtype="float32")
-
-            for region in self.region:
-                left_side, right_side = region
-                if self.data.size > 0 and self.data.shape[1] > 0:
-                    segment = self.data[
-                        np.where(
-                            (self.data[:, 0] > left_side)
-                            & (self.data[:, 0] < right_side)
-                        )
-                    ]
-                    self.data_seg.append(segment)
-        except ValueError as e:
-            self.logger.error(f"数据转换失败: {e}")
+        for left_side, right_side in self.region:
+            self.data_seg.append(
+                self.data[(time > left_side) & (time < right_side)]
+            )
 
     # -- data export -------------------------------------------------------
 
     def save_data_seg(self) -> None:
-        """保存切片数据"""
+        """保存切片数据 (同时登记到 cycle_segments 供叠加图使用)"""
+        name = os.path.splitext(self.filename)[0]
         for i in range(len(self.region)):
             cycle_path = os.path.join(self.cycle_dir, f"Cycle{i + 1}")
             if not os.path.exists(cycle_path):
                 os.makedirs(cycle_path, exist_ok=True)
 
-            filename = os.path.join(
-                cycle_path, os.path.splitext(self.filename)[0] + ".csv"
-            )
             if i < len(self.data_seg):
-                try:
-                    np.savetxt(filename, self.data_seg[i][:, 1:3], delimiter=",")
-                except Exception as e:
-                    self.logger.error(f"保存切片数据失败: {e}")
+                # 只保留温度/热流两列的紧凑副本，不再持有整份原始数据
+                columns = np.ascontiguousarray(self.data_seg[i][:, 1:3])
+                self.cycle_segments.setdefault(i + 1, {})[name] = columns
+                for filename in self._segment_paths(cycle_path, name):
+                    self._write_segment(filename, columns)
+
+    def _segment_paths(self, cycle_path: str, name: str) -> List[str]:
+        extensions = {"csv": [".csv"], "npy": [".npy"], "both": [".csv", ".npy"]}
+        return [os.path.join(cycle_path, name + ext) for ext in extensions[self.segment_format]]
+
+    def _write_segment(self, filename: str, columns: np.ndarray) -> None:
+        if filename.endswith(".npy"):
+            write = partial(np.save, filename, columns, allow_pickle=False)
+        else:
+            write = partial(np.savetxt, filename, columns, delimiter=",")
+        if self._export_executor is not None:
+            self._export_pending.append((filename, self._export_executor.submit(write)))
+            return
+        try:
+            write()
+        except Exception as e:
+            self.logger.error(f"保存切片数据失败: {e}")
+
+    def _finish_segment_writes(self) -> None:
+        """等待后台分段导出完成并记录失败项"""
+        pending, self._export_pending = self._export_pending, []
+        for filename, future in pending:
+            try:
+                future.result()
+            except Exception as e:
+                self.logger.error(f"保存切片数据失败 {os.path.basename(filename)}: {e}")
 
     # -- drawing -----------------------------------------------------------
 
+    def _cycle_template(self) -> Tuple[Tuple[Any, ...], FigureTemplate]:
+        """返回当前样式下的切片图模板（同一批次内复用）"""
+        key = tuple(getattr(self, name) for name in _CYCLE_STYLE_ATTRIBUTES)
+        return key, self._templates.get(key, self._build_cycle_template)
+
+    def _build_cycle_template(self) -> FigureTemplate:
+        """创建切片图模板：图形、坐标轴样式与一条空曲线"""
+        fig = plt.figure(dpi=FIGURE_DPI, figsize=FIGURE_SIZE_WITHOUT_TABLE)
+        try:
+            if self.transparent_back:
+                fig.patch.set_alpha(0.0)
+
+            ax = fig.add_subplot(111)
+            (curve,) = ax.plot([], [], color=self.curve_color, linewidth=self.line_width)
+
+            # 设置坐标轴粗细
+            for spine in ax.spines.values():
+                spine.set_linewidth(self.axis_width)
+
+            font1 = {
+                "size": self.axis_font_size,
+                "weight": "bold",
+                "fontname": "Arial",
+            }
+            ax.set_xlabel("", labelpad=4, fontdict=font1)
+            ax.set_ylabel("", labelpad=4, fontdict=font1)
+            plt.setp(ax.get_xticklabels(), weight="bold")
+            plt.setp(ax.get_yticklabels(), weight="bold")
+        finally:
+            # 模板由分析器持有，从 pyplot 的图形管理器中注销以免累积
+            plt.close(fig)
+        return FigureTemplate(figure=fig, ax=ax, artists={"curve": curve})
+
     def draw_img(self) -> None:
-        """绘制切片图"""
+        """绘制切片图 — 同一样式的切片图共用一个模板，逐段只替换曲线数据与坐标轴标签"""
         for num, data in enumerate(self.data_seg):
             if data.size == 0:
                 continue
 
-            fig = plt.figure(dpi=FIGURE_DPI, figsize=FIGURE_SIZE_WITHOUT_TABLE)
+            key, template = self._cycle_template()
+            ax = template.ax
             try:
-                if self.transparent_back:
-                    fig.patch.set_alpha(0.0)
-
-                ax = fig.add_subplot(111)
-
                 x = data[:, 1]
                 y = data[:, 2]
 
@@ -459,6 +967,9 @@ class DSCAnalyzer(BaseAnalyzer):
                     if x[-1] > x[0]:
                         y = -y
 
+                template.artists["curve"].set_data(*decimate_line(x, y))
+                ax.relim()
+
                 # 如果勾选了峰居中
                 if self.center_peak and len(x) > 1:
                     peak_idx: int = 0
@@ -473,26 +984,13 @@ class DSCAnalyzer(BaseAnalyzer):
 
                     peak_x = x[peak_idx]
                     span = float(max(x) - min(x))
-                    plt.xlim(peak_x - span / 2, peak_x + span / 2)
-
-                plt.plot(x, y, color=self.curve_color, linewidth=self.line_width)
-
-                # 设置坐标轴粗细
-                for spine in ax.spines.values():
-                    spine.set_linewidth(self.axis_width)
-
-                xlabel = self.heads.get(2, "Temperature")
-                ylabel = self.heads.get(3, "Heat Flow")
+                    ax.set_xlim(peak_x - span / 2, peak_x + span / 2)
+                else:
+                    ax.set_autoscalex_on(True)
+                ax.autoscale_view()
 
-                font1 = {
-                    "size": self.axis_font_size,
-                    "weight": "bold",
-                    "fontname": "Arial",
-                }
-                plt.xlabel(xlabel, labelpad=4, fontdict=font1)
-                plt.ylabel(ylabel, labelpad=4, fontdict=font1)
-                plt.xticks(weight="bold")
-                plt.yticks(weight="bold")
+                ax.xaxis.label.set_text(self.heads.get(2, "Temperature"))
+                ax.yaxis.label.set_text(self.heads.get(3, "Heat Flow"))
 
                 pic_subdir = os.path.join(
                     self.pic_dir, os.path.splitext(self.filename)[0]
@@ -500,45 +998,44 @@ class DSCAnalyzer(BaseAnalyzer):
                 if not os.path.exists(pic_subdir):
                     os.makedirs(pic_subdir, exist_ok=True)
 
-                plt.savefig(
+                template.figure.savefig(
                     os.path.join(pic_subdir, f"Cycle {num + 1}.png"),
                     transparent=self.transparent_back,
                 )
-            finally:
-                plt.close(fig)
+            except Exception:
+                # 模板可能只更新了一半，丢弃后重建
+                self._templates.discard(key)
+                raise
 
     def cycle_draw(
         self,
         progress_start: float = 0.8,
         progress_end: float = 0.98,
     ) -> None:
-        """绘制循环叠加图(每个 Cycle 目录一张 result.png)。"""
-        cycle_list = sorted(
-            path
-            for path in glob.glob(os.path.join(self.cycle_dir, "Cycle*"))
-            if os.path.isdir(path)
-        )
+        """绘制循环叠加图(每个 Cycle 目录一张 result.png)。
 
-        for pro, cycle_path in enumerate(cycle_list):
+        本次运行登记过的循环直接使用内存中的数据；否则读取 Cycle 目录中保存的分段
+        (.npy 以内存映射方式加载，其次为 CSV)。
+        """
+        cycle_list = self._cycle_overlay_sources()
+
+        for pro, (cycle_path, sources) in enumerate(cycle_list):
+            self.check_cancelled()
             fig = plt.figure(dpi=300, figsize=(16, 8))
             try:
                 labels: List[str] = []
 
-                csv_files = [
-                    path
-                    for path in glob.glob(os.path.join(cycle_path, "*.csv"))
-                    if os.path.isfile(path)
-                ]
-
                 # 用于计算平均峰位置
                 peak_x_list: List[float] = []
                 all_x_min: List[float] = []
                 all_x_max: List[float] = []
 
-                for num, file in enumerate(csv_files):
+                for num, (name, source) in enumerate(sources):
                     try:
-                        data = np.loadtxt(file, delimiter=",")
-                        name = os.path.splitext(os.path.basename(file))[0]
+                        if isinstance(source, str):
+                            source = load_segment(source)
+                        # 与 CSV 回读一致，以 float64 参与峰位计算
+                        data = np.asarray(source, dtype=np.float64)
 
                         x = data[:, 0]
                         y = data[:, 1]
@@ -569,10 +1066,10 @@ class DSCAnalyzer(BaseAnalyzer):
                             all_x_max.append(float(max(x)))
 
                         color_idx = num % len(self.color_list)
-                        plt.plot(x, y, c=self.color_list[color_idx], label=name)
+                        fig.gca().plot(*decimate_line(x, y), c=self.color_list[color_idx], label=name)
                         labels.append(name)
                     except Exception as e:
-                        self.logger.warning(f"读取CSV失败 {file}: {e}")
+                        self.logger.warning(f"读取分段数据失败 {name}: {e}")
 
                 # 应用峰居中
                 if self.center_peak and peak_x_list:
@@ -581,13 +1078,13 @@ class DSCAnalyzer(BaseAnalyzer):
                         avg_span = float(
                             np.mean(np.array(all_x_max) - np.array(all_x_min))
                         )
-                        plt.xlim(avg_peak_x - avg_span / 2, avg_peak_x + avg_span / 2)
+                        fig.gca().set_xlim(avg_peak_x - avg_span / 2, avg_peak_x + avg_span / 2)
 
                 if labels:
-                    plt.legend(labels)
+                    fig.gca().legend(labels)
 
                 if self.save_cycle_pic:
-                    plt.savefig(os.path.join(cycle_path, "result.png"))
+                    fig.savefig(os.path.join(cycle_path, "result.png"))
 
                 # 进度更新
                 fraction = (pro + 1) / len(cycle_list)
@@ -600,6 +1097,116 @@ class DSCAnalyzer(BaseAnalyzer):
             finally:
                 plt.close(fig)
 
+    def _cycle_overlay_sources(
+        self,
+    ) -> List[Tuple[str, List[Tuple[str, Union[str, np.ndarray]]]]]:
+        """Return ``(cycle_path, [(name, array or segment path), ...])`` per cycle."""
+        if self.cycle_segments:
+            return [
+                (
+                    os.path.join(self.cycle_dir, f"Cycle{index}"),
+                    list(self.cycle_segments[index].items()),
+                )
+                for index in sorted(self.cycle_segments)
+            ]
+
+        cycle_list = sorted(
+            path
+            for path in glob.glob(os.path.join(self.cycle_dir, "Cycle*"))
+            if os.path.isdir(path)
+        )
+        return [(cycle_path, segment_files(cycle_path)) for cycle_path in cycle_list]
+
+    def _process_file(self, filename: str) -> bool:
+        """读取、预处理、保存并绘制单个文件；返回是否成功处理，出错时抛出异常"""
+        if not filename.lower().endswith(".txt"):
+            raise ValueError("DSC input filename must end with .txt")
+        resolve_contained_file(self.data_path, filename)
+        if not self.read_file(filename):
+            return False
+        if self.info_callback:
+            self.info_callback(f"预处理文件: {filename}...")
+        self.preprocess()
+        if not self._has_valid_processed_data():
+            raise ValueError("No valid DSC data segments found")
+
+        if self.info_callback:
+            self.info_callback(f"数据切片: {filename}...")
+        if self.save_seg_mode:
+            if self.info_callback:
+                self.info_callback(f"保存切片数据: {filename}...")
+            self.save_data_seg()
+        if self.draw_seg_mode:
+            if self.info_callback:
+                self.info_callback(f"分循环做图: {filename}...")
+            self.draw_img()
+        return True
+
+    def _emit_file_progress(self, finished: int, total: int) -> None:
+        fraction = finished / total
+        self._emit_progress(
+            0.05 + 0.7 * fraction,
+            "处理进度 {}/{} {:.2f}%".format(finished, total, fraction * 100),
+        )
+
+    def _run_serial(self, file_list: List[str]) -> int:
+        """在当前进程逐个处理文件，返回成功处理的文件数"""
+        processed_count = 0
+        for pro, filename in enumerate(file_list):
+            self.check_cancelled()
+            self._emit_progress(
+                0.05 + 0.65 * pro / len(file_list),
+                f"Processing {filename}",
+            )
+            try:
+                processed = self._process_file(filename)
+            except Exception as exc:
+                self.logger.error(
+                    f"处理文件 {filename} 时出错",
+                    show_ui=True,
+                    exception=exc,
+                )
+                self.report_file(filename, str(exc) or type(exc).__name__, processed=False)
+            else:
+                processed_count += int(processed)
+                self.report_file(filename, processed=processed)
+            finally:
+                self._emit_file_progress(pro + 1, len(file_list))
+        return processed_count
+
+    def _run_pool(self, file_list: List[str], workers: int) -> int:
+        """在进程池中并行处理文件，按文件顺序汇总各循环数据，返回成功处理的文件数"""
+        total = len(file_list)
+        finished = 0
+
+        def on_done(_index: int, result: DscFileResult) -> None:
+            nonlocal finished
+            finished += 1
+            if result.error:
+                self.logger.error(
+                    f"处理文件 {result.filename} 时出错: {result.error}", show_ui=True
+                )
+            self.report_file(result.filename, result.error, processed=result.processed)
+            self._emit_file_progress(finished, total)
+
+        if self.info_callback:
+            self.info_callback(f"并行处理 {total} 个文件 ({workers} 个进程)...")
+        state = {key: getattr(self, key) for key in _WORKER_ATTRIBUTES}
+        results = run_ordered(
+            process_dsc_file,
+            [(filename,) for filename in file_list],
+            workers=workers,
+            on_done=on_done,
+            initializer=_init_dsc_worker,
+            initargs=(self.data_path, state),
+            cancel_token=self.cancel_token,
+        )
+        for result in results:
+            name = os.path.splitext(result.filename)[0]
+            for index, segment in result.cycle_segments.items():
+                self.cycle_segments.setdefault(index, {})[name] = segment
+        return sum(1 for result in results if result.processed)
+
     # -- main entry point --------------------------------------------------
 
     def run(self) -> bool:
@@ -620,6 +1227,8 @@ class DSCAnalyzer(BaseAnalyzer):
         if not file_list:
             self.logger.warning("数据文件夹中没有相应文件", show_ui=True)
             return False
+        # 串行与工作进程使用同一套绘图配置
+        configure_plotting()
 
         final_cycle_dir = self.cycle_dir
         final_pic_dir = self.pic_dir
@@ -635,54 +1244,19 @@ class DSCAnalyzer(BaseAnalyzer):
         )
         self.cycle_dir = staging_cycle_dir
         self.pic_dir = staging_pic_dir
-        processed_count = 0
+        self.cycle_segments = {}
+        self._export_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dsc-export")
 
         try:
             self._emit_progress(0.01, "Preparing DSC analysis")
-            for pro, filename in enumerate(file_list):
-                self._emit_progress(
-                    0.05 + 0.65 * pro / len(file_list),
-                    f"Processing {filename}",
-                )
-                try:
-                    if not filename.lower().endswith(".txt"):
-                        raise ValueError("DSC input filename must end with .txt")
-                    resolve_contained_file(self.data_path, filename)
-                    if not self.read_file(filename):
-                        continue
-                    if self.info_callback:
-                        self.info_callback(f"预处理文件: {filename}...")
-                    self.preprocess()
-                    if not self._has_valid_processed_data():
-                        raise ValueError("No valid DSC data segments found")
-
-                    if self.info_callback:
-                        self.info_callback(f"数据切片: {filename}...")
-                    if self.save_seg_mode:
-                        if self.info_callback:
-                            self.info_callback(f"保存切片数据: {filename}...")
-                        self.save_data_seg()
-                    if self.draw_seg_mode:
-                        if self.info_callback:
-                            self.info_callback(f"分循环做图: {filename}...")
-                        self.draw_img()
-                    processed_count += 1
-                except Exception as exc:
-                    self.logger.error(
-                        f"处理文件 {filename} 时出错",
-                        show_ui=True,
-                        exception=exc,
-                    )
-                finally:
-                    fraction = (pro + 1) / len(file_list)
-                    self._emit_progress(
-                        0.05 + 0.7 * fraction,
-                        "处理进度 {}/{} {:.2f}%".format(
-                            pro + 1,
-                            len(file_list),
-                            fraction * 100,
-                        ),
-                    )
+            workers = resolve_parse_workers(
+                self.jobs, [os.path.join(self.data_path, filename) for filename in file_list]
+            )
+
+            if workers > 1:
+                processed_count = self._run_pool(file_list, workers)
+            else:
+                processed_count = self._run_serial(file_list)
 
             if processed_count == 0:
                 return False
@@ -692,16 +1266,24 @@ class DSCAnalyzer(BaseAnalyzer):
                     self.info_callback("绘制各循环叠加图...")
                 self.cycle_draw(0.8, 0.98)
 
+            self._finish_segment_writes()
             replace_directories_atomically([
                 (staging_cycle_dir, final_cycle_dir),
                 (staging_pic_dir, final_pic_dir),
             ])
             self._emit_progress(1.0, "DSC analysis complete")
             return True
+        except AnalysisCancelled:
+            raise
         except Exception as exc:
             self.logger.error("DSC分析失败", show_ui=True, exception=exc)
             return False
         finally:
+            self._export_executor.shutdown(wait=True)
+            self._export_executor = None
+            self._export_pending = []
+            self.cycle_segments = {}
+            self._templates.clear()
             self.cycle_dir = final_cycle_dir
             self.pic_dir = final_pic_dir
             if os.path.isdir(staging_cycle_dir):
@@ -15,7 +15,7 @@ Missing MMD or Cumulative columns are derived from the other series.
 
 import re
 from dataclasses import dataclass, field
-from typing import Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
 import numpy as np
 import pandas as pd
@@ -24,6 +24,9 @@ VALUE_COLUMN_RE = re.compile(
     r"^(?P<name>.+?)\s+(?P<kind>MMD|dW/dlogM|Cumulative)$", re.IGNORECASE
 )
 
+# Bump when parsing behaviour changes so stale parse-cache entries are ignored
+EXCEL_PARSER_VERSION = 1
+
 _RESULTS_HEADER_ALIASES: Dict[str, str] = {
     "mw (g/mol)": "Mw",
     "mn (g/mol)": "Mn",
@@ -243,3 +246,38 @@ def parse_gpc_excel(path: str) -> Dict[str, GpcExcelSample]:
             samples[name].results = results
 
     return samples
+
+
+def encode_gpc_excel(
+    samples: Dict[str, GpcExcelSample],
+) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+    """Split parsed samples into arrays and JSON metadata for the parse cache."""
+    arrays: Dict[str, np.ndarray] = {}
+    for index, sample in enumerate(samples.values()):
+        arrays[f"logm_{index}"] = sample.logm
+        arrays[f"mmd_{index}"] = sample.mmd
+        arrays[f"cumulative_{index}"] = sample.cumulative
+    meta = {
+        "samples": [
+            {"name": sample.name, "results": sample.results}
+            for sample in samples.values()
+        ],
+    }
+    return arrays, meta
+
+
+def decode_gpc_excel(
+    payload: Tuple[Dict[str, np.ndarray], Dict[str, Any]],
+) -> Dict[str, GpcExcelSample]:
+    """Inverse of :func:`encode_gpc_excel` (sample order is preserved)."""
+    arrays, meta = payload
+    samples: Dict[str, GpcExcelSample] = {}
+    for index, entry in enumerate(meta["samples"]):
+        samples[entry["name"]] = GpcExcelSample(
+            name=entry["name"],
+            logm=arrays[f"logm_{index}"],
+            mmd=arrays[f"mmd_{index}"],
+            cumulative=arrays[f"cumulative_{index}"],
+            results=entry["results"],
+        )
+    return samples
@@ -10,20 +10,26 @@ import re
 import shutil
 import numpy as np
 import pandas as pd
-from typing import Collection, List, Optional, Callable
+from dataclasses import dataclass, field
+from typing import Any, Collection, Dict, List, Optional, Callable
 
 from .base import (
     BaseAnalyzer,
     FIGURE_DPI,
     GPC_FIGURE_SIZE,
-    MW_DATA_OFFSET,
     GPC_X_COLUMN_INDEX,
     GPC_Y_COLUMN_INDEX,
     MIN_GPC_PEAK_COLUMNS,
     replace_directories_atomically,
+    resolve_contained_file,
     stage_output_directory,
     validate_basename,
 )
+from .cancellation import CancellationToken
+from .dataset_cache import FileIdentity, file_identity, get_dataset_cache
+from .parallel import resolve_parse_workers, run_ordered
+from .parse_cache import remember_parsed
+from .plotting import decimate_line
 
 
 _INVALID_SHEET_CHARACTERS = re.compile(r"[\x00-\x1f\[\]:*?/\\]")
@@ -48,6 +54,58 @@ def make_unique_sheet_name(sample_name: str, existing_names: Collection[str]) ->
         index += 1
 
 
+@dataclass
+class GpcFileResult:
+    """单个 GPC 输入文件的解析结果（不依赖分析器实例状态，可跨进程传递）。"""
+
+    filename: str
+    mw_rows: List[List[str]] = field(default_factory=list)
+    peak_data: Dict[str, List[np.ndarray]] = field(default_factory=dict)
+    error: str = ""
+    # 解析后的原始数据集与其文件标识（仅 keep_dataset=True 时填写），
+    # 供父进程放入内存数据集缓存
+    dataset: Any = None
+    identity: Optional[FileIdentity] = None
+
+
+def parse_gpc_file(data_path: str, filename: str, keep_dataset: bool = False) -> GpcFileResult:
+    """Read and preprocess one GPC input in isolation.
+
+    Runs on a throw-away analyzer so it is safe to call from worker processes;
+    failures are reported through ``GpcFileResult.error`` instead of raising.
+    With ``keep_dataset`` the parsed input is returned as well so the parent
+    process can keep it in its in-memory dataset cache.
+    """
+    parser = GPCAnalyzer(
+        data_path,
+        "parse",
+        save_file=False,
+        save_picture=False,
+        save_figure_file_gpc=False,
+    )
+    result = GpcFileResult(filename=filename)
+    if keep_dataset:
+        try:
+            result.identity = file_identity(resolve_contained_file(data_path, filename))
+        except (OSError, ValueError):
+            result.identity = None
+    try:
+        if not parser.read_file(filename):
+            result.error = "读取文件失败"
+            return result
+        parser.preprocess()
+    except Exception as e:
+        result.error = str(e) or type(e).__name__
+        return result
+    result.mw_rows = parser.mw_data
+    result.peak_data = parser.peak_data
+    if keep_dataset:
+        result.dataset = (
+            parser.excel_samples if parser.excel_samples is not None else parser.rst_data
+        )
+    return result
+
+
 class GPCAnalyzer(BaseAnalyzer):
     """GPC 分析器 — 处理 GPC 数据文件、绘制叠加色谱图、输出分子量汇总。"""
 
@@ -59,12 +117,17 @@ class GPCAnalyzer(BaseAnalyzer):
         save_picture: bool = True,
         save_figure_file_gpc: bool = True,
         test_mode: bool = False,
+        jobs: Optional[int] = None,
         progress_callback: Optional[Callable[[float, str], None]] = None,
         info_callback: Optional[Callable[[str], None]] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        file_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
     ) -> None:
         super().__init__(datadir, test_mode=test_mode,
                          progress_callback=progress_callback,
-                         info_callback=info_callback)
+                         info_callback=info_callback,
+                         cancel_token=cancel_token,
+                         file_callback=file_callback)
         self.output_dir: str = os.path.join(os.path.dirname(self.data_path), "GPC_output")
         self.file_list: Optional[List[str]] = None
         self.output_filename: str = validate_basename(output_filename, "GPC output name")
@@ -74,6 +137,8 @@ class GPCAnalyzer(BaseAnalyzer):
         self.save_file: bool = save_file
         self.save_picture: bool = save_picture
         self.save_figure_file_gpc: bool = save_figure_file_gpc
+        # 解析进程数：None/0 表示按 CPU 核数自动选择，1 表示在当前进程串行解析
+        self.jobs: Optional[int] = jobs
 
         # 画图颜色库
         from .cnames import clist
@@ -109,45 +174,29 @@ class GPCAnalyzer(BaseAnalyzer):
             self._preprocess_excel()
             return
 
-        mw_start, mw_end, slice_table_start = self.preprocess_common()
+        self.preprocess_common()
+        data = self.rst_data
+        assert data is not None
 
         # 整理分子量数据
-        for line in self.lines[mw_start + MW_DATA_OFFSET:mw_end]:
-            parts = line.split("\t")
-            if len(parts) > 1:
-                self.mw_data.append([self.sample_name] + parts[1:])
+        self.mw_data.extend(data.mw_rows())
 
         if not self.mw_data:
             raise ValueError("未找到分子量数据")
 
         self.peak_num = len(self.mw_data)
 
-        # 提取峰数据
-        current_peak: List[List[str]] = []
-        all_peaks: list = []
-        for line in self.lines[slice_table_start + 1:]:
-            if ("Peak" in line and len(current_peak) > 1) or "</Slice_Table>" in line:
-                try:
-                    peak_array = np.array(current_peak[1:], dtype="float")
-                    if (peak_array.shape[0] > 0
-                            and peak_array.shape[1] > MIN_GPC_PEAK_COLUMNS):
-                        all_peaks.append(peak_array)
-                    else:
-                        self.logger.warning(
-                            f"文件 {self.filename}: 峰数据格式不正确，跳过该峰"
-                        )
-                except (ValueError, IndexError) as e:
-                    self.logger.warning(
-                        f"文件 {self.filename}: 峰数据转换失败: {e}"
-                    )
-                current_peak = []
-                continue
-            if "RT" in line:
-                continue
-            line_parts = line.split("\t")[:-1]
-            if line_parts and "-2" in line_parts[0]:
-                continue
-            current_peak.append(line_parts)
+        # 提取峰数据（已由 rst_parser 转换为 float64 数组）
+        all_peaks: List[np.ndarray] = []
+        for peak_array in data.peaks:
+            if peak_array.shape[0] > 0 and peak_array.shape[1] > MIN_GPC_PEAK_COLUMNS:
+                all_peaks.append(peak_array)
+            else:
+                self.logger.warning(
+                    f"文件 {self.filename}: 峰数据格式不正确，跳过该峰"
+                )
+        for error in data.peak_errors:
+            self.logger.warning(f"文件 {self.filename}: 峰数据转换失败: {error}")
 
         if not all_peaks:
             raise ValueError("未找到有效的峰数据")
@@ -210,8 +259,8 @@ class GPCAnalyzer(BaseAnalyzer):
                         continue
                     x_data = peak_array[:, GPC_X_COLUMN_INDEX]
                     y_data = peak_array[:, GPC_Y_COLUMN_INDEX]
-                    plt.plot(
-                        x_data, y_data,
+                    fig.gca().plot(
+                        *decimate_line(x_data, y_data),
                         c=self.color_list[sample_idx],
                         label=sample_name,
                     )
@@ -220,11 +269,11 @@ class GPCAnalyzer(BaseAnalyzer):
             if not plotted_labels:
                 raise ValueError("没有有效数据可以绘图")
 
-            plt.legend(plotted_labels)
+            fig.gca().legend(plotted_labels)
             result_name = self.output_filename
             os.makedirs(self.output_dir, exist_ok=True)
             if self.save_picture:
-                plt.savefig(os.path.join(self.output_dir, result_name + ".png"))
+                fig.savefig(os.path.join(self.output_dir, result_name + ".png"))
             # Display is handled by the frontend — no st.pyplot call.
         finally:
             if fig is not None:
@@ -273,32 +322,54 @@ class GPCAnalyzer(BaseAnalyzer):
 
         # 在开始处理前清空 peak_data，确保不会累积旧数据
         self.peak_data = {}
-        # 每个文件的 read_file 都会重置 mw_data，因此在这里跨文件累积汇总行，
-        # 保证汇总 CSV 覆盖所有输入文件（叠加图通过 peak_data 累积，不受影响）。
+        # 每个文件由 parse_gpc_file 独立解析（可并行），再按输入顺序合并，
+        # 保证汇总 CSV 与叠加图的样品顺序与文件列表一致。
         accumulated_mw_data: list = []
+        total = len(self.file_list)
+        finished = 0
 
-        for pro, filename in enumerate(self.file_list):
-            self.filename = filename
-            try:
-                if self.read_file(filename, reset_peak_data=False):
-                    self.preprocess()
-                    accumulated_mw_data.extend(self.mw_data)
-                    self.logger.info(f"成功处理文件: {filename}")
-            except Exception as e:
+        def on_parsed(_index: int, result: GpcFileResult) -> None:
+            nonlocal finished
+            finished += 1
+            if result.error:
                 self.logger.error(
-                    f"处理文件 {filename} 时出错", show_ui=True, exception=e
+                    f"处理文件 {result.filename} 时出错: {result.error}", show_ui=True
                 )
-            finally:
-                if self.progress_callback:
-                    total = len(self.file_list)
-                    pct = (pro + 1) * 100 / total
-                    self.progress_callback(
-                        (pro + 1) / total,
-                        f"画图进度 {pro + 1}/{total} {pct:.2f}%",
-                    )
+            else:
+                self.logger.info(f"成功处理文件: {result.filename}")
+            self.report_file(result.filename, result.error, samples=len(result.mw_rows))
+            if self.progress_callback:
+                pct = finished * 100 / total
+                self.progress_callback(
+                    finished / total,
+                    f"画图进度 {finished}/{total} {pct:.2f}%",
+                )
+
+        workers = resolve_parse_workers(
+            self.jobs, [os.path.join(self.data_path, filename) for filename in self.file_list]
+        )
+        # 子进程中的解析结果不会进入本进程的内存缓存，需随结果带回
+        keep_dataset = workers > 1 and get_dataset_cache().enabled
+
+        results = run_ordered(
+            parse_gpc_file,
+            [(self.data_path, filename, keep_dataset) for filename in self.file_list],
+            workers=workers,
+            on_done=on_parsed,
+            cancel_token=self.cancel_token,
+        )
+        for result in results:
+            if result.error:
+                continue
+            if result.dataset is not None and result.identity is not None:
+                kind, version, _parse, encode, _decode = self.input_codec(result.filename)
+                remember_parsed(kind, version, result.identity, result.dataset, encode)
+            accumulated_mw_data.extend(result.mw_rows)
+            self.peak_data.update(result.peak_data)
 
         self.mw_data = accumulated_mw_data
 
+        self.check_cancelled()
         if self.info_callback:
             self.info_callback("绘制图片")
         try:
@@ -307,6 +378,7 @@ class GPCAnalyzer(BaseAnalyzer):
             self.logger.error("绘图失败", show_ui=True, exception=e)
             return False
 
+        self.check_cancelled()
         if self.info_callback:
             self.info_callback("保存数据")
         try:
@@ -2,9 +2,9 @@
 
 from __future__ import annotations
 
+import io
 import json
 import os
-import re
 import shutil
 import tempfile
 from datetime import datetime
@@ -20,13 +20,53 @@ from .base import (
     replace_directories_atomically,
     resolve_contained_file,
 )
-from .plotting import configure_plotting
+from .cancellation import CancellationToken
+from .ir_matrix import SpectralMatrix
+from .parse_cache import cached_parse
+from .plotting import FigureTemplate, FigureTemplates, configure_plotting, decimate_line, rescale
 
 GAPS: tuple[tuple[float, float], ...] = ((2800, 3000), (1380, 1460))
 IR_DEFAULT_CURVE_COLOR = "#D62728"
+# Settings that shape the single-spectrum template; a change rebuilds it
+_SPECTRUM_STYLE_ATTRIBUTES: tuple[str, ...] = (
+    "curve_color",
+    "line_width",
+    "axis_width",
+    "title_font_size",
+    "axis_font_size",
+)
 DEFAULT_NORMALIZATION_PEAK = 1450.0
 NORMALIZATION_WINDOW = 80.0
 NORMALIZATION_TARGET_ABSORBANCE = 0.6
+# Bump when parse_dpt() changes so stale parse-cache entries are ignored
+DPT_PARSER_VERSION = 2
+# ``,`` and ``;`` separate DPT columns just like whitespace does
+_DPT_SEPARATORS = str.maketrans({",": " ", ";": " "})
+
+
+def _dpt_pair(line: str) -> Optional[tuple[float, float]]:
+    """First two fields of a DPT row as floats, or None for non-numeric rows."""
+    parts = line.split()
+    if len(parts) < 2:
+        return None
+    try:
+        return float(parts[0]), float(parts[1])
+    except ValueError:
+        return None
+
+
+def _encode_dpt(
+    spectrum: tuple[np.ndarray, np.ndarray],
+) -> tuple[dict[str, np.ndarray], dict[str, Any]]:
+    wavenumber, absorbance = spectrum
+    return {"wavenumber": wavenumber, "absorbance": absorbance}, {}
+
+
+def _decode_dpt(
+    payload: tuple[dict[str, np.ndarray], dict[str, Any]],
+) -> tuple[np.ndarray, np.ndarray]:
+    arrays, _meta = payload
+    return arrays["wavenumber"], arrays["absorbance"]
 
 
 class IRAnalyzer(BaseAnalyzer):
@@ -45,11 +85,21 @@ class IRAnalyzer(BaseAnalyzer):
         draw_overlay: bool = True,
         normalize_overlay: bool = True,
         normalization_peak: float = DEFAULT_NORMALIZATION_PEAK,
+        save_matrix: bool = False,
         progress_callback: Optional[Callable[[float, str], None]] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        file_callback: Optional[Callable[[dict[str, Any]], None]] = None,
     ) -> None:
-        super().__init__(datadir=datadir, progress_callback=progress_callback)
+        super().__init__(
+            datadir=datadir,
+            progress_callback=progress_callback,
+            cancel_token=cancel_token,
+            file_callback=file_callback,
+        )
         if not isinstance(draw_overlay, bool):
             raise ValueError("draw_overlay must be a boolean")
+        if not isinstance(save_matrix, bool):
+            raise ValueError("save_matrix must be a boolean")
         if not isinstance(normalize_overlay, bool):
             raise ValueError("normalize_overlay must be a boolean")
         if isinstance(normalization_peak, bool):
@@ -73,6 +123,11 @@ class IRAnalyzer(BaseAnalyzer):
         self.draw_overlay = draw_overlay
         self.normalize_overlay = normalize_overlay
         self.normalization_peak = normalization_peak_value
+        self.save_matrix = save_matrix
+        # All spectra of the last run on one wavenumber grid (see ir_matrix)
+        self.spectral_matrix: Optional[SpectralMatrix] = None
+        # Styled single-spectrum figure reused across the spectra of one run
+        self._templates = FigureTemplates()
 
     def read_file_list(self, force_refresh: bool = False) -> List[str]:  # type: ignore[override]
         if self._cached_file_list is None or force_refresh:
@@ -103,13 +158,16 @@ class IRAnalyzer(BaseAnalyzer):
         staging_individual_dir = os.path.join(staging_dir, "individual")
         os.makedirs(staging_individual_dir, exist_ok=True)
         generated: list[str] = []
-        spectra: list[dict[str, Any]] = []
+        names: list[str] = []
+        wavenumbers: list[np.ndarray] = []
+        absorbances: list[np.ndarray] = []
         total = len(files)
         work_start = 0.08
         work_span = 0.82
 
         try:
             for index, filename in enumerate(files, start=1):
+                self.check_cancelled()
                 if not isinstance(filename, str) or not filename.lower().endswith(".dpt"):
                     continue
                 self._emit_progress(
@@ -118,29 +176,40 @@ class IRAnalyzer(BaseAnalyzer):
                 )
                 try:
                     input_path = resolve_contained_file(self.data_path, filename)
-                    wn, absorbance = self.parse_dpt(input_path)
+                    wn, absorbance = self.load_dpt(input_path)
                     transmittance = self.absorbance_to_transmittance(absorbance)
                 except (OSError, ValueError) as exc:
                     self.logger.warning(f"跳过无效 DPT 数据 {filename}: {exc}")
+                    self.report_file(filename, str(exc))
                     continue
 
                 sample_name = os.path.splitext(filename)[0]
                 output_path = os.path.join(staging_individual_dir, f"{sample_name}.png")
                 self.plot_spectrum(plt, wn, transmittance, sample_name, output_path)
                 generated.append(output_path)
-                spectra.append({"name": sample_name, "wavenumber": wn, "transmittance": transmittance})
+                self.report_file(
+                    filename,
+                    image=os.path.join(self.individual_dir, f"{sample_name}.png"),
+                )
+                names.append(sample_name)
+                wavenumbers.append(wn)
+                absorbances.append(absorbance)
                 self._emit_progress(
                     work_start + work_span * (index / max(total, 1)),
                     f"Plotted {filename}",
                 )
 
-            if not spectra:
+            if not names:
                 raise ValueError("No valid .dpt spectra found")
+            self.spectral_matrix = SpectralMatrix.from_spectra(names, wavenumbers, absorbances)
+            if self.save_matrix:
+                generated.extend(self.spectral_matrix.save(staging_dir))
 
             if self.draw_overlay:
+                self.check_cancelled()
                 self._emit_progress(0.92, "Plotting overlay")
                 overlay_path = os.path.join(staging_dir, "dpt_overlay.png")
-                self.plot_overlay(plt, spectra, overlay_path)
+                self.plot_overlay(plt, self.spectral_matrix, overlay_path)
                 generated.append(overlay_path)
 
             manifest_path = self.write_manifest(
@@ -156,9 +225,11 @@ class IRAnalyzer(BaseAnalyzer):
             if os.path.isdir(staging_dir):
                 shutil.rmtree(staging_dir, ignore_errors=True)
             raise
+        finally:
+            self._templates.clear()
 
         self.generated_files = [os.path.join(self.output_dir, path) for path in relative_generated]
-        self.processed_count = len(spectra)
+        self.processed_count = len(names)
         self._emit_progress(1.0, f"Generated {len(self.generated_files)} files")
         return True
 
@@ -166,21 +237,48 @@ class IRAnalyzer(BaseAnalyzer):
         if self.progress_callback:
             self.progress_callback(progress, message)
 
+    @classmethod
+    def load_dpt(cls, filepath: str) -> tuple[np.ndarray, np.ndarray]:
+        """``parse_dpt`` through the on-disk parse cache."""
+        return cached_parse(
+            "dpt", DPT_PARSER_VERSION, filepath,
+            cls.parse_dpt, _encode_dpt, _decode_dpt,
+        )
+
     @staticmethod
     def parse_dpt(filepath: str) -> tuple[np.ndarray, np.ndarray]:
-        rows: list[tuple[float, float]] = []
-        splitter = re.compile(r"[\s,;]+")
-        with open(filepath, "r", encoding="utf-8", errors="replace") as handle:
-            for line in handle:
-                parts = [part for part in splitter.split(line.strip()) if part]
-                if len(parts) < 2:
-                    continue
-                try:
-                    rows.append((float(parts[0]), float(parts[1])))
-                except ValueError:
-                    continue
+        """Read the first two numeric columns of a DPT export.
+
+        Whitespace, ``,`` and ``;`` all separate columns; rows whose first two
+        fields are not numbers are skipped. The numeric block is parsed in one
+        ``np.loadtxt`` call, falling back to row-by-row parsing only when
+        non-numeric rows are interleaved with the data.
+        """
+        with open(filepath, "rb") as handle:
+            raw = handle.read()
+        stream = io.StringIO(
+            raw.decode("utf-8", errors="replace").translate(_DPT_SEPARATORS), newline=None
+        )
+        del raw
+
+        header_rows = 0
+        for line in stream:
+            if _dpt_pair(line) is not None:
+                break
+            header_rows += 1
+        else:
+            raise ValueError("DPT data must contain at least two numeric points")
+
+        stream.seek(0)
+        try:
+            data = np.loadtxt(
+                stream, usecols=(0, 1), skiprows=header_rows, comments=None, ndmin=2
+            )
+        except ValueError:
+            stream.seek(0)
+            pairs = [pair for pair in map(_dpt_pair, stream) if pair is not None]
+            data = np.array(pairs, dtype=float).reshape(-1, 2)
 
-        data = np.array(rows, dtype=float)
         if data.shape[0] < 2:
             raise ValueError("DPT data must contain at least two numeric points")
         if not np.isfinite(data).all():
@@ -238,20 +336,46 @@ class IRAnalyzer(BaseAnalyzer):
         title: str,
         output_path: str,
     ) -> None:
+        """Plot one spectrum on the batch template, swapping only data and title."""
+        key = tuple(getattr(self, name) for name in _SPECTRUM_STYLE_ATTRIBUTES)
+        template = self._templates.get(key, lambda: self._build_spectrum_template(plt))
+        fig, ax = template.figure, template.ax
+        try:
+            connectors, x, y = self._gap_traces(wavenumber, transmittance)
+            for line, segment in zip(template.artists["connectors"], connectors):
+                line.set_data(*(segment or ([], [])))
+            template.artists["curve"].set_data(*decimate_line(x, y))
+            template.artists["curve"].set_label(title)
+            ax.set_title(title, fontsize=self.title_font_size)
+            rescale(ax)
+            fig.tight_layout()
+            fig.savefig(
+                output_path,
+                dpi=FIGURE_DPI,
+                facecolor="none" if self.transparent_back else "white",
+                transparent=self.transparent_back,
+            )
+        except Exception:
+            self._templates.discard(key)
+            raise
+
+    def _build_spectrum_template(self, plt: Any) -> FigureTemplate:
         fig, ax = plt.subplots(figsize=(12, 5))
-        fig.patch.set_facecolor("white")
-        self._plot_with_gaps(ax, wavenumber, transmittance, color=self.curve_color, label=title)
-        self._style_axis(ax, title)
-        fig.tight_layout()
-        fig.savefig(
-            output_path,
-            dpi=FIGURE_DPI,
-            facecolor="none" if self.transparent_back else "white",
-            transparent=self.transparent_back,
+        try:
+            fig.patch.set_facecolor("white")
+            # One (possibly empty) dashed connector per gap, drawn before the curve
+            connectors = [
+                ax.plot([], [], **self._connector_style(self.curve_color))[0] for _gap in GAPS
+            ]
+            (curve,) = ax.plot([], [], color=self.curve_color, linewidth=self.line_width)
+            self._style_axis(ax, "")
+        finally:
+            plt.close(fig)
+        return FigureTemplate(
+            figure=fig, ax=ax, artists={"connectors": connectors, "curve": curve}
         )
-        plt.close(fig)
 
-    def plot_overlay(self, plt: Any, spectra: list[dict[str, Any]], output_path: str) -> None:
+    def plot_overlay(self, plt: Any, matrix: SpectralMatrix, output_path: str) -> None:
         fig, ax = plt.subplots(figsize=(14, 6))
         fig.patch.set_facecolor("white")
         colors: list[Any] = [
@@ -266,26 +390,29 @@ class IRAnalyzer(BaseAnalyzer):
             "#BCBD22",
             "#17BECF",
         ]
-        if len(spectra) > len(colors):
+        if len(matrix) > len(colors):
             colors.extend(
-                plt.cm.tab20(np.linspace(0, 1, len(spectra) - len(colors)))
+                plt.cm.tab20(np.linspace(0, 1, len(matrix) - len(colors)))
             )
 
-        for spectrum, color in zip(spectra, colors[: len(spectra)]):
-            wavenumber = spectrum["wavenumber"]
-            transmittance = spectrum["transmittance"]
-            if self.normalize_overlay:
-                transmittance = self.normalize_to_peak(
-                    wavenumber,
-                    transmittance,
-                    center=self.normalization_peak,
-                )
-            self._plot_with_gaps(
-                ax,
-                wavenumber,
-                transmittance,
+        if self.normalize_overlay:
+            values = matrix.normalized_transmittance(
+                self.normalization_peak, NORMALIZATION_WINDOW, NORMALIZATION_TARGET_ABSORBANCE
+            )
+        else:
+            values = matrix.transmittance()
+        connectors = matrix.gap_connectors(values, GAPS)
+        values[:, matrix.gap_columns(GAPS)] = np.nan
+
+        for row, (name, color) in enumerate(zip(matrix.names, colors)):
+            for has_connector, x, y in connectors:
+                if has_connector[row]:
+                    ax.plot(x[row], y[row], **self._connector_style(color))
+            ax.plot(
+                *decimate_line(matrix.wavenumber, values[row]),
                 color=color,
-                label=spectrum["name"],
+                linewidth=self.line_width,
+                label=name,
             )
 
         title = "红外光谱对比 (DPT 样品)"
@@ -302,18 +429,18 @@ class IRAnalyzer(BaseAnalyzer):
         )
         plt.close(fig)
 
-    def _plot_with_gaps(
-        self,
-        ax: Any,
-        wavenumber: np.ndarray,
-        transmittance: np.ndarray,
-        *,
-        color: Any,
-        label: str,
-    ) -> None:
+    @staticmethod
+    def _gap_traces(
+        wavenumber: np.ndarray, transmittance: np.ndarray
+    ) -> tuple[list[Optional[tuple[list[float], list[float]]]], np.ndarray, np.ndarray]:
+        """Split a spectrum into per-gap dashed connectors and the NaN-gapped curve.
+
+        Connectors are ``None`` for gaps without data on both sides.
+        """
         x = wavenumber.astype(float).copy()
         y = transmittance.astype(float).copy()
         gap_mask = np.zeros_like(x, dtype=bool)
+        connectors: list[Optional[tuple[list[float], list[float]]]] = []
 
         for start, end in GAPS:
             low, high = sorted((start, end))
@@ -324,17 +451,22 @@ class IRAnalyzer(BaseAnalyzer):
             if below.size and above.size:
                 below_idx = below[np.argmax(x[below])]
                 above_idx = above[np.argmin(x[above])]
-                ax.plot(
-                    [x[above_idx], x[below_idx]],
-                    [y[above_idx], y[below_idx]],
-                    color=color,
-                    linewidth=self.line_width * 0.85,
-                    linestyle=(0, (5, 5)),
-                    alpha=0.75,
+                connectors.append(
+                    ([x[above_idx], x[below_idx]], [y[above_idx], y[below_idx]])
                 )
+            else:
+                connectors.append(None)
 
         y[gap_mask] = np.nan
-        ax.plot(x, y, color=color, linewidth=self.line_width, label=label)
+        return connectors, x, y
+
+    def _connector_style(self, color: Any) -> dict[str, Any]:
+        return {
+            "color": color,
+            "linewidth": self.line_width * 0.85,
+            "linestyle": (0, (5, 5)),
+            "alpha": 0.75,
+        }
 
     def _style_axis(self, ax: Any, title: str) -> None:
         ax.set_xlim(4000, 400)
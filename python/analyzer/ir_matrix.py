@@ -0,0 +1,190 @@
+"""
+IR spectra on one shared wavenumber grid.
+
+``SpectralMatrix`` resamples a batch of spectra onto a common grid and keeps
+their absorbance as an N × M ``float32`` matrix (NaN where a spectrum does not
+cover the grid). Transmittance conversion, peak normalization and gap masking
+then run as whole-matrix NumPy operations instead of one spectrum at a time.
+
+When every spectrum already shares the same wavenumber axis (the usual case
+for one instrument) that axis is the grid and no interpolation happens.
+Otherwise the grid spans all spectra at the finest median point spacing found
+in the batch, capped at ``MAX_GRID_POINTS``.
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+import numpy as np
+
+MAX_GRID_POINTS = 65536
+# Absorbance is capped here, matching ``np.clip(transmittance, 0.01, None)``
+MAX_ABSORBANCE = 4.0
+
+MATRIX_FILENAME = "dpt_matrix.npy"
+WAVENUMBER_FILENAME = "dpt_wavenumber.npy"
+NAMES_FILENAME = "dpt_names.npy"
+
+
+def gap_mask(wavenumber: np.ndarray, gaps: Sequence[tuple[float, float]]) -> np.ndarray:
+    """Boolean mask of ``wavenumber`` points inside any of ``gaps``."""
+    mask = np.zeros(np.shape(wavenumber), dtype=bool)
+    for start, end in gaps:
+        low, high = sorted((start, end))
+        mask |= (wavenumber >= low) & (wavenumber <= high)
+    return mask
+
+
+def common_grid(
+    wavenumbers: Sequence[np.ndarray], max_points: int = MAX_GRID_POINTS
+) -> np.ndarray:
+    """Shared wavenumber axis for ``wavenumbers`` (descending unless all share one axis)."""
+    if not wavenumbers:
+        raise ValueError("At least one spectrum is required")
+    first = np.asarray(wavenumbers[0], dtype=np.float64)
+    if all(np.array_equal(first, w) for w in wavenumbers[1:]):
+        return first.copy()
+
+    low = min(float(np.min(w)) for w in wavenumbers)
+    high = max(float(np.max(w)) for w in wavenumbers)
+    steps = [np.median(np.abs(np.diff(w))) for w in wavenumbers if len(w) > 1]
+    step = min((s for s in steps if s > 0), default=high - low)
+    points = int(round((high - low) / step)) + 1 if step > 0 else 2
+    return np.linspace(high, low, max(2, min(max_points, points)))
+
+
+@dataclass
+class SpectralMatrix:
+    """Absorbance of N spectra sampled on a shared M-point wavenumber grid."""
+
+    names: list[str]
+    wavenumber: np.ndarray
+    absorbance: np.ndarray
+
+    @classmethod
+    def from_spectra(
+        cls,
+        names: Sequence[str],
+        wavenumbers: Sequence[np.ndarray],
+        absorbances: Sequence[np.ndarray],
+        *,
+        max_points: int = MAX_GRID_POINTS,
+    ) -> "SpectralMatrix":
+        if not (len(names) == len(wavenumbers) == len(absorbances)):
+            raise ValueError("names, wavenumbers and absorbances must have the same length")
+        grid = common_grid(wavenumbers, max_points)
+        matrix = np.empty((len(names), grid.size), dtype=np.float32)
+        for row, (wavenumber, absorbance) in enumerate(zip(wavenumbers, absorbances)):
+            if np.array_equal(wavenumber, grid):
+                matrix[row] = absorbance
+                continue
+            order = np.argsort(wavenumber, kind="stable")
+            matrix[row] = np.interp(
+                grid, wavenumber[order], absorbance[order], left=np.nan, right=np.nan
+            )
+        return cls(names=list(names), wavenumber=grid, absorbance=matrix)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def transmittance(self) -> np.ndarray:
+        """Transmittance (%) of every spectrum, ``10 ** (2 - A)``."""
+        with np.errstate(over="ignore"):
+            transmittance = np.power(np.float32(10.0), 2.0 - self.absorbance, dtype=np.float32)
+        self._check_finite(transmittance, "Transmittance calculation produced non-finite values")
+        return transmittance
+
+    def normalized_transmittance(
+        self, center: float, window: float, target_absorbance: float
+    ) -> np.ndarray:
+        """Scale each spectrum's absorbance so its strongest peak near ``center``
+        reaches ``target_absorbance`` (see ``IRAnalyzer.normalize_to_peak``)."""
+        absorbance = np.minimum(self.absorbance, np.float32(MAX_ABSORBANCE))
+        in_window = (self.wavenumber >= center - window) & (self.wavenumber <= center + window)
+        window_values = absorbance[:, in_window]
+        covered = np.isfinite(window_values)
+        peaks = np.where(covered, window_values, -np.inf).max(axis=1, initial=-np.inf)
+
+        missing = ~covered.any(axis=1)
+        if missing.any():
+            raise ValueError(
+                f"No spectrum data found near the {center:g} cm^-1 normalization peak "
+                f"in {self.names[int(np.argmax(missing))]}"
+            )
+        invalid = ~(peaks > 0)
+        if invalid.any():
+            raise ValueError(
+                f"No valid absorbance peak found near {center:g} cm^-1 "
+                f"in {self.names[int(np.argmax(invalid))]}"
+            )
+
+        scale = (np.float32(target_absorbance) / peaks.astype(np.float32))[:, None]
+        with np.errstate(over="ignore"):
+            normalized = np.power(np.float32(10.0), 2.0 - absorbance * scale, dtype=np.float32)
+        self._check_finite(normalized, "Peak normalization produced non-finite values")
+        return normalized
+
+    def gap_columns(self, gaps: Sequence[tuple[float, float]]) -> np.ndarray:
+        """Boolean mask of grid columns inside any of ``gaps``."""
+        return gap_mask(self.wavenumber, gaps)
+
+    def gap_connectors(
+        self, values: np.ndarray, gaps: Sequence[tuple[float, float]]
+    ) -> list[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """Dashed-connector end points bridging each gap, per spectrum.
+
+        Returns one ``(has_connector, x, y)`` triple per gap; ``x`` and ``y`` are
+        N × 2 arrays ordered (above the gap, below the gap), and rows without
+        data on both sides have ``has_connector`` False.
+        """
+        rows = np.arange(len(self))
+        connectors = []
+        for start, end in gaps:
+            low, high = sorted((start, end))
+            below = np.flatnonzero(self.wavenumber < low)
+            above = np.flatnonzero(self.wavenumber > high)
+            below_ok = np.isfinite(values[:, below])
+            above_ok = np.isfinite(values[:, above])
+            has_connector = below_ok.any(axis=1) & above_ok.any(axis=1)
+            if not has_connector.any():
+                connectors.append((has_connector, np.empty((len(self), 2)), np.empty((len(self), 2))))
+                continue
+            # Closest finite column on each side of the gap
+            below_col = below[np.argmax(np.where(below_ok, self.wavenumber[below], -np.inf), axis=1)]
+            above_col = above[np.argmin(np.where(above_ok, self.wavenumber[above], np.inf), axis=1)]
+            x = np.stack((self.wavenumber[above_col], self.wavenumber[below_col]), axis=1)
+            y = np.stack((values[rows, above_col], values[rows, below_col]), axis=1)
+            connectors.append((has_connector, x, y))
+        return connectors
+
+    def save(self, directory: str) -> list[str]:
+        """Write the matrix, grid and names as ``.npy`` files; returns their paths."""
+        paths = [
+            os.path.join(directory, MATRIX_FILENAME),
+            os.path.join(directory, WAVENUMBER_FILENAME),
+            os.path.join(directory, NAMES_FILENAME),
+        ]
+        np.save(paths[0], self.absorbance, allow_pickle=False)
+        np.save(paths[1], self.wavenumber, allow_pickle=False)
+        np.save(paths[2], np.array(self.names, dtype=str), allow_pickle=False)
+        return paths
+
+    @classmethod
+    def load(cls, directory: str, mmap_mode: Optional[str] = "r") -> "SpectralMatrix":
+        """Load a matrix written by :meth:`save` (memory-mapped by default)."""
+        return cls(
+            names=np.load(os.path.join(directory, NAMES_FILENAME), allow_pickle=False).tolist(),
+            wavenumber=np.load(os.path.join(directory, WAVENUMBER_FILENAME), allow_pickle=False),
+            absorbance=np.load(
+                os.path.join(directory, MATRIX_FILENAME), mmap_mode=mmap_mode, allow_pickle=False
+            ),
+        )
+
+    def _check_finite(self, values: np.ndarray, message: str) -> None:
+        # NaN marks grid points a spectrum does not cover; only covered cells must be finite
+        covered = ~np.isnan(self.absorbance)
+        if not np.isfinite(values[covered]).all():
+            raise ValueError(message)
@@ -0,0 +1,415 @@
+"""
+Similarity search over a library of IR spectra.
+
+Each ``.dpt`` file of a reference directory is reduced to one feature vector:
+its transmittance is peak-normalized (``IRAnalyzer.normalize_to_peak``),
+resampled onto the fixed ``INDEX_GRID`` and turned into absorption depth
+``1 - T/100``, with the ``GAPS`` bands and uncovered grid points set to zero.
+The vectors are stored L2-normalized as one ``float32`` matrix, so a query is
+a single matrix-vector product followed by a partial top-k selection.
+
+The index lives under ``<data root>/IR_index/<key>-<peak>`` (one per
+reference directory and normalization peak) and is kept in step with the directory incrementally: files are
+matched by ``file_identity``, so only new or changed spectra are re-read and
+deleted ones are dropped.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+from .base import get_install_dir, logger
+from .cancellation import CancellationToken
+from .dataset_cache import file_identity
+from .ir import (
+    DEFAULT_NORMALIZATION_PEAK,
+    GAPS,
+    IRAnalyzer,
+    NORMALIZATION_TARGET_ABSORBANCE,
+    NORMALIZATION_WINDOW,
+)
+from .ir_matrix import gap_mask
+from .parallel import resolve_worker_count, run_ordered
+
+# Bump when the feature definition or the on-disk layout changes
+INDEX_VERSION = 1
+# 4 cm^-1 steps over the mid-IR range, descending like the DPT exports
+INDEX_GRID = np.linspace(4000.0, 400.0, 901)
+SEARCH_METRICS: tuple[str, ...] = ("correlation", "cosine")
+DEFAULT_TOP_K = 10
+
+INDEX_DIRNAME = "IR_index"
+FEATURES_FILENAME = "features.npy"
+SUMS_FILENAME = "sums.npy"
+META_FILENAME = "index.json"
+
+_GAP_COLUMNS = gap_mask(INDEX_GRID, GAPS)
+_EPS = 1e-12
+
+
+def spectrum_features(
+    wavenumber: np.ndarray,
+    absorbance: np.ndarray,
+    normalization_peak: float = DEFAULT_NORMALIZATION_PEAK,
+) -> np.ndarray:
+    """Unit-length ``float32`` feature vector of one spectrum on ``INDEX_GRID``.
+
+    Spectra without a usable peak near ``normalization_peak`` are indexed
+    without normalization; cosine and correlation are scale-invariant, so they
+    remain comparable as long as their absorbance stays moderate.
+    """
+    transmittance = IRAnalyzer.absorbance_to_transmittance(absorbance)
+    try:
+        transmittance = IRAnalyzer.normalize_to_peak(
+            wavenumber,
+            transmittance,
+            center=normalization_peak,
+            window=NORMALIZATION_WINDOW,
+            target_absorbance=NORMALIZATION_TARGET_ABSORBANCE,
+        )
+    except ValueError as exc:
+        logger.debug(f"光谱未归一化，按原始透过率建立特征: {exc}")
+
+    order = np.argsort(wavenumber, kind="stable")
+    resampled = np.interp(
+        INDEX_GRID, wavenumber[order], transmittance[order], left=np.nan, right=np.nan
+    )
+    depth = 1.0 - resampled / 100.0
+    depth[_GAP_COLUMNS | np.isnan(depth)] = 0.0
+    norm = float(np.linalg.norm(depth))
+    if norm > _EPS:
+        depth /= norm
+    return depth.astype(np.float32)
+
+
+def load_features(path: str, normalization_peak: float = DEFAULT_NORMALIZATION_PEAK) -> np.ndarray:
+    """``spectrum_features`` of the ``.dpt`` file at ``path``."""
+    wavenumber, absorbance = IRAnalyzer.load_dpt(path)
+    return spectrum_features(wavenumber, absorbance, normalization_peak)
+
+
+def _features_task(path: str, normalization_peak: float) -> tuple[Optional[np.ndarray], Optional[str]]:
+    """Pool worker: features of one file, or the reason it cannot be indexed."""
+    try:
+        return load_features(path, normalization_peak), None
+    except (OSError, ValueError) as exc:
+        return None, str(exc)
+
+
+def index_dir_for(datadir: str, normalization_peak: float = DEFAULT_NORMALIZATION_PEAK) -> str:
+    """Default index location for ``datadir`` normalized at ``normalization_peak``.
+
+    The stored features depend on the peak, so each peak gets its own directory.
+    """
+    key = hashlib.sha256(os.path.realpath(datadir).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(get_install_dir(), INDEX_DIRNAME, f"{key}-{normalization_peak:g}")
+
+
+def _validate_peak(normalization_peak: Any) -> float:
+    if isinstance(normalization_peak, bool):
+        raise ValueError("normalization_peak must be a number")
+    try:
+        value = float(normalization_peak)
+    except (TypeError, ValueError) as exc:
+        raise ValueError("normalization_peak must be a number") from exc
+    if not np.isfinite(value) or not 400 <= value <= 4000:
+        raise ValueError("normalization_peak must be between 400 and 4000 cm^-1")
+    return value
+
+
+def _list_dpt_files(datadir: str) -> list[str]:
+    return sorted(
+        (
+            name
+            for name in os.listdir(datadir)
+            if name.lower().endswith(".dpt") and os.path.isfile(os.path.join(datadir, name))
+        ),
+        key=str.lower,
+    )
+
+
+def _save_array(path: str, values: np.ndarray) -> None:
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".npy", dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            np.save(handle, values, allow_pickle=False)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class SpectralIndex:
+    """Persistent top-k similarity index over the ``.dpt`` files of one directory."""
+
+    def __init__(
+        self,
+        datadir: str,
+        normalization_peak: float = DEFAULT_NORMALIZATION_PEAK,
+        index_dir: Optional[str] = None,
+    ) -> None:
+        if not isinstance(datadir, str) or not os.path.isdir(datadir):
+            raise ValueError("datadir must be an existing directory")
+        self.datadir = os.path.realpath(datadir)
+        self.normalization_peak = _validate_peak(normalization_peak)
+        self.index_dir = index_dir or index_dir_for(self.datadir, self.normalization_peak)
+        self.files: list[str] = []
+        self.identities: list[list[int]] = []
+        # Files that could not be parsed, kept so they are not re-read until they change
+        self.skipped: dict[str, dict[str, Any]] = {}
+        self.features = np.empty((0, INDEX_GRID.size), dtype=np.float32)
+        self.sums = np.empty(0, dtype=np.float64)
+        self._lock = threading.RLock()
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    def _load(self) -> None:
+        """Read the stored index; anything stale or inconsistent starts empty."""
+        try:
+            with open(os.path.join(self.index_dir, META_FILENAME), "r", encoding="utf-8") as handle:
+                meta = json.load(handle)
+            features = np.load(os.path.join(self.index_dir, FEATURES_FILENAME), allow_pickle=False)
+            sums = np.load(os.path.join(self.index_dir, SUMS_FILENAME), allow_pickle=False)
+        except (OSError, ValueError):
+            return
+
+        entries = meta.get("entries", [])
+        if (
+            meta.get("version") != INDEX_VERSION
+            or meta.get("datadir") != self.datadir
+            or meta.get("normalization_peak") != self.normalization_peak
+            or meta.get("grid") != [INDEX_GRID[0], INDEX_GRID[-1], INDEX_GRID.size]
+            or features.dtype != np.float32
+            or features.shape != (len(entries), INDEX_GRID.size)
+            or sums.shape != (len(entries),)
+        ):
+            logger.debug(f"光谱索引已过期，将重新建立: {self.index_dir}")
+            return
+        self.files = [entry["file"] for entry in entries]
+        self.identities = [list(entry["identity"]) for entry in entries]
+        self.skipped = dict(meta.get("skipped", {}))
+        self.features = features
+        self.sums = sums.astype(np.float64)
+
+    def save(self) -> None:
+        """Write the index; ``index.json`` is replaced last so readers never see a torn index."""
+        with self._lock:
+            os.makedirs(self.index_dir, exist_ok=True)
+            _save_array(os.path.join(self.index_dir, FEATURES_FILENAME), self.features)
+            _save_array(os.path.join(self.index_dir, SUMS_FILENAME), self.sums)
+            meta = {
+                "version": INDEX_VERSION,
+                "datadir": self.datadir,
+                "normalization_peak": self.normalization_peak,
+                "grid": [INDEX_GRID[0], INDEX_GRID[-1], INDEX_GRID.size],
+                "entries": [
+                    {"file": name, "identity": identity}
+                    for name, identity in zip(self.files, self.identities)
+                ],
+                "skipped": self.skipped,
+            }
+            meta_path = os.path.join(self.index_dir, META_FILENAME)
+            fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=self.index_dir)
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                    json.dump(meta, handle, ensure_ascii=False)
+                os.replace(tmp_path, meta_path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+    def sync(
+        self,
+        jobs: Optional[int] = None,
+        progress_callback: Optional[Callable[[float, str], None]] = None,
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> dict[str, Any]:
+        """Bring the index in line with the directory and save it if anything changed.
+
+        Returns counts of ``added`` and ``removed`` rows plus the files that
+        could not be indexed (``skipped``, name -> error).
+        """
+        with self._lock:
+            identities: dict[str, list[int]] = {}
+            for name in _list_dpt_files(self.datadir):
+                try:
+                    identities[name] = list(file_identity(os.path.join(self.datadir, name)))
+                except OSError:
+                    continue
+
+            keep = np.array(
+                [identities.get(name) == identity for name, identity in zip(self.files, self.identities)],
+                dtype=bool,
+            )
+            removed = int(keep.size - np.count_nonzero(keep))
+            skipped = {
+                name: entry
+                for name, entry in self.skipped.items()
+                if identities.get(name) == entry["identity"]
+            }
+            known = {name for name, kept in zip(self.files, keep) if kept} | set(skipped)
+            pending = [name for name in identities if name not in known]
+            changed = removed > 0 or len(skipped) != len(self.skipped) or bool(pending)
+
+            if removed:
+                self.files = [name for name, kept in zip(self.files, keep) if kept]
+                self.identities = [identity for identity, kept in zip(self.identities, keep) if kept]
+                self.features = self.features[keep]
+                self.sums = self.sums[keep]
+
+            added = 0
+            if pending:
+                done = 0
+
+                def on_done(_index: int, _result: Any) -> None:
+                    nonlocal done
+                    done += 1
+                    if progress_callback:
+                        progress_callback(done / len(pending), f"Indexed {done}/{len(pending)} spectra")
+
+                results = run_ordered(
+                    _features_task,
+                    [(os.path.join(self.datadir, name), self.normalization_peak) for name in pending],
+                    workers=resolve_worker_count(jobs, len(pending)),
+                    on_done=on_done,
+                    cancel_token=cancel_token,
+                )
+                rows = []
+                for name, (features, error) in zip(pending, results):
+                    if features is None:
+                        logger.warning(f"跳过无效 DPT 数据 {name}: {error}", show_ui=False)
+                        skipped[name] = {"identity": identities[name], "error": error}
+                        continue
+                    self.files.append(name)
+                    self.identities.append(identities[name])
+                    rows.append(features)
+                if rows:
+                    block = np.vstack(rows)
+                    self.features = np.concatenate((self.features, block))
+                    self.sums = np.concatenate((self.sums, block.sum(axis=1, dtype=np.float64)))
+                    added = len(rows)
+
+            self.skipped = skipped
+            if changed:
+                self.save()
+            return {
+                "added": added,
+                "removed": removed,
+                "skipped": {name: entry["error"] for name, entry in skipped.items()},
+            }
+
+    def query(
+        self,
+        features: np.ndarray,
+        top_k: int = DEFAULT_TOP_K,
+        metric: str = "correlation",
+    ) -> list[dict[str, Any]]:
+        """Best ``top_k`` matches of a ``spectrum_features`` vector, best first."""
+        if metric not in SEARCH_METRICS:
+            raise ValueError(f"metric must be one of: {', '.join(SEARCH_METRICS)}")
+        if isinstance(top_k, bool) or not isinstance(top_k, int) or top_k < 1:
+            raise ValueError("top_k must be a positive integer")
+        query = np.asarray(features, dtype=np.float32)
+        if query.shape != (INDEX_GRID.size,):
+            raise ValueError(f"query features must have {INDEX_GRID.size} points")
+
+        with self._lock:
+            if not self.files:
+                return []
+            scores = self.scores(query, metric)
+            files = list(self.files)
+
+        k = min(top_k, scores.size)
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [{"file": files[row], "score": float(scores[row])} for row in best]
+
+    def scores(self, query: np.ndarray, metric: str = "correlation") -> np.ndarray:
+        """Similarity of ``query`` to every indexed spectrum."""
+        norm = float(np.linalg.norm(query))
+        if norm <= _EPS:
+            return np.zeros(len(self.files))
+        query = query / np.float32(norm)
+        dots = (self.features @ query).astype(np.float64)
+        if metric == "cosine":
+            return np.clip(dots, -1.0, 1.0)
+
+        # Pearson correlation from the same product: rows and query are unit
+        # vectors, so centering only needs their element sums.
+        size = INDEX_GRID.size
+        query_sum = float(query.sum(dtype=np.float64))
+        query_centered = np.sqrt(max(1.0 - query_sum * query_sum / size, 0.0))
+        row_centered = np.sqrt(np.clip(1.0 - self.sums * self.sums / size, 0.0, None))
+        denominator = row_centered * query_centered
+        with np.errstate(divide="ignore", invalid="ignore"):
+            correlation = (dots - self.sums * query_sum / size) / denominator
+        return np.where(denominator > _EPS, np.clip(correlation, -1.0, 1.0), 0.0)
+
+
+_OPEN_INDEXES: dict[tuple[str, float], SpectralIndex] = {}
+_OPEN_INDEXES_LOCK = threading.Lock()
+
+
+def open_index(
+    datadir: str,
+    normalization_peak: float = DEFAULT_NORMALIZATION_PEAK,
+) -> SpectralIndex:
+    """Index of ``datadir``, kept in memory so a long-lived process loads it once."""
+    peak = _validate_peak(normalization_peak)
+    if not isinstance(datadir, str) or not os.path.isdir(datadir):
+        raise ValueError("datadir must be an existing directory")
+    key = (index_dir_for(datadir, peak), peak)
+    with _OPEN_INDEXES_LOCK:
+        index = _OPEN_INDEXES.get(key)
+        if index is None:
+            index = SpectralIndex(datadir, peak, index_dir=key[0])
+            _OPEN_INDEXES[key] = index
+        return index
+
+
+def search(
+    datadir: str,
+    query_path: str,
+    *,
+    top_k: int = DEFAULT_TOP_K,
+    metric: str = "correlation",
+    normalization_peak: float = DEFAULT_NORMALIZATION_PEAK,
+    refresh: bool = True,
+    jobs: Optional[int] = None,
+    progress_callback: Optional[Callable[[float, str], None]] = None,
+    cancel_token: Optional[CancellationToken] = None,
+) -> dict[str, Any]:
+    """Rank the spectra of ``datadir`` by similarity to the file ``query_path``."""
+    if metric not in SEARCH_METRICS:
+        raise ValueError(f"metric must be one of: {', '.join(SEARCH_METRICS)}")
+    if isinstance(top_k, bool) or not isinstance(top_k, int) or top_k < 1:
+        raise ValueError("top_k must be a positive integer")
+    if not isinstance(refresh, bool):
+        raise ValueError("refresh must be a boolean")
+    if (
+        not isinstance(query_path, str)
+        or not query_path.lower().endswith(".dpt")
+        or not os.path.isfile(query_path)
+    ):
+        raise ValueError("query must be an existing .dpt file")
+
+    index = open_index(datadir, normalization_peak)
+    changes = {"added": 0, "removed": 0, "skipped": {}}
+    if refresh:
+        changes = index.sync(jobs=jobs, progress_callback=progress_callback, cancel_token=cancel_token)
+    features = load_features(query_path, index.normalization_peak)
+    return {
+        "index": {"path": index.index_dir, "entries": len(index), **changes},
+        "matches": index.query(features, top_k=top_k, metric=metric),
+    }
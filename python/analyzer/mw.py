@@ -5,10 +5,13 @@ Extracted from the monolithic main.py for the v2 refactoring.
 All Streamlit dependencies have been removed; UI display is handled externally.
 """
 
+import csv
 import os
 import re
 import shutil
-from typing import Any, Callable, Dict, List, Optional, Tuple
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, TextIO, Tuple
 
 import numpy as np
 import pandas as pd
@@ -26,24 +29,71 @@ from .base import (
     GRIDSPEC_ROWS,
     get_install_dir,
     GRIDSPEC_COLS,
-    MW_DATA_OFFSET,
     NORM_COLUMN_INDEX,
     MW_COLUMN_INDEX,
     MIN_PEAK_COLUMNS,
     MIN_MW_DATA_COLUMNS,
     NORM_SCALE_FACTOR,
-    PERCENTAGE_FACTOR,
     BAR_POSITION_WEIGHT_LEFT,
     BAR_POSITION_WEIGHT_RIGHT,
     replace_directories_atomically,
     resolve_contained_file,
     stage_output_directory,
 )
-from .plotting import configure_plotting
+from .cancellation import CancellationToken
+from .dataset_cache import file_identity
+from .mw_segments import segment_percentage_matrix, segment_percentages
+from .parallel import resolve_parse_workers, resolve_worker_count, run_ordered
+from .plotting import FigureTemplate, FigureTemplates, configure_plotting, rescale
 
 
 _INVALID_FILENAME_CHARS = re.compile(r'[<>:"/\\|?*]')
 
+# 渲染单张分子量分布图所需的全部分析器属性（传给渲染工作进程）
+_RENDER_ATTRIBUTES: Tuple[str, ...] = (
+    "output_dir",
+    "save_picture",
+    "bar_color",
+    "mw_color",
+    "transparent_back",
+    "bar_width",
+    "line_width",
+    "axis_width",
+    "title_font_size",
+    "axis_font_size",
+    "draw_bar",
+    "draw_mw",
+    "draw_table",
+    "segmentpos",
+    "selectedpos",
+    "segmentnum",
+)
+
+# 只影响曲线图层（曲线、坐标轴样式、统计表）的属性；其余属性变化时曲线图层可复用
+_CURVE_STYLE_ATTRIBUTES: Tuple[str, ...] = (
+    "mw_color",
+    "transparent_back",
+    "line_width",
+    "axis_width",
+    "title_font_size",
+    "axis_font_size",
+    "draw_mw",
+    "draw_table",
+)
+
+# 决定单样品分布图模板外观的属性（另加分割位置）；批量绘图时逐样品只替换数据
+_TEMPLATE_STYLE_ATTRIBUTES: Tuple[str, ...] = _CURVE_STYLE_ATTRIBUTES + (
+    "draw_bar",
+    "bar_color",
+    "bar_width",
+)
+
+# 增量模式下最多保留的曲线图层数（每层是一张完整的 matplotlib Figure）
+MAX_RETAINED_CURVE_LAYERS: int = 8
+
+# 渲染工作进程内的分析器实例（由 _init_render_worker 在每个子进程中创建一次）
+_RENDER_WORKER: Optional["MolecularWeightAnalyzer"] = None
+
 
 def _sanitize_sample_filename(name: str) -> str:
     """Make a sample name safe for use as an output filename."""
@@ -51,6 +101,147 @@ def _sanitize_sample_filename(name: str) -> str:
     return cleaned or "sample"
 
 
+@dataclass
+class MwSample:
+    """一张分子量分布图的输入数据（解析阶段产出，可跨进程传递给渲染阶段）。"""
+
+    filename: str
+    title_name: str
+    norm: np.ndarray
+    mw: np.ndarray
+    mw_data: List[List[str]] = field(default_factory=list)
+    # 样品所在的输入文件名（Excel 文件含多个样品）
+    source_file: str = ""
+
+
+@dataclass
+class MwCurveLayer:
+    """一张分布图中与分割位置无关的部分，增量重绘时原样保留。
+
+    ``segment_artists`` 是上一次绘制的柱状图与区间分布表，重绘前移除。
+    """
+
+    figure: Any
+    ax: Any
+    gs: Any
+    segment_artists: List[Any] = field(default_factory=list)
+
+
+class MwRenderSession:
+    """侧车进程内最近一次 Mw 分析的状态，供下一次请求增量重绘。
+
+    - 输入文件未变化（路径与 ``file_identity`` 均一致）时直接复用样品数据，跳过解析；
+    - 曲线样式也未变化时复用曲线图层，只重算区间百分比并重绘柱状图与分布表。
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.inputs: Optional[Tuple[Any, ...]] = None
+        self.samples: List[MwSample] = []
+        self.curve_style: Optional[Tuple[Any, ...]] = None
+        self.layers: List[Optional[MwCurveLayer]] = []
+
+    def reusable_samples(self, inputs: Optional[Tuple[Any, ...]]) -> Optional[List[MwSample]]:
+        """输入与上次一致时返回上次的样品数据，否则返回 None。"""
+        if inputs is None or inputs != self.inputs or not self.samples:
+            return None
+        return self.samples
+
+    def remember_samples(self, inputs: Optional[Tuple[Any, ...]], samples: List[MwSample]) -> None:
+        """记录新解析的样品数据，丢弃旧的曲线图层。"""
+        self.discard_layers()
+        self.inputs = inputs if samples else None
+        self.samples = samples if inputs is not None else []
+
+    def curve_layers(self, curve_style: Tuple[Any, ...]) -> List[Optional[MwCurveLayer]]:
+        """返回与 ``curve_style`` 匹配的曲线图层列表（与样品一一对应，未建的为 None）。"""
+        if curve_style != self.curve_style or len(self.layers) != len(self.samples):
+            self.discard_layers()
+            self.curve_style = curve_style
+            self.layers = [None] * len(self.samples)
+        return self.layers
+
+    def discard_layers(self) -> None:
+        self.layers = []
+        self.curve_style = None
+
+    def clear(self) -> None:
+        self.discard_layers()
+        self.inputs = None
+        self.samples = []
+
+
+_MW_SESSION = MwRenderSession()
+
+
+def get_mw_session() -> MwRenderSession:
+    """Return the process-wide incremental MW render session."""
+    return _MW_SESSION
+
+
+def _init_render_worker(data_path: str, state: Dict[str, Any]) -> None:
+    """Process-pool initializer: build one configured renderer per worker."""
+    global _RENDER_WORKER
+    worker = MolecularWeightAnalyzer(data_path)
+    vars(worker).update(state)
+    worker._plt = configure_plotting()
+    _RENDER_WORKER = worker
+
+
+def render_mw_sample(sample: MwSample) -> str:
+    """Render one sample in a worker process; returns an error message or ``""``."""
+    if _RENDER_WORKER is None:
+        raise RuntimeError("MW render worker is not initialized")
+    return _RENDER_WORKER._render_sample(sample)
+
+
+@dataclass
+class MwFileSamples:
+    """单个输入文件解析出的全部样品（不依赖分析器实例状态，可跨进程传递）。"""
+
+    filename: str
+    samples: List[MwSample] = field(default_factory=list)
+    error: str = ""
+
+
+def collect_mw_file(data_path: str, filename: str) -> MwFileSamples:
+    """Read and preprocess one MW input on a throw-away analyzer.
+
+    Safe to call from worker processes; failures are reported through
+    ``MwFileSamples.error`` instead of raising.
+    """
+    parser = MolecularWeightAnalyzer(data_path, save_file=False, save_picture=False)
+    result = MwFileSamples(filename=filename)
+    parser.filename = filename
+    try:
+        result.samples = parser._collect_samples(filename)
+        if not result.samples:
+            result.error = "读取文件失败"
+    except Exception as e:
+        result.error = str(e) or type(e).__name__
+    return result
+
+
+# 统计表的固定列；其后每个分子量区间各占一列
+MW_STATS_COLUMNS: Tuple[str, ...] = ("file", "sample", "peak", "Mn", "Mw", "PDI")
+
+
+def segment_labels(boundaries: Sequence[int]) -> List[str]:
+    """区间列名，与 ``--ranges`` 的写法一致（如 ``0-5000``）。"""
+    return [f"{low}-{high}" for low, high in zip(boundaries[:-1], boundaries[1:])]
+
+
+def write_stats_csv(table: Dict[str, Any], stream: TextIO) -> None:
+    """将 :meth:`MolecularWeightAnalyzer.compute_statistics` 的结果写为 CSV。"""
+    writer = csv.writer(stream, lineterminator="\n")
+    writer.writerow(list(MW_STATS_COLUMNS) + table["segments"])
+    for row in table["rows"]:
+        writer.writerow(
+            [row[column] for column in MW_STATS_COLUMNS]
+            + ["{:.4f}".format(value) for value in row["percentages"]]
+        )
+
+
 class MolecularWeightAnalyzer(BaseAnalyzer):
     """分子量分布分析器 — 读取 .rst 或 GPC Excel 导出并生成 Mw 分布图。"""
 
@@ -73,8 +264,18 @@ class MolecularWeightAnalyzer(BaseAnalyzer):
         setting_name: str = DEFAULT_SETTING_NAME,
         test_mode: bool = False,
         progress_callback: Optional[Callable[[float, str], None]] = None,
+        jobs: Optional[int] = None,
+        incremental: bool = False,
+        cancel_token: Optional[CancellationToken] = None,
+        file_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
     ) -> None:
-        super().__init__(datadir, test_mode=test_mode, progress_callback=progress_callback)
+        super().__init__(
+            datadir,
+            test_mode=test_mode,
+            progress_callback=progress_callback,
+            cancel_token=cancel_token,
+            file_callback=file_callback,
+        )
         self.output_dir: str = os.path.join(os.path.dirname(self.data_path), "Mw_output")
         self.setting_dir: str = os.path.join(get_install_dir(), "setting")
         self.file_list: Optional[List[str]] = None
@@ -85,6 +286,8 @@ class MolecularWeightAnalyzer(BaseAnalyzer):
         self.mw: Optional[np.ndarray] = None
         self._plt: Any | None = None
         self._excel_sample: Any | None = None
+        # 按样式缓存的分布图模板，批量绘图时逐样品只替换数据
+        self._templates = FigureTemplates()
 
         # Settings manager
         default_setting: Dict[str, Any] = {
@@ -132,6 +335,10 @@ class MolecularWeightAnalyzer(BaseAnalyzer):
         self.test_mode: bool = test_mode
         self.save_file: bool = save_file
         self.save_picture: bool = save_picture
+        # 渲染进程数：None/0 表示按 CPU 核数自动选择，1 表示在当前进程串行渲染
+        self.jobs: Optional[int] = jobs
+        # 增量模式（侧车进程使用）：与上次请求比较，复用样品数据与曲线图层
+        self.incremental: bool = incremental
 
     # ------------------------------------------------------------------
     # Directory helpers
@@ -175,34 +382,6 @@ class MolecularWeightAnalyzer(BaseAnalyzer):
         """切换到指定的设置"""
         self.setting_name = settingname
 
-    # ------------------------------------------------------------------
-    # File I/O
-    # ------------------------------------------------------------------
-
-    def read_file(self, name: str) -> bool:
-        """读取数据文件"""
-        self.reset()
-        self.filename = name
-
-        try:
-            file_path = resolve_contained_file(self.data_path, name)
-            if os.path.splitext(name)[1].lower() in {".xls", ".xlsx"}:
-                from .excel_reader import parse_gpc_excel
-                self.excel_samples = parse_gpc_excel(file_path)
-                return True
-            with open(file_path, "r", encoding="ascii") as file:
-                self.lines = [line.strip() for line in file if line.strip()]
-            return True
-        except FileNotFoundError:
-            self.logger.error(f"文件未找到: {name}", show_ui=True)
-            return False
-        except UnicodeDecodeError:
-            self.logger.error(f"文件编码错误: {name}，请确保文件为ASCII编码", show_ui=True)
-            return False
-        except Exception as e:
-            self.logger.error(f"读取文件失败 {name}", show_ui=True, exception=e)
-            return False
-
     # ------------------------------------------------------------------
     # Preprocessing
     # ------------------------------------------------------------------
@@ -215,42 +394,29 @@ class MolecularWeightAnalyzer(BaseAnalyzer):
             self._prepare_excel_sample(self._excel_sample)
             return
 
-        mw_start, mw_end, slice_table_start = self.preprocess_common()
+        self.preprocess_common()
+        data = self.rst_data
+        assert data is not None
 
         # 整理分子量数据
-        for line in self.lines[mw_start + MW_DATA_OFFSET:mw_end]:
-            parts = line.split("\t")
-            if len(parts) > 1:
-                self.mw_data.append([self.sample_name] + parts[1:])
+        self.mw_data.extend(data.mw_rows())
 
         if not self.mw_data:
             raise ValueError("未找到分子量数据")
 
         self.peak_num = len(self.mw_data)
 
-        # 提取峰数据
-        current_peak: List[List[str]] = []
+        # 提取峰数据（已由 rst_parser 转换为 float64 数组）
         all_peaks: List[np.ndarray] = []
-        for line in self.lines[slice_table_start + 1:]:
-            if ("Peak" in line and len(current_peak) > 1) or "</Slice_Table>" in line:
-                try:
-                    peak_array = np.array(current_peak[1:], dtype="float")
-                    if peak_array.shape[0] > 0 and peak_array.shape[1] > MIN_PEAK_COLUMNS:
-                        self.norm = peak_array[:, NORM_COLUMN_INDEX]
-                        self.mw = peak_array[:, MW_COLUMN_INDEX]
-                        all_peaks.append(peak_array)
-                    else:
-                        self.logger.warning("峰数据格式不正确，跳过该峰")
-                except (ValueError, IndexError) as e:
-                    self.logger.warning(f"峰数据转换失败: {e}")
-                current_peak = []
-                continue
-            if "RT" in line:
-                continue
-            line_parts = line.split("\t")[:-1]
-            if line_parts and "-2" in line_parts[0]:
-                continue
-            current_peak.append(line_parts)
+        for peak_array in data.peaks:
+            if peak_array.shape[0] > 0 and peak_array.shape[1] > MIN_PEAK_COLUMNS:
+                self.norm = peak_array[:, NORM_COLUMN_INDEX]
+                self.mw = peak_array[:, MW_COLUMN_INDEX]
+                all_peaks.append(peak_array)
+            else:
+                self.logger.warning("峰数据格式不正确，跳过该峰")
+        for error in data.peak_errors:
+            self.logger.warning(f"峰数据转换失败: {error}")
 
         if not all_peaks:
             raise ValueError("未找到有效的峰数据")
@@ -317,16 +483,10 @@ class MolecularWeightAnalyzer(BaseAnalyzer):
             raise ValueError("至少需要2个分割位置")
 
     def _calculate_segment_percentages(self) -> List[float]:
-        """计算各分子量区间的百分比"""
-        segment_percentages: List[float] = []
-        for segment_idx in range(len(self.selectedpos) - 1):
-            lower_bound = self.selectedpos[segment_idx]
-            upper_bound = self.selectedpos[segment_idx + 1]
-            mask = (self.mw < upper_bound) & (self.mw > lower_bound)
-            segment_sum = float(np.sum(self.norm[np.where(mask)]) * PERCENTAGE_FACTOR)
-            segment_percentages.append(segment_sum)
-        self.logger.debug(f"计算区间百分比: {segment_percentages}")
-        return segment_percentages
+        """计算各分子量区间的百分比（区间左闭右开，落在边界上的切片计入以该边界为下限的区间）"""
+        percentages = segment_percentages(self.mw, self.norm, self.selectedpos).tolist()
+        self.logger.debug(f"计算区间百分比: {percentages}")
+        return percentages
 
     def _setup_figure(self) -> Tuple[Any, Any, Any]:
         """设置并创建图形对象
@@ -353,47 +513,55 @@ class MolecularWeightAnalyzer(BaseAnalyzer):
 
         return fig, ax, gs
 
-    def _plot_data(self, ax: Any, segment_percentages: List[float]) -> None:
-        """绘制分子量分布曲线和柱状图"""
-        import matplotlib.pyplot as plt
-
-        # Bar positions & widths
-        bar_positions = [
-            (self.selectedpos[idx] * BAR_POSITION_WEIGHT_LEFT
-             + self.selectedpos[idx + 1] * BAR_POSITION_WEIGHT_RIGHT)
-            for idx in range(len(self.selectedpos) - 1)
-        ]
-        bar_widths = [pos * self.bar_width for pos in bar_positions]
-
-        # Normalise
-        max_norm = max(self.norm)
-        if max_norm > 0:
-            normalized_data = [value * NORM_SCALE_FACTOR / max_norm for value in self.norm]
-        else:
-            normalized_data = [0] * len(self.norm)
-            self.logger.warning(f"文件 {self.filename}: 归一化数据最大值为0")
+    def _plot_curve(self, ax: Any) -> None:
+        """绘制分子量分布曲线并设置坐标轴样式（与分割位置无关）"""
+        normalized_data = self._normalized_curve()
 
         # Axis spine width
         for spine in ax.spines.values():
             spine.set_linewidth(self.axis_width)
 
-        # Curves & bars
         if self.draw_mw:
             ax.plot(self.mw, normalized_data, color=self.mw_color, linewidth=self.line_width)
-        if self.draw_bar:
-            ax.bar(bar_positions, segment_percentages, align="edge", width=bar_widths, color=self.bar_color)
 
-        # Style
-        plt.xscale("log")
+        self._style_curve_axis(ax)
+        self._set_title(ax)
+
+    def _normalized_curve(self) -> List[float]:
+        """归一化后的分布曲线纵坐标"""
+        max_norm = max(self.norm)
+        if max_norm > 0:
+            return [value * NORM_SCALE_FACTOR / max_norm for value in self.norm]
+        self.logger.warning(f"文件 {self.filename}: 归一化数据最大值为0")
+        return [0] * len(self.norm)
+
+    def _style_curve_axis(self, ax: Any) -> None:
+        """设置分布图坐标轴的对数刻度、轴标签与刻度样式"""
+        import matplotlib.pyplot as plt
+
+        ax.set_xscale("log")
         font1: Dict[str, Any] = {"size": self.axis_font_size, "weight": "bold", "fontname": "Arial"}
-        font2: Dict[str, Any] = {"size": self.title_font_size, "weight": "bold", "fontname": "Arial"}
-        plt.xlabel("Mw (g /mol)", labelpad=4, fontdict=font1)
-        plt.ylabel("Cumulative%", labelpad=4, fontdict=font1)
-        plt.xticks(weight="bold")
-        plt.yticks(weight="bold")
+        ax.set_xlabel("Mw (g /mol)", labelpad=4, fontdict=font1)
+        ax.set_ylabel("Cumulative%", labelpad=4, fontdict=font1)
+        plt.setp(ax.get_xticklabels(), weight="bold")
+        plt.setp(ax.get_yticklabels(), weight="bold")
 
+    def _set_title(self, ax: Any) -> None:
+        font2: Dict[str, Any] = {"size": self.title_font_size, "weight": "bold", "fontname": "Arial"}
         result_name = self.title_name or self.filename.split(".")[0]
-        plt.title(result_name, pad=10, fontdict=font2)
+        ax.set_title(result_name, pad=10, fontdict=font2)
+
+    def _plot_bars(self, ax: Any, segment_percentages: List[float]) -> Any:
+        """绘制区间百分比柱状图，返回柱状图容器（未绘制时为 None）"""
+        if not self.draw_bar:
+            return None
+        bar_positions = [
+            (self.selectedpos[idx] * BAR_POSITION_WEIGHT_LEFT
+             + self.selectedpos[idx + 1] * BAR_POSITION_WEIGHT_RIGHT)
+            for idx in range(len(self.selectedpos) - 1)
+        ]
+        bar_widths = [pos * self.bar_width for pos in bar_positions]
+        return ax.bar(bar_positions, segment_percentages, align="edge", width=bar_widths, color=self.bar_color)
 
     def _distribution_rows(self, segment_percentages: List[float]) -> List[List[str]]:
         """构建分子量区间分布表行 — 每个区间一行，首区间标 `< 上限`。
@@ -416,8 +584,8 @@ class MolecularWeightAnalyzer(BaseAnalyzer):
             rows.append([range_label, percentage_text])
         return rows
 
-    def _create_distribution_table(self, fig: Any, gs: Any, segment_percentages: List[float]) -> None:
-        """创建分子量区间分布表格"""
+    def _create_distribution_table(self, fig: Any, gs: Any, segment_percentages: List[float]) -> Any:
+        """创建分子量区间分布表格，返回表格所在的坐标轴"""
         from plottable import ColumnDefinition, Table
 
         ax1 = fig.add_subplot(gs[:6, 5:7])
@@ -435,6 +603,7 @@ class MolecularWeightAnalyzer(BaseAnalyzer):
             footer_divider=True,
             row_dividers=True,
         )
+        return ax1
 
     def _stats_rows(self) -> List[List[str]]:
         """构建统计数据表行 — 每行使用对应样品的 Mn/Mw/PDI。"""
@@ -458,8 +627,8 @@ class MolecularWeightAnalyzer(BaseAnalyzer):
                 break
         return stats_rows
 
-    def _create_stats_table(self, fig: Any, gs: Any) -> None:
-        """创建分子量统计数据表格"""
+    def _create_stats_table(self, fig: Any, gs: Any) -> Any:
+        """创建分子量统计数据表格，返回表格所在的坐标轴"""
         from plottable import ColumnDefinition, Table
 
         ax2 = fig.add_subplot(gs[7, 5:7])
@@ -477,92 +646,380 @@ class MolecularWeightAnalyzer(BaseAnalyzer):
                     ColumnDefinition(name="PDI", textprops={"ha": "center"}),
                 ],
             )
+        return ax2
 
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
 
     def draw_image(self) -> None:
-        """绘制分子量分布图"""
+        """绘制分子量分布图 — 同一样式的样品共用一个模板，逐样品只替换曲线、柱高、标题与表格"""
+        self._validate_draw_data()
+        segment_percentages = self._calculate_segment_percentages()
+
+        key = tuple(getattr(self, name) for name in _TEMPLATE_STYLE_ATTRIBUTES) + (
+            tuple(self.selectedpos),
+        )
+        template = self._templates.get(key, self._build_sample_template)
+        fig, ax = template.figure, template.ax
+        try:
+            normalized_data = self._normalized_curve()
+            if "curve" in template.artists:
+                template.artists["curve"].set_data(self.mw, normalized_data)
+            for bar, height in zip(template.artists.get("bars", ()), segment_percentages):
+                bar.set_height(height)
+            self._set_title(ax)
+
+            for table_ax in template.artists.pop("tables", []):
+                table_ax.remove()
+            if self.draw_table:
+                gs = ax.get_subplotspec().get_gridspec()
+                template.artists["tables"] = [
+                    self._create_distribution_table(fig, gs, segment_percentages),
+                    self._create_stats_table(fig, gs),
+                ]
+            rescale(ax)
+
+            self._save_figure(fig)
+        except Exception:
+            # 模板可能只更新了一半，丢弃后重建
+            self._templates.discard(key)
+            raise
+
+    def _build_sample_template(self) -> FigureTemplate:
+        """创建分布图模板：图形、坐标轴样式、空曲线与零高度柱（不含标题和表格）"""
         plt = self._plt or configure_plotting()
+        fig, ax, _gs = self._setup_figure()
+        try:
+            for spine in ax.spines.values():
+                spine.set_linewidth(self.axis_width)
+            artists: Dict[str, Any] = {}
+            if self.draw_mw:
+                (artists["curve"],) = ax.plot([], [], color=self.mw_color, linewidth=self.line_width)
+            self._style_curve_axis(ax)
+            bars = self._plot_bars(ax, [0.0] * (len(self.selectedpos) - 1))
+            if bars is not None:
+                artists["bars"] = bars
+        finally:
+            # 模板由分析器持有，从 pyplot 的图形管理器中注销以免累积
+            plt.close(fig)
+        return FigureTemplate(figure=fig, ax=ax, artists=artists)
+
+    def draw_image_on_layer(self, layer: MwCurveLayer) -> None:
+        """在已有曲线图层上重绘分布图 — 只重算区间百分比并替换柱状图与分布表。
+
+        输出与 :meth:`draw_image` 逐字节一致。
+        """
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
 
         self._validate_draw_data()
         segment_percentages = self._calculate_segment_percentages()
 
-        fig = None
-        try:
-            fig, ax, gs = self._setup_figure()
-            self._plot_data(ax, segment_percentages)
+        for artist in layer.segment_artists:
+            artist.remove()
+        layer.segment_artists = []
+        bars = self._plot_bars(layer.ax, segment_percentages)
+        if bars is not None:
+            layer.segment_artists.append(bars)
+        if self.draw_table:
+            layer.segment_artists.append(
+                self._create_distribution_table(layer.figure, layer.gs, segment_percentages)
+            )
+        # 旧柱已移除，按当前图元重新计算数据范围，使坐标轴与全新绘制时一致
+        layer.ax.relim()
+        layer.ax.autoscale_view()
 
+        self._save_figure(layer.figure)
+        # 换上新画布以释放 Agg 渲染缓冲（300 dpi 下每张图数十 MB）
+        FigureCanvasAgg(layer.figure)
+
+    def _build_curve_layer(self) -> MwCurveLayer:
+        """创建曲线图层：图形、分布曲线、坐标轴样式与统计表（不含柱状图和分布表）"""
+        plt = self._plt or configure_plotting()
+        fig, ax, gs = self._setup_figure()
+        try:
+            self._plot_curve(ax)
             if self.draw_table:
-                self._create_distribution_table(fig, gs, segment_percentages)
                 self._create_stats_table(fig, gs)
-
-            # Save
-            result_name = os.path.splitext(self.filename)[0]
-            if not os.path.exists(self.output_dir):
-                os.makedirs(self.output_dir, exist_ok=True)
-            if self.save_picture:
-                plt.savefig(
-                    os.path.join(self.output_dir, result_name + ".png"),
-                    transparent=self.transparent_back,
-                )
-                self.logger.debug(f"已保存图片: {result_name}.png")
         finally:
-            if fig is not None:
-                plt.close(fig)
+            # 图层由会话持有，从 pyplot 的图形管理器中注销以免累积
+            plt.close(fig)
+        return MwCurveLayer(figure=fig, ax=ax, gs=gs)
+
+    def _save_figure(self, fig: Any) -> None:
+        """将图形保存为输出目录下的 ``<文件名>.png``"""
+        result_name = os.path.splitext(self.filename)[0]
+        if not os.path.exists(self.output_dir):
+            os.makedirs(self.output_dir, exist_ok=True)
+        if self.save_picture:
+            fig.savefig(
+                os.path.join(self.output_dir, result_name + ".png"),
+                transparent=self.transparent_back,
+            )
+            self.logger.debug(f"已保存图片: {result_name}.png")
+
+    def _current_sample(self) -> MwSample:
+        """将当前预处理结果打包为渲染阶段的输入。"""
+        return MwSample(
+            filename=self.filename,
+            title_name=self.title_name,
+            norm=self.norm,
+            mw=self.mw,
+            mw_data=self.mw_data,
+        )
+
+    def _collect_samples(self, filename: str) -> List[MwSample]:
+        """读取并预处理一个输入文件，返回其中每个样品的绘图数据。"""
+        if not self.read_file(filename):
+            return []
+        # Excel 导出每个文件含多个样品 — 每个样品单独出一张图
+        samples: List[MwSample] = []
+        if self.excel_samples is not None:
+            for sample in self.excel_samples.values():
+                self._excel_sample = sample
+                self.title_name = sample.name
+                self.filename = _sanitize_sample_filename(sample.name)
+                self.preprocess()
+                samples.append(self._current_sample())
+        else:
+            self.preprocess()
+            samples.append(self._current_sample())
+        for sample in samples:
+            sample.source_file = filename
+        return samples
+
+    def _load_sample(self, sample: MwSample) -> None:
+        """将渲染输入载入为当前样品。"""
+        self.filename = sample.filename
+        self.title_name = sample.title_name
+        self.norm = sample.norm
+        self.mw = sample.mw
+        self.mw_data = sample.mw_data
+
+    def _render_sample(self, sample: MwSample) -> str:
+        """绘制单个样品的分布图，返回错误信息（成功时为空字符串）。"""
+        self._load_sample(sample)
+        try:
+            self.draw_image()
+        except Exception as e:
+            self.logger.error(f"绘制 {sample.filename} 时出错", show_ui=False, exception=e)
+            return str(e) or type(e).__name__
+        return ""
+
+    def _render_retained(self, layers: List[Optional[MwCurveLayer]], index: int, sample: MwSample) -> str:
+        """增量模式下绘制单个样品：复用（或新建并保留）其曲线图层。"""
+        self._load_sample(sample)
+        try:
+            self._validate_draw_data()
+            layer = layers[index]
+            if layer is None:
+                layer = self._build_curve_layer()
+                layers[index] = layer
+            self.draw_image_on_layer(layer)
+        except Exception as e:
+            # 图层可能只更新了一半，丢弃后下次重建
+            layers[index] = None
+            self.logger.error(f"绘制 {sample.filename} 时出错", show_ui=False, exception=e)
+            return str(e) or type(e).__name__
+        return ""
+
+    def _input_identity(self) -> Optional[Tuple[Any, ...]]:
+        """选中文件的身份（路径 + ``file_identity``），任一文件不可用时返回 None。"""
+        try:
+            return (
+                os.path.realpath(self.data_path),
+                tuple(
+                    (name, file_identity(resolve_contained_file(self.data_path, name)))
+                    for name in self.file_list or []
+                ),
+            )
+        except (OSError, ValueError):
+            return None
 
     def _run_to_output(self) -> bool:
-        """运行分析流程 — 处理所有选中的文件，生成分子量分布图"""
+        """运行分析流程 — 先解析全部选中文件，再（可并行地）逐样品生成分布图"""
         if not self.selected_file:
             self.logger.warning("没有选中文件", show_ui=True)
             return False
 
         self.file_list = self.selected_file
+        if not self.incremental:
+            return self._render_all(None)
+        session = get_mw_session()
+        with session.lock:
+            return self._render_all(session)
+
+    def _render_all(self, session: Optional[MwRenderSession]) -> bool:
+        """解析（或复用）样品并逐个绘图；``session`` 为 None 时不做增量复用。"""
         if self.progress_callback:
             self.progress_callback(0.01, "Preparing MW plot engine")
         self._plt = configure_plotting()
-        processed_count = 0
 
-        for pro, filename in enumerate(self.file_list):
-            self.filename = filename
-            try:
-                if self.progress_callback:
-                    self.progress_callback(
-                        0.05 + 0.9 * pro / len(self.file_list),
-                        f"Processing {filename}",
-                    )
-                if not self.read_file(filename):
+        inputs = self._input_identity() if session is not None else None
+        reused = session.reusable_samples(inputs) if session is not None else None
+        if reused is not None:
+            samples: List[MwSample] = reused
+            self.logger.debug(f"输入文件未变化，复用 {len(samples)} 个样品的解析结果")
+            for filename in self.file_list:
+                count = sum(sample.source_file == filename for sample in samples)
+                self.report_file(filename, samples=count)
+        else:
+            samples = []
+            for pro, filename in enumerate(self.file_list):
+                self.check_cancelled()
+                self.filename = filename
+                try:
+                    if self.progress_callback:
+                        self.progress_callback(
+                            0.05 + 0.25 * pro / len(self.file_list),
+                            f"Processing {filename}",
+                        )
+                    collected = self._collect_samples(filename)
+                except Exception as e:
+                    self.logger.error(f"处理文件 {filename} 时出错", show_ui=True, exception=e)
+                    self.report_file(filename, str(e) or type(e).__name__)
                     continue
-                # Excel 导出每个文件含多个样品 — 每个样品单独出一张图
-                if self.excel_samples is not None:
-                    for sample in self.excel_samples.values():
-                        self._excel_sample = sample
-                        self.title_name = sample.name
-                        self.filename = _sanitize_sample_filename(sample.name)
-                        self.preprocess()
-                        self.draw_image()
-                        processed_count += 1
-                        self.logger.info(f"成功处理样品: {sample.name}")
-                else:
-                    self.preprocess()
-                    self.draw_image()
-                    processed_count += 1
-                    self.logger.info(f"成功处理文件: {filename}")
-            except Exception as e:
-                self.logger.error(f"处理文件 {filename} 时出错", show_ui=True, exception=e)
-                continue
-            finally:
-                if self.progress_callback:
-                    self.progress_callback(
-                        (pro + 1) / len(self.file_list),
-                        "画图进度 {}/{} {:.2f}%".format(
-                            pro + 1, len(self.file_list), (pro + 1) * 100 / len(self.file_list)
-                        ),
-                    )
+                samples.extend(collected)
+                self.report_file(filename, samples=len(collected))
+            if session is not None:
+                session.remember_samples(inputs, samples)
+
+        if not samples:
+            return False
+
+        total = len(samples)
+        finished = 0
+        processed_count = 0
+
+        def on_rendered(index: int, error: str) -> None:
+            nonlocal finished, processed_count
+            finished += 1
+            sample = samples[index]
+            if error:
+                self.logger.error(f"处理样品 {sample.filename} 时出错: {error}", show_ui=True)
+            else:
+                processed_count += 1
+                self.logger.info(f"成功处理样品: {sample.title_name or sample.filename}")
+            if self.progress_callback:
+                self.progress_callback(
+                    0.3 + 0.7 * finished / total,
+                    "画图进度 {}/{} {:.2f}%".format(finished, total, finished * 100 / total),
+                )
 
+        # 曲线图层只能保留在本进程内：样品数不超过上限时不论 jobs 都在进程内绘制，
+        # 之后只修改分割位置的请求即可跳过曲线绘制
+        retain = session is not None and inputs is not None and total <= MAX_RETAINED_CURVE_LAYERS
+        workers = 1 if retain else resolve_worker_count(self.jobs, total)
+        if retain:
+            curve_style = tuple(getattr(self, key) for key in _CURVE_STYLE_ATTRIBUTES)
+            layers = session.curve_layers(curve_style)
+            run_ordered(
+                self._render_retained,
+                [(layers, index, sample) for index, sample in enumerate(samples)],
+                workers=1,
+                on_done=on_rendered,
+                cancel_token=self.cancel_token,
+            )
+        elif workers > 1:
+            # 样品较多时多进程渲染更快，曲线图层无法跨进程保留 — 增量模式此时只跳过解析
+            state = {key: getattr(self, key) for key in _RENDER_ATTRIBUTES}
+            run_ordered(
+                render_mw_sample,
+                [(sample,) for sample in samples],
+                workers=workers,
+                on_done=on_rendered,
+                initializer=_init_render_worker,
+                initargs=(self.data_path, state),
+                cancel_token=self.cancel_token,
+            )
+        else:
+            run_ordered(
+                self._render_sample,
+                [(sample,) for sample in samples],
+                workers=1,
+                on_done=on_rendered,
+                cancel_token=self.cancel_token,
+            )
+
+        # 模板各持有一块 Agg 渲染缓冲，批次结束即释放
+        self._templates.clear()
         return processed_count > 0
 
+    def compute_statistics(self) -> Dict[str, Any]:
+        """解析选中文件，计算区间百分比与 Mn/Mw/PDI，不创建任何图形。
+
+        Returns:
+            ``{"segments": 区间列名, "rows": 统计行, "errors": 解析失败的文件}``；
+            每个样品的每个峰一行，``percentages`` 与 ``segments`` 一一对应。
+        """
+        if not self.selected_file:
+            raise ValueError("没有选中文件")
+        self.file_list = self.selected_file
+        total = len(self.file_list)
+        finished = 0
+
+        def on_parsed(_index: int, result: MwFileSamples) -> None:
+            nonlocal finished
+            finished += 1
+            if result.error:
+                self.logger.error(f"处理文件 {result.filename} 时出错: {result.error}", show_ui=True)
+            if self.progress_callback:
+                self.progress_callback(0.9 * finished / total, f"Processing {result.filename}")
+
+        workers = resolve_parse_workers(
+            self.jobs, [os.path.join(self.data_path, name) for name in self.file_list]
+        )
+        results = run_ordered(
+            collect_mw_file,
+            [(self.data_path, filename) for filename in self.file_list],
+            workers=workers,
+            on_done=on_parsed,
+            cancel_token=self.cancel_token,
+        )
+        samples = [sample for result in results for sample in result.samples]
+        errors = [
+            {"file": result.filename, "error": result.error} for result in results if result.error
+        ]
+
+        rows: List[Dict[str, Any]] = []
+        if samples:
+            # 长度不同的样品以 NaN 补齐后一次完成全部分箱
+            width = max(sample.mw.size for sample in samples)
+            mw_stack = np.full((len(samples), width), np.nan)
+            norm_stack = np.zeros((len(samples), width))
+            for index, sample in enumerate(samples):
+                mw_stack[index, : sample.mw.size] = sample.mw
+                norm_stack[index, : sample.norm.size] = sample.norm
+            matrix = segment_percentage_matrix(mw_stack, norm_stack, self.selectedpos)
+
+            for sample, percentages in zip(samples, matrix.tolist()):
+                complete = False
+                for peak, mw_row in enumerate(sample.mw_data, start=1):
+                    if len(mw_row) < MIN_MW_DATA_COLUMNS:
+                        self.logger.warning(f"样品 {sample.title_name or mw_row[0]} 的分子量数据不完整")
+                        continue
+                    complete = True
+                    rows.append({
+                        "file": sample.source_file,
+                        "sample": sample.title_name or mw_row[0],
+                        "peak": peak,
+                        # index 2=Mn, 3=Mw, 7=PDI
+                        "Mn": mw_row[2],
+                        "Mw": mw_row[3],
+                        "PDI": mw_row[7],
+                        "percentages": percentages,
+                    })
+                # 没有任何完整峰的样品不能从表中悄悄消失，按文件错误上报
+                if not complete:
+                    errors.append({
+                        "file": sample.source_file,
+                        "error": f"样品 {sample.title_name or sample.filename} 的分子量数据不完整",
+                    })
+
+        if self.progress_callback:
+            self.progress_callback(1.0, "MW statistics complete")
+        return {"segments": segment_labels(self.selectedpos), "rows": rows, "errors": errors}
+
     def run(self) -> bool:
         """Run Mw analysis and commit its complete output atomically."""
         final_output_dir = self.output_dir
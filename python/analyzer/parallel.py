@@ -0,0 +1,123 @@
+"""Shared process-pool helpers for independent per-file analyzer work."""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from .cancellation import CancellationToken
+from .dataset_cache import get_dataset_cache
+from .parse_cache import forget_usage
+
+# How often a running process pool checks its cancellation token
+CANCEL_POLL_SECONDS = 0.2
+
+# Pools are started from dispatcher threads while other threads may hold
+# module locks (parse-cache usage, dataset cache, DSC encoding memo). A forked
+# child would inherit those locks in their held state and could deadlock, so
+# workers always start as fresh interpreters, as they already do on Windows.
+_POOL_CONTEXT = multiprocessing.get_context("spawn")
+
+
+def resolve_worker_count(jobs: Optional[int], task_count: int) -> int:
+    """Return the number of worker processes to use for ``task_count`` tasks.
+
+    ``jobs`` of ``None`` or ``0`` means "one worker per CPU core". A single
+    task (or a single worker) always runs inline in the calling process.
+    """
+    if task_count <= 1:
+        return 1
+    if jobs is None or jobs <= 0:
+        jobs = os.cpu_count() or 1
+    return max(1, min(int(jobs), task_count))
+
+
+def resolve_parse_workers(jobs: Optional[int], paths: Sequence[str]) -> int:
+    """Like ``resolve_worker_count`` for parsing ``paths``.
+
+    Returns 1 when every input is already in the in-memory dataset cache:
+    parsing then costs next to nothing and a process pool would only add overhead.
+    """
+    workers = resolve_worker_count(jobs, len(paths))
+    memory = get_dataset_cache()
+    if workers > 1 and memory.enabled and all(memory.contains_file(path) for path in paths):
+        return 1
+    return workers
+
+
+def run_ordered(
+    func: Callable[..., Any],
+    tasks: Sequence[Tuple[Any, ...]],
+    *,
+    workers: int,
+    on_done: Optional[Callable[[int, Any], None]] = None,
+    initializer: Optional[Callable[..., None]] = None,
+    initargs: Tuple[Any, ...] = (),
+    cancel_token: Optional[CancellationToken] = None,
+) -> List[Any]:
+    """Run ``func(*task)`` for every task and return results in input order.
+
+    With ``workers <= 1`` the tasks run inline. Otherwise they are spread over
+    a process pool; ``on_done(index, result)`` is invoked in the parent as each
+    task finishes (completion order), so callers can report progress while the
+    returned list stays deterministic. ``func`` must be a picklable module-level
+    function and should report per-task failures in its result rather than raise.
+    ``initializer(*initargs)`` runs once in every worker process (never inline).
+    Workers are spawned, not forked: ``initargs`` must be picklable and the
+    initializer has to build any per-process state itself.
+
+    ``cancel_token`` is checked before every inline task and polled while the
+    pool works; once set, the worker processes are terminated and
+    ``AnalysisCancelled`` is raised.
+    """
+    results: List[Any] = [None] * len(tasks)
+    if workers <= 1:
+        for index, task in enumerate(tasks):
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            results[index] = func(*task)
+            if on_done:
+                on_done(index, results[index])
+        return results
+
+    executor = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=_POOL_CONTEXT,
+        initializer=initializer,
+        initargs=initargs,
+    )
+    try:
+        futures = {
+            executor.submit(func, *task): index
+            for index, task in enumerate(tasks)
+        }
+        pending = set(futures)
+        poll = CANCEL_POLL_SECONDS if cancel_token is not None else None
+        while pending:
+            done, pending = wait(pending, timeout=poll, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = futures[future]
+                results[index] = future.result()
+                if on_done:
+                    on_done(index, results[index])
+            if cancel_token is not None and cancel_token.cancelled:
+                _terminate_workers(executor)
+                cancel_token.raise_if_cancelled()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        # 工作进程写入的解析缓存条目不在本进程的统计内，下次写入时重新扫描
+        forget_usage()
+    return results
+
+
+def _terminate_workers(executor: ProcessPoolExecutor) -> None:
+    """Stop a pool's worker processes, including tasks that are still running."""
+    # ProcessPoolExecutor cannot interrupt a running task; stop its processes directly
+    processes = list((getattr(executor, "_processes", None) or {}).values())
+    executor.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        process.join()
@@ -0,0 +1,456 @@
+"""
+On-disk, content-addressed cache of parsed analyzer inputs.
+
+Entries live under ``<get_install_dir()>/cache/parse/entries`` as ``.npz``
+files named ``<kind>-v<version>-<digest>.npz``, where ``digest`` is a BLAKE2b
+hash of the input file content, so a file copied to another folder reuses the
+same entry. ``refs/`` maps a file fingerprint (path, size, mtime_ns, kind,
+parser version) to its content digest so unchanged files are not re-hashed on
+every run.
+
+Entries are evicted least-recently-used first (a hit refreshes the entry's
+mtime) once the total size exceeds the configured cap. Every edit of an input
+leaves its old ref behind, so eviction also drops refs whose entry is gone
+and, beyond ``DEFAULT_PARSE_CACHE_MAX_REFS``, the least recently used ones.
+The process keeps a running total of both, so the directories are only
+rescanned when a store crosses a cap; worker processes start from a fresh
+scan, and the parent drops its totals after a pooled run. Cache problems never fail an analysis:
+they are logged at debug level and the input is parsed normally.
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+import numpy as np
+
+from .base import get_install_dir, logger
+from .dataset_cache import FileIdentity, file_identity, get_dataset_cache
+
+T = TypeVar("T")
+
+# (arrays, json-serialisable metadata) — the on-disk form of a parse result
+CachePayload = Tuple[Dict[str, np.ndarray], Dict[str, Any]]
+
+DEFAULT_PARSE_CACHE_MAX_MB: int = 256
+DEFAULT_PARSE_CACHE_MAX_REFS: int = 10_000
+# Eviction trims to this fraction of a cap, so a full cache is not rescanned on every store
+_EVICT_LOW_WATER = 0.9
+# Entry kinds written by the analyzers (.rst, GPC Excel, DSC .txt, IR .dpt)
+PARSE_CACHE_KINDS: Tuple[str, ...] = ("rst", "gpc_excel", "dsc", "dpt")
+_META_KEY = "__meta__"
+_KIND_RE = re.compile(r"^[a-z][a-z0-9_]*$")
+_READ_CHUNK = 1 << 20
+
+
+def get_parse_cache_dir() -> str:
+    """Return the parse cache directory under the writable data root."""
+    return os.path.join(get_install_dir(), "cache", "parse")
+
+
+def parse_cache_enabled() -> bool:
+    """``POLYANALYZER_DISABLE_PARSE_CACHE=1`` turns the cache off."""
+    return os.environ.get("POLYANALYZER_DISABLE_PARSE_CACHE") != "1"
+
+
+def parse_cache_max_bytes() -> int:
+    """Size cap from ``POLYANALYZER_PARSE_CACHE_MAX_MB`` (default 256 MB)."""
+    raw = os.environ.get("POLYANALYZER_PARSE_CACHE_MAX_MB")
+    try:
+        megabytes = int(raw) if raw else DEFAULT_PARSE_CACHE_MAX_MB
+    except ValueError:
+        megabytes = DEFAULT_PARSE_CACHE_MAX_MB
+    return max(0, megabytes) * 1024 * 1024
+
+
+def _validate_kind(kind: str) -> str:
+    if not isinstance(kind, str) or not _KIND_RE.match(kind):
+        raise ValueError(f"Invalid parse cache kind: {kind!r}")
+    return kind
+
+
+def _content_digest(path: str) -> str:
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(_READ_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+@dataclass
+class _Usage:
+    """Running totals of one cache directory, as written by this process."""
+    bytes: int
+    refs: int
+
+
+# cache_dir -> usage; seeded by one scan, then updated on every store
+_USAGE: Dict[str, _Usage] = {}
+_USAGE_LOCK = threading.Lock()
+
+
+def forget_usage() -> None:
+    """Drop the running totals so the next store rescans the cache directories.
+
+    Call after other processes (e.g. pool workers) may have stored entries.
+    """
+    with _USAGE_LOCK:
+        _USAGE.clear()
+
+
+def _reset_usage_in_child() -> None:
+    # 子进程可能在其他线程持有锁时被 fork，且父进程的统计不含其他进程写入的条目
+    global _USAGE_LOCK
+    _USAGE_LOCK = threading.Lock()
+    _USAGE.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_usage_in_child)
+
+
+class ParseCache:
+    """Content-addressed ``.npz`` store with LRU eviction."""
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        max_refs: int = DEFAULT_PARSE_CACHE_MAX_REFS,
+    ) -> None:
+        self.cache_dir: str = cache_dir or get_parse_cache_dir()
+        self.max_bytes: int = parse_cache_max_bytes() if max_bytes is None else max_bytes
+        self.max_refs: int = max_refs
+        self.entries_dir: str = os.path.join(self.cache_dir, "entries")
+        self.refs_dir: str = os.path.join(self.cache_dir, "refs")
+
+    # -- lookup ------------------------------------------------------------
+
+    def load_or_parse(
+        self,
+        kind: str,
+        version: int,
+        path: str,
+        parse: Callable[[str], T],
+        encode: Callable[[T], CachePayload],
+        decode: Callable[[CachePayload], T],
+    ) -> T:
+        """Return the cached parse result for ``path`` or parse and store it.
+
+        Exceptions raised by ``parse`` propagate unchanged and nothing is
+        stored, so invalid inputs keep reporting their original errors.
+        """
+        _validate_kind(kind)
+        try:
+            before = os.stat(path)
+            ref_path = self._ref_path(kind, version, path, before)
+            digest = self._read_ref(ref_path)
+            if digest is not None:
+                cached = self._load(kind, version, digest, decode)
+                if cached is not None:
+                    _touch(ref_path)
+                    return cached
+            digest = _content_digest(path)
+            after = os.stat(path)
+            stable = (before.st_size, before.st_mtime_ns) == (after.st_size, after.st_mtime_ns)
+            cached = self._load(kind, version, digest, decode)
+            if cached is not None:
+                if stable:
+                    self._record(0, self._write_ref(ref_path, kind, version, digest))
+                return cached
+        except OSError as exc:
+            logger.debug(f"解析缓存不可用 {path}: {exc}")
+            return parse(path)
+
+        result = parse(path)
+        if stable:
+            try:
+                added_bytes = self._store(kind, version, digest, encode(result))
+                self._record(added_bytes, self._write_ref(ref_path, kind, version, digest))
+            except Exception as exc:
+                logger.debug(f"写入解析缓存失败 {path}: {exc}")
+        return result
+
+    def _ref_path(self, kind: str, version: int, path: str, st: os.stat_result) -> str:
+        fingerprint = f"{kind}|{version}|{os.path.realpath(path)}|{st.st_size}|{st.st_mtime_ns}"
+        name = hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()[:40]
+        return os.path.join(self.refs_dir, name)
+
+    def _entry_path(self, kind: str, version: int, digest: str) -> str:
+        return os.path.join(self.entries_dir, f"{kind}-v{version}-{digest}.npz")
+
+    @staticmethod
+    def _read_ref_fields(ref_path: str) -> Optional[Tuple[str, str, str]]:
+        """Return ``(kind, version, digest)`` stored in a ref, or ``None``."""
+        try:
+            with open(ref_path, "r", encoding="ascii") as handle:
+                parts = handle.read().split()
+        except (OSError, UnicodeDecodeError):
+            return None
+        return (parts[0], parts[1], parts[2]) if len(parts) == 3 else None
+
+    def _read_ref(self, ref_path: str) -> Optional[str]:
+        fields = self._read_ref_fields(ref_path)
+        return fields[2] if fields else None
+
+    def _write_ref(self, ref_path: str, kind: str, version: int, digest: str) -> int:
+        """Write a ref; returns 1 when it is a new file, else 0."""
+        self._usage()
+        os.makedirs(self.refs_dir, exist_ok=True)
+        created = 0 if os.path.exists(ref_path) else 1
+        with open(ref_path, "w", encoding="ascii") as handle:
+            handle.write(f"{kind} {version} {digest}\n")
+        return created
+
+    def _load(
+        self,
+        kind: str,
+        version: int,
+        digest: str,
+        decode: Callable[[CachePayload], T],
+    ) -> Optional[T]:
+        entry = self._entry_path(kind, version, digest)
+        if not os.path.isfile(entry):
+            return None
+        try:
+            with np.load(entry, allow_pickle=False) as npz:
+                meta = json.loads(npz[_META_KEY].tobytes().decode("utf-8"))
+                arrays = {key: npz[key] for key in npz.files if key != _META_KEY}
+            result = decode((arrays, meta))
+        except Exception as exc:
+            logger.debug(f"解析缓存条目损坏，已丢弃 {entry}: {exc}")
+            _remove_quietly(entry)
+            return None
+        _touch(entry)
+        return result
+
+    def _store(self, kind: str, version: int, digest: str, payload: CachePayload) -> int:
+        """Write one entry; returns how many bytes the cache grew by."""
+        arrays, meta = payload
+        if _META_KEY in arrays:
+            raise ValueError(f"{_META_KEY} is reserved")
+        self._usage()
+        os.makedirs(self.entries_dir, exist_ok=True)
+        entry = self._entry_path(kind, version, digest)
+        try:
+            replaced = os.path.getsize(entry)
+        except OSError:
+            replaced = 0
+        meta_bytes = np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8)
+        fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".npz", dir=self.entries_dir)
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                np.savez(handle, **{_META_KEY: meta_bytes}, **arrays)
+            os.replace(tmp_path, entry)
+        except BaseException:
+            _remove_quietly(tmp_path)
+            raise
+        return os.path.getsize(entry) - replaced
+
+    # -- maintenance -------------------------------------------------------
+
+    def _scan_entries(self) -> list:
+        """Return ``(mtime_ns, size, kind, path)`` for every stored entry."""
+        entries = []
+        if not os.path.isdir(self.entries_dir):
+            return entries
+        with os.scandir(self.entries_dir) as it:
+            for item in it:
+                if not item.name.endswith(".npz") or item.name.startswith("."):
+                    continue
+                try:
+                    st = item.stat()
+                except OSError:
+                    continue
+                kind = item.name.split("-v", 1)[0]
+                entries.append((st.st_mtime_ns, st.st_size, kind, item.path))
+        return entries
+
+    def _usage(self) -> _Usage:
+        """Running totals for this cache directory (scanned once per process)."""
+        with _USAGE_LOCK:
+            usage = _USAGE.get(self.cache_dir)
+        if usage is not None:
+            return usage
+        # 扫描目录时不持有锁
+        total = sum(size for _mtime, size, _kind, _path in self._scan_entries())
+        refs = len(os.listdir(self.refs_dir)) if os.path.isdir(self.refs_dir) else 0
+        with _USAGE_LOCK:
+            return _USAGE.setdefault(self.cache_dir, _Usage(total, refs))
+
+    def _record(self, added_bytes: int, added_refs: int) -> None:
+        """Add a store to the running totals and evict once a cap is crossed."""
+        usage = self._usage()
+        with _USAGE_LOCK:
+            usage.bytes += added_bytes
+            usage.refs += added_refs
+            over = usage.bytes > self.max_bytes or usage.refs > self.max_refs
+        if over:
+            self._evict()
+
+    def _evict(self) -> None:
+        entries = self._scan_entries()
+        total = sum(size for _mtime, size, _kind, _path in entries)
+        if total > self.max_bytes:
+            target = int(self.max_bytes * _EVICT_LOW_WATER)
+            for _mtime, size, _kind, path in sorted(entries):
+                if total <= target:
+                    break
+                _remove_quietly(path)
+                total -= size
+        refs = self._prune_refs()
+        with _USAGE_LOCK:
+            _USAGE[self.cache_dir] = _Usage(total, refs)
+
+    def _prune_refs(self) -> int:
+        """Drop refs whose entry is gone, then the oldest beyond ``max_refs``."""
+        if not os.path.isdir(self.refs_dir):
+            return 0
+        live = []
+        with os.scandir(self.refs_dir) as it:
+            for item in it:
+                fields = self._read_ref_fields(item.path)
+                if fields is None or not fields[1].isdigit() or not os.path.isfile(
+                    self._entry_path(fields[0], int(fields[1]), fields[2])
+                ):
+                    _remove_quietly(item.path)
+                    continue
+                try:
+                    live.append((item.stat().st_mtime_ns, item.path))
+                except OSError:
+                    continue
+        if len(live) > self.max_refs:
+            keep = int(self.max_refs * _EVICT_LOW_WATER)
+            live.sort()
+            for _mtime, path in live[: len(live) - keep]:
+                _remove_quietly(path)
+            live = live[len(live) - keep:]
+        return len(live)
+
+    def stats(self) -> Dict[str, Any]:
+        """Summarise the cache contents (entry counts and sizes per kind)."""
+        kinds: Dict[str, Dict[str, int]] = {}
+        total = 0
+        entries = self._scan_entries()
+        for _mtime, size, kind, _path in entries:
+            bucket = kinds.setdefault(kind, {"entries": 0, "bytes": 0})
+            bucket["entries"] += 1
+            bucket["bytes"] += size
+            total += size
+        refs = len(os.listdir(self.refs_dir)) if os.path.isdir(self.refs_dir) else 0
+        return {
+            "cache_dir": self.cache_dir,
+            "enabled": parse_cache_enabled(),
+            "max_bytes": self.max_bytes,
+            "entries": len(entries),
+            "total_bytes": total,
+            "refs": refs,
+            "kinds": kinds,
+        }
+
+    def purge(self, kind: Optional[str] = None) -> Dict[str, Any]:
+        """Remove all entries (or only those of ``kind``) and their refs."""
+        if kind is not None:
+            _validate_kind(kind)
+        removed = 0
+        freed = 0
+        for _mtime, size, entry_kind, path in self._scan_entries():
+            if kind is None or entry_kind == kind:
+                _remove_quietly(path)
+                removed += 1
+                freed += size
+        if os.path.isdir(self.entries_dir) and kind is None:
+            for name in os.listdir(self.entries_dir):
+                if name.startswith(".tmp-"):
+                    _remove_quietly(os.path.join(self.entries_dir, name))
+        if os.path.isdir(self.refs_dir):
+            for name in os.listdir(self.refs_dir):
+                ref_path = os.path.join(self.refs_dir, name)
+                if kind is not None:
+                    try:
+                        with open(ref_path, "r", encoding="ascii") as handle:
+                            ref_kind = handle.read().split(" ", 1)[0]
+                    except (OSError, UnicodeDecodeError):
+                        ref_kind = ""
+                    if ref_kind != kind:
+                        continue
+                _remove_quietly(ref_path)
+        return {"removed_entries": removed, "freed_bytes": freed}
+
+
+def _touch(path: str) -> None:
+    try:
+        os.utime(path, None)
+    except OSError:
+        pass
+
+
+def _payload_bytes(payload: CachePayload) -> int:
+    arrays, meta = payload
+    return sum(array.nbytes for array in arrays.values()) + len(json.dumps(meta))
+
+
+def cached_parse(
+    kind: str,
+    version: int,
+    path: str,
+    parse: Callable[[str], T],
+    encode: Callable[[T], CachePayload],
+    decode: Callable[[CachePayload], T],
+) -> T:
+    """Parse ``path`` through the in-memory dataset cache and the on-disk cache.
+
+    The in-memory layer is only active when the process enabled it (the
+    JSON-RPC sidecar); the on-disk layer unless ``POLYANALYZER_DISABLE_PARSE_CACHE=1``.
+    """
+    memory = get_dataset_cache()
+    key = None
+    if memory.enabled:
+        try:
+            key = (kind, version, *file_identity(path))
+        except OSError:
+            key = None
+        if key is not None:
+            cached = memory.get(key)
+            if cached is not None:
+                return cached
+
+    if parse_cache_enabled():
+        result = ParseCache().load_or_parse(kind, version, path, parse, encode, decode)
+    else:
+        result = parse(path)
+
+    if key is not None:
+        _remember(key, result, encode)
+    return result
+
+
+def remember_parsed(
+    kind: str,
+    version: int,
+    identity: FileIdentity,
+    result: T,
+    encode: Callable[[T], CachePayload],
+) -> None:
+    """Add a dataset parsed elsewhere (e.g. in a worker process) to the in-memory cache."""
+    if get_dataset_cache().enabled:
+        _remember((kind, version, *identity), result, encode)
+
+
+def _remember(key: Tuple[Any, ...], result: Any, encode: Callable[[Any], CachePayload]) -> None:
+    payload = encode(result)
+    for array in payload[0].values():
+        array.setflags(write=False)
+    get_dataset_cache().put(key, result, _payload_bytes(payload))
@@ -3,8 +3,13 @@
 from __future__ import annotations
 
 import logging
+import os
 import threading
-from typing import Any
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
 
 _PLOT_LOCK = threading.Lock()
 _PLOT_MODULE: Any | None = None
@@ -46,3 +51,161 @@ def warm_plotting(logger: logging.Logger | None = None) -> None:
     except Exception as exc:
         if logger:
             logger.warning("Plot engine warmup failed: %s", exc)
+
+
+@dataclass
+class FigureTemplate:
+    """A styled figure reused across the samples of one batch.
+
+    Only the data artists in ``artists`` (and per-sample text such as the
+    title) are updated between ``savefig`` calls.
+    """
+
+    figure: Any
+    ax: Any
+    artists: Dict[str, Any] = field(default_factory=dict)
+
+
+class FigureTemplates:
+    """Styled figures keyed by the settings that built them.
+
+    ``build`` must return a template whose figure is already closed in pyplot,
+    so that retained templates do not pile up in the figure manager.
+    """
+
+    def __init__(self, max_templates: int = 2) -> None:
+        self.max_templates = max_templates
+        self._templates: "OrderedDict[Hashable, FigureTemplate]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._templates)
+
+    def get(self, key: Hashable, build: Callable[[], FigureTemplate]) -> FigureTemplate:
+        template = self._templates.get(key)
+        if template is not None:
+            self._templates.move_to_end(key)
+            return template
+        template = build()
+        self._templates[key] = template
+        while len(self._templates) > self.max_templates:
+            self._templates.popitem(last=False)
+        return template
+
+    def discard(self, key: Hashable) -> None:
+        """Drop a template that may have been left half-updated by an error."""
+        self._templates.pop(key, None)
+
+    def clear(self) -> None:
+        self._templates.clear()
+
+
+def rescale(ax: Any) -> None:
+    """Recompute data limits after ``set_data``/``set_height`` like a fresh plot would."""
+    ax.relim()
+    ax.autoscale_view()
+
+
+DEFAULT_PLOT_MAX_POINTS = 20000
+DECIMATION_METHODS = ("minmax", "lttb")
+
+
+def plot_point_limit() -> int:
+    """Per-trace point budget from ``POLYANALYZER_PLOT_MAX_POINTS`` (0 disables)."""
+    raw = os.environ.get("POLYANALYZER_PLOT_MAX_POINTS")
+    try:
+        limit = int(raw) if raw else DEFAULT_PLOT_MAX_POINTS
+    except ValueError:
+        limit = DEFAULT_PLOT_MAX_POINTS
+    return max(0, limit)
+
+
+def minmax_indices(y: np.ndarray, buckets: int) -> np.ndarray:
+    """Indices of the first, last, min and max sample of each index bucket.
+
+    Keeping all four per bucket (M4) draws the same envelope as the full
+    trace once a bucket is no wider than a pixel column.
+    """
+    n = len(y)
+    if buckets <= 0 or n <= 4 * buckets:
+        return np.arange(n)
+    edges = np.linspace(0, n, buckets + 1).astype(np.intp)
+    width = int(np.diff(edges).max())
+    # 末尾不足一个桶宽的部分用各桶的最后一个点补齐
+    index = edges[:-1, None] + np.arange(width)
+    index = np.minimum(index, (edges[1:] - 1)[:, None])
+    values = y[index]
+    rows = np.arange(buckets)
+    picks = np.concatenate((
+        edges[:-1],
+        edges[1:] - 1,
+        index[rows, np.argmin(values, axis=1)],
+        index[rows, np.argmax(values, axis=1)],
+    ))
+    return np.unique(picks)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets selection of ``n_out`` indices."""
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    picks = np.empty(n_out, dtype=np.intp)
+    picks[0], picks[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(n_out - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        following = slice(stop, edges[bucket + 2]) if bucket + 2 < len(edges) else slice(n - 1, n)
+        avg_x, avg_y = x[following].mean(), y[following].mean()
+        ax, ay = x[previous], y[previous]
+        area = np.abs(
+            (ax - avg_x) * (y[start:stop] - ay) - (ax - x[start:stop]) * (avg_y - ay)
+        )
+        previous = start + int(np.argmax(area))
+        picks[bucket + 1] = previous
+    return picks
+
+
+def _decimate_run(x: np.ndarray, y: np.ndarray, limit: int, method: str) -> np.ndarray:
+    if method == "lttb":
+        return lttb_indices(x, y, limit)
+    return minmax_indices(y, limit // 4)
+
+
+def decimate_line(
+    x: Any,
+    y: Any,
+    max_points: Optional[int] = None,
+    method: str = "minmax",
+) -> Tuple[Any, Any]:
+    """Reduce a line trace to at most about ``max_points`` samples before plotting.
+
+    Traces at or below the limit are returned unchanged. NaN gaps are kept:
+    each finite run is decimated on its own and runs stay separated by NaN.
+    """
+    if method not in DECIMATION_METHODS:
+        raise ValueError(f"Unknown decimation method: {method!r}")
+    limit = plot_point_limit() if max_points is None else max_points
+    if limit <= 0 or len(y) <= limit:
+        return x, y
+
+    x_arr = np.asarray(x)
+    y_arr = np.asarray(y)
+    finite = np.isfinite(y_arr)
+    if finite.all():
+        keep = _decimate_run(x_arr, y_arr, limit, method)
+        return x_arr[keep], y_arr[keep]
+
+    # 按有限值区段分别抽稀，区段之间保留一个 NaN 断开曲线
+    change = np.flatnonzero(np.diff(finite.astype(np.int8))) + 1
+    bounds = np.concatenate(([0], change, [len(y_arr)]))
+    kept: List[np.ndarray] = []
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        if not finite[start]:
+            kept.append(np.array([start], dtype=np.intp))
+            continue
+        share = max(8, int(limit * (stop - start) / len(y_arr)))
+        run = slice(start, stop)
+        kept.append(start + _decimate_run(x_arr[run], y_arr[run], share, method))
+    keep = np.concatenate(kept)
+    return x_arr[keep], y_arr[keep]
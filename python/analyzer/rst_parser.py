@@ -0,0 +1,221 @@
+"""
+Single-pass streaming parser for GPC ``.rst`` text exports.
+
+The parser walks the file once as a small state machine and produces the
+MW-average rows and the per-peak Slice_Table arrays directly: numeric slice
+rows are converted in bounded chunks and appended to ``array('d')`` buffers
+that back the final float64 arrays, so no list of stripped lines or list of
+split string rows is ever built.
+
+Line positions reported in :class:`RstData` count stripped, non-empty lines,
+matching the indices the analyzers historically validated against.
+"""
+
+from array import array
+from dataclasses import dataclass, field
+from typing import IO, Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .base import MW_DATA_OFFSET
+
+# Bump when parsing behaviour changes so stale parse-cache entries are ignored
+RST_PARSER_VERSION = 1
+
+# Parser states
+_HEADER = 0
+_SLICE_TABLE = 1
+
+# 每次交给 numpy 文本解析器转换的最大数据行数
+_CHUNK_ROWS = 8192
+
+
+@dataclass
+class RstData:
+    """Parsed content of one ``.rst`` file."""
+
+    sample_name: str = ""
+    line_count: int = 0
+    mw_start: int = 0
+    mw_end: int = 0
+    slice_table_start: int = 0
+    # MW_Averages 数据行（不含首列标签），样品名在预处理时补到行首
+    mw_values: List[List[str]] = field(default_factory=list)
+    # 成功转换的峰数组（二维 float64；无数据行或无数据列的峰形状为 (n, 0)）
+    peaks: List[np.ndarray] = field(default_factory=list)
+    # 无法转换为数值矩阵的峰（列数不一致或含非数值），仅记录原因
+    peak_errors: List[str] = field(default_factory=list)
+
+    def mw_rows(self) -> List[List[str]]:
+        """MW 汇总行：``[sample_name] + values``，与旧版按行切分结果一致。"""
+        return [[self.sample_name] + values for values in self.mw_values]
+
+
+class _PeakBuilder:
+    """Accumulates one Slice_Table peak into a flat ``array('d')`` buffer.
+
+    Data rows are converted in bounded chunks by numpy's C text parser, so
+    at most ``_CHUNK_ROWS`` raw lines are held before becoming float64 values.
+    """
+
+    __slots__ = ("rows", "columns", "pending", "buffer", "error")
+
+    def __init__(self) -> None:
+        self.rows = 0
+        self.columns: Optional[int] = None
+        self.pending: List[str] = []
+        self.buffer = array("d")
+        self.error = ""
+
+    def add(self, line: str) -> None:
+        self.rows += 1
+        if self.rows == 1 or self.error:
+            # 每个峰的第一行是表头（旧实现以 current_peak[1:] 丢弃）
+            return
+        # 行已去除首尾空白，按制表符切分后丢弃最后一列（与旧实现一致），
+        # 因此有效列数等于行内制表符个数
+        columns = line.count("\t")
+        if self.columns is None:
+            self.columns = columns
+        elif columns != self.columns:
+            self.error = "峰数据列数不一致"
+            self.pending = []
+            return
+        if columns:
+            self.pending.append(line)
+            if len(self.pending) >= _CHUNK_ROWS:
+                self._flush()
+
+    def _flush(self) -> None:
+        if not self.pending or self.error:
+            return
+        try:
+            chunk = np.loadtxt(
+                self.pending,
+                dtype=np.float64,
+                delimiter="\t",
+                usecols=range(self.columns or 0),
+                comments=None,
+                ndmin=2,
+            )
+        except ValueError as exc:
+            self.error = str(exc)
+        else:
+            self.buffer.frombytes(memoryview(chunk).cast("B"))
+        self.pending = []
+
+    def finish(self) -> Optional[np.ndarray]:
+        """Return the peak as a 2-D float64 array, or ``None`` if it failed to convert."""
+        self._flush()
+        if self.error:
+            return None
+        data_rows = max(self.rows - 1, 0)
+        if data_rows == 0 or not self.columns:
+            return np.empty((data_rows, 0), dtype=np.float64)
+        # 直接复用 array('d') 的内存，不再额外复制
+        return np.frombuffer(self.buffer, dtype=np.float64).reshape(data_rows, self.columns)
+
+
+def parse_rst_stream(handle: IO[str]) -> RstData:
+    """Parse an open ``.rst`` text stream in a single pass."""
+    data = RstData()
+    state = _HEADER
+    pos = -1
+    collecting_mw = False
+    # MW_Averages 起点之后的候选数据行（行号, 值）；结束标记位置确定后再截取
+    mw_candidates: List[Tuple[int, List[str]]] = []
+    peak = _PeakBuilder()
+    add_row = peak.add
+
+    for raw_line in handle:
+        line = raw_line.strip()
+        if not line:
+            continue
+        pos += 1
+
+        if state == _SLICE_TABLE:
+            if ("Peak" in line and peak.rows > 1) or "</Slice_Table>" in line:
+                array_ = peak.finish()
+                if array_ is None:
+                    data.peak_errors.append(peak.error)
+                else:
+                    data.peaks.append(array_)
+                peak = _PeakBuilder()
+                add_row = peak.add
+                continue
+            if "RT" in line:
+                continue
+            first_tab = line.find("\t")
+            if first_tab >= 0 and "-2" in line[:first_tab]:
+                continue
+            add_row(line)
+            continue
+
+        if "Sample Name" in line:
+            parts = line.split("\t")
+            if len(parts) > 1:
+                data.sample_name = parts[1]
+            if collecting_mw and pos >= data.mw_start + MW_DATA_OFFSET:
+                _collect_mw_values(mw_candidates, pos, line)
+        elif "<MW_Averages>" in line:
+            data.mw_start = pos
+            mw_candidates = []
+            collecting_mw = True
+        elif "</MW_Averages>" in line:
+            data.mw_end = pos
+            if collecting_mw and pos >= data.mw_start + MW_DATA_OFFSET:
+                _collect_mw_values(mw_candidates, pos, line)
+        elif "<Slice_Table>" in line:
+            data.slice_table_start = pos
+            state = _SLICE_TABLE
+        elif collecting_mw and pos >= data.mw_start + MW_DATA_OFFSET:
+            _collect_mw_values(mw_candidates, pos, line)
+
+    data.line_count = pos + 1
+    data.mw_values = [values for line_pos, values in mw_candidates if line_pos < data.mw_end]
+    return data
+
+
+def _collect_mw_values(
+    candidates: List[Tuple[int, List[str]]], pos: int, line: str
+) -> None:
+    parts = line.split("\t")
+    if len(parts) > 1:
+        candidates.append((pos, parts[1:]))
+
+
+def parse_rst_file(path: str) -> RstData:
+    """Parse an ASCII ``.rst`` file (raises ``UnicodeDecodeError`` on non-ASCII input)."""
+    with open(path, "r", encoding="ascii") as handle:
+        return parse_rst_stream(handle)
+
+
+def encode_rst_data(data: RstData) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+    """Split an :class:`RstData` into arrays and JSON metadata for the parse cache."""
+    arrays = {f"peak_{index}": peak for index, peak in enumerate(data.peaks)}
+    meta = {
+        "sample_name": data.sample_name,
+        "line_count": data.line_count,
+        "mw_start": data.mw_start,
+        "mw_end": data.mw_end,
+        "slice_table_start": data.slice_table_start,
+        "mw_values": data.mw_values,
+        "peak_count": len(data.peaks),
+        "peak_errors": data.peak_errors,
+    }
+    return arrays, meta
+
+
+def decode_rst_data(payload: Tuple[Dict[str, np.ndarray], Dict[str, Any]]) -> RstData:
+    """Inverse of :func:`encode_rst_data`."""
+    arrays, meta = payload
+    return RstData(
+        sample_name=meta["sample_name"],
+        line_count=meta["line_count"],
+        mw_start=meta["mw_start"],
+        mw_end=meta["mw_end"],
+        slice_table_start=meta["slice_table_start"],
+        mw_values=meta["mw_values"],
+        peaks=[arrays[f"peak_{index}"] for index in range(meta["peak_count"])],
+        peak_errors=meta["peak_errors"],
+    )
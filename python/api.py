@@ -2,14 +2,18 @@
 
 from __future__ import annotations
 
+import functools
 import json
 import logging
 import os
 import shutil
 import sys
 import threading
+import time
 import traceback
-from typing import Any, Callable
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from typing import Any, Callable, Iterator
 
 from analyzer import (
     SettingsManager,
@@ -22,6 +26,11 @@ from analyzer import (
     get_profile_dir,
 )
 from analyzer.base import resolve_contained_file, validate_basename
+from analyzer.cancellation import AnalysisCancelled, CancellationToken
+from analyzer.dataset_cache import dataset_cache_budget_from_env, get_dataset_cache
+from analyzer.parse_cache import PARSE_CACHE_KINDS, ParseCache
+from jobs import JOB_STATES, Job, JobManager
+from progress import ProgressEmitter
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +40,8 @@ INVALID_REQUEST = -32600
 METHOD_NOT_FOUND = -32601
 INVALID_PARAMS = -32602
 INTERNAL_ERROR = -32603
+# 与 LSP 的 RequestCancelled 相同：请求被 $/cancelRequest 取消
+REQUEST_CANCELLED = -32800
 
 MethodHandler = Callable[[dict[str, Any]], Any]
 
@@ -54,6 +65,44 @@ class JsonRpcError(Exception):
 _WRITE_LOCK = threading.Lock()
 
 
+class CancellationRegistry:
+    """Cancellation tokens of in-flight requests, keyed by request id."""
+
+    def __init__(self) -> None:
+        self._tokens: dict[int | str, CancellationToken] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, req_id: int | str) -> CancellationToken:
+        """Return the token of ``req_id``, creating it on first use."""
+        with self._lock:
+            token = self._tokens.get(req_id)
+            if token is None:
+                token = self._tokens[req_id] = CancellationToken()
+            return token
+
+    def release(self, req_id: int | str, token: CancellationToken) -> None:
+        """Forget ``req_id`` once the request owning ``token`` has finished."""
+        with self._lock:
+            if self._tokens.get(req_id) is token:
+                del self._tokens[req_id]
+
+    def cancel(self, req_id: int | str) -> bool:
+        """Cancel the request ``req_id``; False when it is not (or no longer) running."""
+        with self._lock:
+            token = self._tokens.get(req_id)
+        if token is None:
+            return False
+        token.cancel()
+        return True
+
+
+_CANCELLATIONS = CancellationRegistry()
+
+
+def _is_request_id(value: Any) -> bool:
+    return isinstance(value, (int, str)) and not isinstance(value, bool)
+
+
 def _write_response(response: dict[str, Any] | list[dict[str, Any]]) -> None:
     """Write a JSON-RPC response to stdout (thread-safe)."""
     line = json.dumps(response, ensure_ascii=False)
@@ -62,6 +111,12 @@ def _write_response(response: dict[str, Any] | list[dict[str, Any]]) -> None:
         sys.stdout.flush()
 
 
+def _respond(response: dict[str, Any] | None) -> None:
+    """Write ``response`` unless the request was a notification."""
+    if response is not None:
+        _write_response(response)
+
+
 def send_notification(method: str, params: dict[str, Any] | None = None) -> None:
     """Send a JSON-RPC notification (no id) for progress updates."""
     msg: dict[str, Any] = {"jsonrpc": "2.0", "method": method}
@@ -70,24 +125,63 @@ def send_notification(method: str, params: dict[str, Any] | None = None) -> None
     _write_response(msg)
 
 
+def _progress_emitter(params: dict[str, Any], analyzer: str) -> ProgressEmitter:
+    """Rate-limited progress emitter shared by one request's callbacks."""
+    emitter = params.get("__progress")
+    if isinstance(emitter, ProgressEmitter):
+        return emitter
+
+    job = params.get("__job")
+    if isinstance(job, Job):
+        manager = _job_manager()
+
+        def send(progress: float, message: str, stats: dict[str, Any]) -> None:
+            manager.report_progress(job, progress, message, stats)
+    else:
+        request_id = params.get("__request_id")
+
+        def send(progress: float, message: str, stats: dict[str, Any]) -> None:
+            send_notification(
+                "progress",
+                {
+                    "progress": progress,
+                    "message": message,
+                    "analyzer": analyzer,
+                    "request_id": request_id,
+                    **stats,
+                },
+            )
+
+    datadir = params.get("datadir")
+    selected_files = params.get("selected_files")
+    emitter = ProgressEmitter(
+        send,
+        datadir=datadir if isinstance(datadir, str) else None,
+        files_total=len(selected_files) if isinstance(selected_files, list) else None,
+    )
+    params["__progress"] = emitter
+    return emitter
+
+
 def _make_progress_callback(
     params: dict[str, Any],
     analyzer: str,
 ) -> Callable[[float, str], None]:
-    """Create a progress callback that emits JSON-RPC notifications."""
-
-    request_id = params.get("__request_id")
-
-    def callback(progress: float, message: str) -> None:
-        send_notification(
-            "progress",
-            {
-                "progress": progress,
-                "message": message,
-                "analyzer": analyzer,
-                "request_id": request_id,
-            },
-        )
+    """Create a progress callback that emits (coalesced) JSON-RPC notifications."""
+    return _progress_emitter(params, analyzer).update
+
+
+def _make_file_callback(params: dict[str, Any], analyzer: str) -> Callable[[dict[str, Any]], None]:
+    """Per-file result callback: feeds the progress throughput and, for jobs, the job's results."""
+    emitter = _progress_emitter(params, analyzer)
+    job = params.get("__job")
+    if not isinstance(job, Job):
+        return lambda item: emitter.file_done(item["file"])
+    manager = _job_manager()
+
+    def callback(item: dict[str, Any]) -> None:
+        emitter.file_done(item["file"])
+        manager.report_file(job, item)
 
     return callback
 
@@ -99,6 +193,16 @@ def _require_param(params: dict[str, Any], key: str, label: str | None = None) -
     return params[key]
 
 
+def _optional_jobs(params: dict[str, Any]) -> int | None:
+    """Return the optional worker-process count (``None``/0 = one per CPU core)."""
+    jobs = params.get("jobs")
+    if jobs is None:
+        return None
+    if isinstance(jobs, bool) or not isinstance(jobs, int) or jobs < 0:
+        raise JsonRpcError(INVALID_PARAMS, "jobs must be a non-negative integer")
+    return jobs
+
+
 def _validate_selected_files(
     datadir: str,
     selected_files: Any,
@@ -191,7 +295,10 @@ def _gpc_analyze(params: dict[str, Any]) -> Any:
         save_file=params.get("save_file", True),
         save_picture=params.get("save_picture", True),
         save_figure_file_gpc=params.get("save_figure_file_gpc", True),
+        jobs=_optional_jobs(params),
         progress_callback=_make_progress_callback(params, "gpc"),
+        cancel_token=params.get("__cancel_token"),
+        file_callback=_make_file_callback(params, "gpc"),
     )
     if selected_files is not None:
         analyzer.selected_file = selected_files
@@ -217,6 +324,20 @@ def _gpc_list_files(params: dict[str, Any]) -> Any:
 # MW handlers
 # ---------------------------------------------------------------------------
 
+def _segment_positions(params: dict[str, Any]) -> list[int | float] | None:
+    """Return the optional ``segmentpos`` parameter sorted from low to high."""
+    if "segmentpos" not in params:
+        return None
+    segments = params["segmentpos"]
+    if (
+        not isinstance(segments, list)
+        or len(segments) < 2
+        or any(isinstance(value, bool) or not isinstance(value, (int, float)) for value in segments)
+    ):
+        raise JsonRpcError(INVALID_PARAMS, "segmentpos must be a list of at least two numbers")
+    return sorted(segments)
+
+
 def _mw_analyze(params: dict[str, Any]) -> Any:
     datadir = params.get("datadir", "")
     selected_files = _validate_selected_files(
@@ -249,13 +370,18 @@ def _mw_analyze(params: dict[str, Any]) -> Any:
         draw_table=params.get("draw_table", True),
         setting_name=params.get("setting_name", DEFAULT_SETTING_NAME),
         progress_callback=progress_callback,
+        cancel_token=params.get("__cancel_token"),
+        file_callback=_make_file_callback(params, "mw"),
+        jobs=_optional_jobs(params),
+        incremental=bool(params.get("incremental", True)),
     )
     analyzer.selected_file = selected_files
 
-    if "segmentpos" in params:
-        analyzer.segmentpos = sorted(params["segmentpos"])
-        analyzer.selectedpos = list(analyzer.segmentpos)
-        analyzer.segmentnum = len(analyzer.segmentpos)
+    segments = _segment_positions(params)
+    if segments is not None:
+        analyzer.segmentpos = segments
+        analyzer.selectedpos = list(segments)
+        analyzer.segmentnum = len(segments)
 
     success = analyzer.run()
     if not success:
@@ -263,6 +389,42 @@ def _mw_analyze(params: dict[str, Any]) -> Any:
     return {"success": True, "output_dir": analyzer.output_dir}
 
 
+def _mw_compute(params: dict[str, Any]) -> Any:
+    """Headless MW statistics: segment percentages and Mn/Mw/PDI, no figures."""
+    datadir = params.get("datadir", "")
+    selected_files = _validate_selected_files(
+        datadir,
+        params.get("selected_files"),
+        _GPC_INPUT_SUFFIXES,
+        required=True,
+    )
+    assert selected_files is not None
+    segments = _segment_positions(params)
+
+    from analyzer.mw import MolecularWeightAnalyzer
+
+    analyzer = MolecularWeightAnalyzer(
+        datadir=datadir,
+        save_file=False,
+        save_picture=False,
+        setting_name=params.get("setting_name", DEFAULT_SETTING_NAME),
+        progress_callback=_make_progress_callback(params, "mw"),
+        cancel_token=params.get("__cancel_token"),
+        file_callback=_make_file_callback(params, "mw"),
+        jobs=_optional_jobs(params),
+    )
+    analyzer.selected_file = selected_files
+    if segments is not None:
+        analyzer.segmentpos = segments
+        analyzer.selectedpos = list(segments)
+        analyzer.segmentnum = len(segments)
+
+    table = analyzer.compute_statistics()
+    if not table["rows"]:
+        raise JsonRpcError(INTERNAL_ERROR, "MW statistics failed", {"errors": table["errors"]})
+    return {"success": True, "boundaries": list(analyzer.selectedpos), **table}
+
+
 def _mw_list_files(params: dict[str, Any]) -> Any:
     datadir = params.get("datadir", "")
     return {"files": _list_files_with_suffixes(datadir, _GPC_INPUT_SUFFIXES)}
@@ -273,11 +435,16 @@ def _mw_list_files(params: dict[str, Any]) -> Any:
 # ---------------------------------------------------------------------------
 
 def _dsc_analyze(params: dict[str, Any]) -> Any:
-    from analyzer.dsc import DSCAnalyzer
+    from analyzer.dsc import SEGMENT_FORMATS, DSCAnalyzer
 
     datadir = params.get("datadir", "")
     if not datadir:
         raise JsonRpcError(INVALID_PARAMS, "datadir is required for DSC analysis")
+    segment_format = params.get("segment_format", "csv")
+    if segment_format not in SEGMENT_FORMATS:
+        raise JsonRpcError(
+            INVALID_PARAMS, f"segment_format must be one of {', '.join(SEGMENT_FORMATS)}"
+        )
 
     selected_files = _validate_selected_files(
         datadir,
@@ -289,6 +456,7 @@ def _dsc_analyze(params: dict[str, Any]) -> Any:
     analyzer = DSCAnalyzer(
         datadir=datadir,
         save_seg_mode=params.get("save_seg_mode", True),
+        segment_format=segment_format,
         draw_seg_mode=params.get("draw_seg_mode", True),
         draw_cycle=params.get("draw_cycle", True),
         save_cycle_pic=params.get("save_cycle_pic", True),
@@ -303,7 +471,10 @@ def _dsc_analyze(params: dict[str, Any]) -> Any:
         title_font_size=params.get("title_font_size"),
         axis_font_size=params.get("axis_font_size"),
         transparent_back=params.get("transparent_back"),
+        jobs=_optional_jobs(params),
         progress_callback=_make_progress_callback(params, "dsc"),
+        cancel_token=params.get("__cancel_token"),
+        file_callback=_make_file_callback(params, "dsc"),
     )
     if selected_files is not None:
         analyzer.selected_file = selected_files
@@ -363,7 +534,10 @@ def _ir_analyze(params: dict[str, Any]) -> Any:
         draw_overlay=params.get("draw_overlay", True),
         normalize_overlay=params.get("normalize_overlay", True),
         normalization_peak=params.get("normalization_peak", DEFAULT_NORMALIZATION_PEAK),
+        save_matrix=params.get("save_matrix", False),
         progress_callback=_make_progress_callback(params, "ir"),
+        cancel_token=params.get("__cancel_token"),
+        file_callback=_make_file_callback(params, "ir"),
     )
 
     success = analyzer.run()
@@ -377,6 +551,29 @@ def _ir_analyze(params: dict[str, Any]) -> Any:
     }
 
 
+def _ir_search(params: dict[str, Any]) -> Any:
+    from analyzer.ir import DEFAULT_NORMALIZATION_PEAK
+    from analyzer.ir_search import DEFAULT_TOP_K, search
+
+    datadir = params.get("datadir", "")
+    if not isinstance(datadir, str) or not os.path.isdir(datadir):
+        raise JsonRpcError(INVALID_PARAMS, "datadir must be an existing directory")
+    query = _require_param(params, "query")
+
+    result = search(
+        datadir,
+        query,
+        top_k=params.get("top_k", DEFAULT_TOP_K),
+        metric=params.get("metric", "correlation"),
+        normalization_peak=params.get("normalization_peak", DEFAULT_NORMALIZATION_PEAK),
+        refresh=params.get("refresh", True),
+        jobs=_optional_jobs(params),
+        progress_callback=_make_progress_callback(params, "ir"),
+        cancel_token=params.get("__cancel_token"),
+    )
+    return {"success": True, **result}
+
+
 # ---------------------------------------------------------------------------
 # Settings handlers
 # ---------------------------------------------------------------------------
@@ -465,6 +662,19 @@ def _settings_list(params: dict[str, Any]) -> Any:
 # System handlers
 # ---------------------------------------------------------------------------
 
+def _analyzer_output_dirs(datadir: str) -> dict[str, list[str]]:
+    """Output directories each analyzer writes for ``datadir``."""
+    # 与 BaseAnalyzer 一致使用 abspath（不解析符号链接），
+    # 保证清理目标与分析器实际写入的兄弟目录相同。
+    base = os.path.dirname(os.path.abspath(datadir))
+    return {
+        "mw": [os.path.join(base, "Mw_output")],
+        "gpc": [os.path.join(base, "GPC_output")],
+        "dsc": [os.path.join(base, "DSC_Cycle"), os.path.join(base, "DSC_Pic")],
+        "ir": [os.path.join(get_install_dir(), "IR_output")],
+    }
+
+
 def _system_clean_output(params: dict[str, Any]) -> Any:
     if params.get("confirm") is not True:
         raise JsonRpcError(INVALID_PARAMS, "confirm=true is required to clean outputs")
@@ -473,16 +683,9 @@ def _system_clean_output(params: dict[str, Any]) -> Any:
     if not isinstance(datadir, str) or not os.path.isdir(datadir):
         raise JsonRpcError(INVALID_PARAMS, "datadir must be an existing directory")
 
-    # 与 BaseAnalyzer 一致使用 abspath（不解析符号链接），
-    # 保证清理目标与分析器实际写入的兄弟目录相同。
-    base = os.path.dirname(os.path.abspath(datadir))
-    output_dirs = list(dict.fromkeys([
-        os.path.join(base, "Mw_output"),
-        os.path.join(base, "GPC_output"),
-        os.path.join(base, "DSC_Cycle"),
-        os.path.join(base, "DSC_Pic"),
-        os.path.join(get_install_dir(), "IR_output"),
-    ]))
+    output_dirs = list(dict.fromkeys(
+        path for paths in _analyzer_output_dirs(datadir).values() for path in paths
+    ))
     cleaned: list[str] = []
     for dir_path in output_dirs:
         if os.path.isdir(dir_path) and not os.path.islink(dir_path):
@@ -510,6 +713,115 @@ def _system_get_default_ir_datapath(params: dict[str, Any]) -> Any:
     return {"datapath": datapath}
 
 
+def _system_cache_stats(params: dict[str, Any]) -> Any:
+    """Return the in-memory dataset cache counters of this sidecar process."""
+    return get_dataset_cache().stats()
+
+
+def _cache_info(params: dict[str, Any]) -> Any:
+    """Summarise the on-disk parse cache."""
+    return ParseCache().stats()
+
+
+def _cache_purge(params: dict[str, Any]) -> Any:
+    """Remove parse cache entries (all, or only one ``kind``)."""
+    kind = params.get("kind")
+    if kind is not None and kind not in PARSE_CACHE_KINDS:
+        raise JsonRpcError(
+            INVALID_PARAMS,
+            f"kind must be one of: {', '.join(PARSE_CACHE_KINDS)}",
+        )
+    result = ParseCache().purge(kind)
+    return {"success": True, **result}
+
+
+def _cancel_request(params: dict[str, Any]) -> Any:
+    """Ask the running or queued request ``id`` to stop at its next checkpoint."""
+    req_id = _require_param(params, "id")
+    if not _is_request_id(req_id):
+        raise JsonRpcError(INVALID_PARAMS, "id must be a string or an integer")
+    return {"cancelled": _CANCELLATIONS.cancel(req_id)}
+
+
+# ---------------------------------------------------------------------------
+# Jobs
+# ---------------------------------------------------------------------------
+
+_JOBS: JobManager | None = None
+_JOBS_LOCK = threading.Lock()
+
+
+def _job_manager() -> JobManager:
+    """Job registry of this sidecar, loaded from its journal on first use."""
+    global _JOBS
+    with _JOBS_LOCK:
+        if _JOBS is None:
+            _JOBS = JobManager(os.path.join(get_install_dir(), "jobs"), notify=send_notification)
+        return _JOBS
+
+
+def _require_job(params: dict[str, Any]) -> Job:
+    job = _job_manager().get(_require_param(params, "id"))
+    if job is None:
+        raise JsonRpcError(INVALID_PARAMS, f"Unknown job: {params['id']}")
+    return job
+
+
+def _job_submit(params: dict[str, Any]) -> Any:
+    """Queue a long-running method call and return its job id immediately."""
+    method = _require_param(params, "method")
+    if method not in POOLED_METHODS:
+        raise JsonRpcError(
+            INVALID_PARAMS,
+            f"method must be one of: {', '.join(POOLED_METHODS)}",
+        )
+    job_params = params.get("params", {})
+    if not isinstance(job_params, dict):
+        raise JsonRpcError(INVALID_PARAMS, "params must be an object")
+    # 内部参数（__request_id 等）只能由服务端注入
+    job_params = {key: value for key, value in job_params.items() if not key.startswith("__")}
+
+    manager = _job_manager()
+    job = manager.create(method, job_params)
+    _shared_dispatcher().submit_job(job, manager)
+    return job.status()
+
+
+def _job_status(params: dict[str, Any]) -> Any:
+    """Return the state and latest progress of one job."""
+    return _require_job(params).status()
+
+
+def _job_list(params: dict[str, Any]) -> Any:
+    """List the journaled jobs in submission order, optionally of one ``state``."""
+    state = params.get("state")
+    if state is not None and state not in JOB_STATES:
+        raise JsonRpcError(INVALID_PARAMS, f"state must be one of: {', '.join(JOB_STATES)}")
+    return {"jobs": [job.status() for job in _job_manager().list(state)]}
+
+
+def _job_cancel(params: dict[str, Any]) -> Any:
+    """Cancel a queued or running job."""
+    job = _require_job(params)
+    return {"cancelled": not job.finished and _CANCELLATIONS.cancel(job.id)}
+
+
+def _job_result(params: dict[str, Any]) -> Any:
+    """Per-file results from index ``since`` on, plus the final result once finished."""
+    job = _require_job(params)
+    since = params.get("since", 0)
+    if isinstance(since, bool) or not isinstance(since, int) or since < 0:
+        raise JsonRpcError(INVALID_PARAMS, "since must be a non-negative integer")
+    files = job.files[since:]
+    return {
+        "job": job.status(),
+        "files": files,
+        "next": since + len(files),
+        "result": job.result,
+        "artifacts": job.artifacts(),
+    }
+
+
 # ---------------------------------------------------------------------------
 # Method registry
 # ---------------------------------------------------------------------------
@@ -519,10 +831,12 @@ METHOD_TABLE: dict[str, MethodHandler] = {
     "gpc.list_files": _gpc_list_files,
     "mw.analyze": _mw_analyze,
     "mw.list_files": _mw_list_files,
+    "mw.compute": _mw_compute,
     "dsc.analyze": _dsc_analyze,
     "dsc.list_files": _dsc_list_files,
     "ir.analyze": _ir_analyze,
     "ir.list_files": _ir_list_files,
+    "ir.search": _ir_search,
     "settings.load": _settings_load,
     "settings.save": _settings_save,
     "settings.delete": _settings_delete,
@@ -530,6 +844,15 @@ METHOD_TABLE: dict[str, MethodHandler] = {
     "system.clean_output": _system_clean_output,
     "system.get_default_datapath": _system_get_default_datapath,
     "system.get_default_ir_datapath": _system_get_default_ir_datapath,
+    "system.cache_stats": _system_cache_stats,
+    "cache.info": _cache_info,
+    "cache.purge": _cache_purge,
+    "$/cancelRequest": _cancel_request,
+    "job.submit": _job_submit,
+    "job.status": _job_status,
+    "job.list": _job_list,
+    "job.cancel": _job_cancel,
+    "job.result": _job_result,
 }
 
 
@@ -586,8 +909,19 @@ def _handle_request(request: Any) -> dict[str, Any] | None:
             return None
         return _make_error_response(req_id, METHOD_NOT_FOUND, f"Method not found: {method}")
 
+    token: CancellationToken | None = None
+    if not is_notification and _is_request_id(req_id):
+        token = _CANCELLATIONS.acquire(req_id)
+        handler_params["__cancel_token"] = token
+
     try:
+        # 排队期间已被取消的请求不再执行
+        if token is not None:
+            token.raise_if_cancelled()
         result = handler(handler_params)
+    except AnalysisCancelled:
+        logger.info("Request %s (%s) cancelled", req_id, method)
+        return _make_error_response(req_id, REQUEST_CANCELLED, "Request cancelled")
     except JsonRpcError as exc:
         if is_notification:
             return None
@@ -606,6 +940,13 @@ def _handle_request(request: Any) -> dict[str, Any] | None:
             str(exc),
             traceback.format_exc(),
         )
+    finally:
+        if token is not None:
+            _CANCELLATIONS.release(req_id, token)
+        # 限速时暂存的最后一条进度先于响应送出
+        emitter = handler_params.get("__progress")
+        if isinstance(emitter, ProgressEmitter):
+            emitter.flush()
 
     # Notifications must not produce a response
     if is_notification:
@@ -614,8 +955,109 @@ def _handle_request(request: Any) -> dict[str, Any] | None:
     return _make_success_response(req_id, result)
 
 
-def handle_line(line: str) -> None:
-    """Parse a single line of JSON-RPC input and write the response."""
+DEFAULT_BATCH_WORKERS = 8
+_BATCH_EXECUTOR: ThreadPoolExecutor | None = None
+_BATCH_LOCK = threading.Lock()
+
+
+def _batch_executor() -> ThreadPoolExecutor:
+    global _BATCH_EXECUTOR
+    with _BATCH_LOCK:
+        if _BATCH_EXECUTOR is None:
+            _BATCH_EXECUTOR = ThreadPoolExecutor(
+                max_workers=max_concurrent_from_env("batch", DEFAULT_BATCH_WORKERS),
+                thread_name_prefix="rpc-batch",
+            )
+        return _BATCH_EXECUTOR
+
+
+class _BatchResponses:
+    """Responses of one batch, written as a single array once every item has answered.
+
+    Items answer from whichever thread ran them; the last one to finish sends
+    the ``batch.timing`` notification and writes the array in request order.
+    """
+
+    def __init__(self, items: list[Any]) -> None:
+        self._items = items
+        self._responses: list[dict[str, Any] | None] = [None] * len(items)
+        self._timings: list[dict[str, Any]] = [{} for _ in items]
+        self._begun: list[float | None] = [None] * len(items)
+        self._pending = len(items)
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+        self.done = threading.Event()
+
+    def start(self, index: int) -> None:
+        """Mark item ``index`` as running (queue time is not counted in its timing)."""
+        self._begun[index] = time.perf_counter()
+
+    def respond(self, index: int, response: dict[str, Any] | None) -> None:
+        item = self._items[index]
+        method = item.get("method") if isinstance(item, dict) else None
+        finished = time.perf_counter()
+        with self._lock:
+            self._responses[index] = response
+            begin = self._begun[index] or self._started
+            self._timings[index] = {
+                "index": index,
+                "id": item.get("id") if isinstance(item, dict) else None,
+                "method": method if isinstance(method, str) else None,
+                "ms": round((finished - begin) * 1000, 3),
+            }
+            self._pending -= 1
+            last = self._pending == 0
+        if last:
+            self._finish()
+
+    def _finish(self) -> None:
+        elapsed_ms = round((time.perf_counter() - self._started) * 1000, 3)
+        slowest = max(self._timings, key=lambda timing: timing["ms"])
+        logger.info(
+            "Batch of %d requests took %.1f ms (slowest: %s, %.1f ms)",
+            len(self._items), elapsed_ms, slowest["method"], slowest["ms"],
+        )
+        send_notification("batch.timing", {"elapsed_ms": elapsed_ms, "items": self._timings})
+        responses = [response for response in self._responses if response is not None]
+        if responses:
+            _write_response(responses)
+        self.done.set()
+
+
+def _handle_batch(items: list[Any], dispatcher: RequestDispatcher) -> _BatchResponses:
+    """Start every item of a batch; the response array is written when the last one answers.
+
+    Long-running (pooled) items go through ``dispatcher`` exactly like single
+    requests, so they share its per-analyzer concurrency limits and output
+    directory locks. The other items run concurrently on the batch pool.
+    """
+    batch = _BatchResponses(items)
+    executor = _batch_executor()
+
+    def run(index: int) -> None:
+        batch.start(index)
+        batch.respond(index, _handle_request(items[index]))
+
+    for index, item in enumerate(items):
+        queued = dispatcher.submit(
+            item,
+            respond=functools.partial(batch.respond, index),
+            on_start=functools.partial(batch.start, index),
+        )
+        if not queued:
+            executor.submit(run, index)
+    return batch
+
+
+def handle_line(line: str, dispatcher: RequestDispatcher | None = None) -> None:
+    """Parse a single line of JSON-RPC input and write the response.
+
+    With a ``dispatcher``, long-running requests are handed to its worker
+    pools and answered when they finish, and a batch's response array is
+    written once its last item answers, so the reader never waits for one.
+    Without a dispatcher, batches use the shared one and are answered before
+    this returns.
+    """
     try:
         request = json.loads(line)
     except json.JSONDecodeError as exc:
@@ -629,13 +1071,14 @@ def handle_line(line: str) -> None:
                 _make_error_response(None, INVALID_REQUEST, "Batch request must not be empty")
             )
             return
-        responses: list[dict[str, Any]] = []
-        for item in request:
-            resp = _handle_request(item)
-            if resp is not None:
-                responses.append(resp)
-        if responses:
-            _write_response(responses)
+        batch = _handle_batch(request, dispatcher or _shared_dispatcher())
+        if dispatcher is None:
+            # 无调度器时与单个请求一样，返回前写出响应；
+            # 否则读取线程继续处理后续请求（包括 $/cancelRequest）
+            batch.done.wait()
+        return
+
+    if dispatcher is not None and dispatcher.submit(request):
         return
 
     resp = _handle_request(request)
@@ -643,19 +1086,196 @@ def handle_line(line: str) -> None:
         _write_response(resp)
 
 
+# ---------------------------------------------------------------------------
+# Concurrent dispatch
+# ---------------------------------------------------------------------------
+
+# Long-running methods and the worker pool (one per analyzer) they run on.
+# Everything else is answered inline by the stdin reader.
+POOLED_METHODS: dict[str, str] = {
+    "gpc.analyze": "gpc",
+    "mw.analyze": "mw",
+    "mw.compute": "mw",
+    "dsc.analyze": "dsc",
+    "ir.analyze": "ir",
+    "ir.search": "ir",
+    "system.clean_output": "system",
+}
+DEFAULT_MAX_CONCURRENT = 1
+
+
+def max_concurrent_from_env(pool: str, default: int = DEFAULT_MAX_CONCURRENT) -> int:
+    """Worker count of ``pool`` from ``POLYANALYZER_MAX_CONCURRENT_<POOL>``."""
+    raw = os.environ.get(f"POLYANALYZER_MAX_CONCURRENT_{pool.upper()}")
+    try:
+        value = int(raw) if raw else default
+    except ValueError:
+        value = default
+    return max(1, value)
+
+
+def _locked_output_dirs(method: str, params: Any) -> list[str]:
+    """Output directories a request writes; requests sharing one run one at a time."""
+    if not isinstance(params, dict):
+        return []
+    datadir = params.get("datadir")
+    if not isinstance(datadir, str) or not datadir:
+        return []
+    output_dirs = _analyzer_output_dirs(datadir)
+    if method == "system.clean_output":
+        return [path for paths in output_dirs.values() for path in paths]
+    if method.endswith(".analyze"):
+        return output_dirs.get(POOLED_METHODS[method], [])
+    return []
+
+
+class OutputDirLocks:
+    """One lock per output directory, acquired in sorted order to avoid deadlocks."""
+
+    def __init__(self) -> None:
+        self._locks: dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+
+    @contextmanager
+    def hold(self, paths: list[str]) -> Iterator[None]:
+        keys = sorted({os.path.normcase(os.path.abspath(path)) for path in paths})
+        with self._guard:
+            locks = [self._locks.setdefault(key, threading.Lock()) for key in keys]
+        with ExitStack() as stack:
+            for lock in locks:
+                stack.enter_context(lock)
+            yield
+
+
+class RequestDispatcher:
+    """Run pooled methods on per-analyzer thread pools; answer the rest inline.
+
+    Responses are written through ``_write_response`` as each request finishes,
+    so they can arrive in any order; clients match them by ``id``.
+    """
+
+    def __init__(self, limits: dict[str, int] | None = None) -> None:
+        self._limits = dict(limits or {})
+        self._pools: dict[str, ThreadPoolExecutor] = {}
+        self._pools_lock = threading.Lock()
+        self._output_locks = OutputDirLocks()
+
+    def _pool(self, name: str) -> ThreadPoolExecutor:
+        with self._pools_lock:
+            pool = self._pools.get(name)
+            if pool is None:
+                workers = self._limits.get(name) or max_concurrent_from_env(name)
+                pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"rpc-{name}")
+                self._pools[name] = pool
+            return pool
+
+    def submit(
+        self,
+        request: Any,
+        respond: Callable[[dict[str, Any] | None], None] | None = None,
+        on_start: Callable[[], None] | None = None,
+    ) -> bool:
+        """Queue ``request`` on its worker pool; False when it should run inline.
+
+        ``respond(response)`` receives the response (``None`` for a
+        notification); by default it is written to stdout.
+        """
+        if not isinstance(request, dict):
+            return False
+        method = request.get("method")
+        pool_name = POOLED_METHODS.get(method) if isinstance(method, str) else None
+        if pool_name is None:
+            return False
+        # 入队时即登记取消令牌，排队中的请求也能被 $/cancelRequest 取消
+        req_id = request.get("id")
+        token = _CANCELLATIONS.acquire(req_id) if _is_request_id(req_id) else None
+        self._pool(pool_name).submit(self._run, request, token, respond or _respond, on_start)
+        return True
+
+    def submit_job(self, job: Job, manager: JobManager) -> None:
+        """Queue ``job`` on its method's pool; the outcome is recorded on the job."""
+        request = {
+            "jsonrpc": "2.0",
+            "method": job.method,
+            "params": {**job.params, "__job": job},
+            "id": job.id,
+        }
+        token = _CANCELLATIONS.acquire(job.id)
+
+        def finish(response: dict[str, Any]) -> None:
+            error = response.get("error")
+            if error is None:
+                manager.finish(job, "succeeded", result=response["result"])
+            elif error["code"] == REQUEST_CANCELLED:
+                manager.finish(job, "cancelled", error=error)
+            else:
+                manager.finish(job, "failed", error=error)
+
+        self._pool(POOLED_METHODS[job.method]).submit(
+            self._run, request, token, finish, lambda: manager.start(job)
+        )
+
+    def _run(
+        self,
+        request: dict[str, Any],
+        token: CancellationToken | None = None,
+        respond: Callable[[dict[str, Any] | None], None] | None = None,
+        on_start: Callable[[], None] | None = None,
+    ) -> None:
+        try:
+            output_dirs = _locked_output_dirs(request["method"], request.get("params", {}))
+            if token is not None and token.cancelled:
+                # 已取消的请求立即应答，不必等待输出目录锁
+                output_dirs = []
+            with self._output_locks.hold(output_dirs):
+                if on_start is not None:
+                    on_start()
+                response = _handle_request(request)
+        finally:
+            if token is not None:
+                _CANCELLATIONS.release(request["id"], token)
+        (respond or _respond)(response)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting work; with ``wait`` let queued requests finish first."""
+        with self._pools_lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+        for pool in pools:
+            pool.shutdown(wait=wait)
+
+
+_DISPATCHER: RequestDispatcher | None = None
+_DISPATCHER_LOCK = threading.Lock()
+
+
+def _shared_dispatcher() -> RequestDispatcher:
+    """Dispatcher used by ``serve``, by ``job.submit`` and by batches read without one."""
+    global _DISPATCHER
+    with _DISPATCHER_LOCK:
+        if _DISPATCHER is None:
+            _DISPATCHER = RequestDispatcher()
+        return _DISPATCHER
+
+
 def serve() -> None:
     """Main loop: read JSON-RPC requests from stdin, one per line."""
     logger.info("JSON-RPC server started, reading from stdin")
+    # 常驻进程：启用内存数据集缓存，重复分析同一文件时跳过解析
+    get_dataset_cache().configure(dataset_cache_budget_from_env())
+    dispatcher = _shared_dispatcher()
     try:
         for line in sys.stdin:
             line = line.strip()
             if not line:
                 continue
-            handle_line(line)
+            handle_line(line, dispatcher)
     except KeyboardInterrupt:
         logger.info("Server interrupted")
     except Exception:
         logger.exception("Fatal error in server loop")
         raise
     finally:
+        # stdin 关闭后仍让进行中的分析写完响应
+        dispatcher.shutdown(wait=True)
         logger.info("JSON-RPC server stopped")
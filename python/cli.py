@@ -7,6 +7,7 @@ import argparse
 import fnmatch
 import glob
 import json
+import multiprocessing
 import os
 import re
 import shutil
@@ -41,6 +42,7 @@ from analyzer import (
     get_profile_dir,
 )
 from analyzer.base import resolve_contained_file, validate_basename
+from analyzer.parse_cache import PARSE_CACHE_KINDS, ParseCache
 
 EXIT_OK = 0
 EXIT_ANALYSIS_FAILED = 1
@@ -124,6 +126,16 @@ def _parse_segments(value: str) -> list[int]:
     return segments
 
 
+def _parse_jobs(value: str) -> int:
+    try:
+        jobs = int(value)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError("jobs must be an integer") from exc
+    if jobs < 0:
+        raise argparse.ArgumentTypeError("jobs must be 0 (one per CPU core) or a positive integer")
+    return jobs
+
+
 def _parse_ranges(value: str) -> list[int]:
     ranges: list[tuple[int, int]] = []
     for raw_part in re.split(r"[,;]", value):
@@ -197,7 +209,9 @@ def _progress_callback(args: argparse.Namespace) -> Callable[[float, str], None]
     if getattr(args, "quiet", False):
         return None
 
-    stream = sys.stderr if getattr(args, "json", False) else sys.stdout
+    # 机器可读输出（--json / --stats-only）独占 stdout，进度改写到 stderr
+    machine_output = getattr(args, "json", False) or getattr(args, "stats_only", False)
+    stream = sys.stderr if machine_output else sys.stdout
 
     def callback(progress: float, message: str) -> None:
         pct = max(0.0, min(100.0, progress * 100.0))
@@ -317,6 +331,7 @@ def _run_gpc(args: argparse.Namespace) -> int:
         save_file=args.save_csv,
         save_picture=args.save_image,
         save_figure_file_gpc=args.save_xlsx,
+        jobs=args.jobs,
         progress_callback=_progress_callback(args),
     )
     analyzer.selected_file = selected_files
@@ -368,12 +383,16 @@ def _run_mw(args: argparse.Namespace) -> int:
         draw_table=_resolve_setting_value(args, "draw_table", setting, "draw_table", True),
         setting_name=DEFAULT_SETTING_NAME,
         progress_callback=_progress_callback(args),
+        jobs=args.jobs,
     )
     analyzer.selected_file = selected_files
     analyzer.segmentpos = list(segments)
     analyzer.selectedpos = list(segments)
     analyzer.segmentnum = len(segments)
 
+    if args.stats_only:
+        return _emit_mw_stats(args, analyzer, selected_files)
+
     success = analyzer.run()
     if not success:
         raise CliError("Mw analysis failed")
@@ -388,6 +407,31 @@ def _run_mw(args: argparse.Namespace) -> int:
     return EXIT_OK
 
 
+def _emit_mw_stats(args: argparse.Namespace, analyzer: Any, selected_files: list[str]) -> int:
+    """``poly mw --stats-only``: print the statistics table without drawing figures."""
+    from analyzer.mw import write_stats_csv
+
+    try:
+        table = analyzer.compute_statistics()
+    except ValueError as exc:
+        raise CliError(str(exc)) from exc
+    for error in table["errors"]:
+        print(f"{error['file']}: {error['error']}", file=sys.stderr)
+    if not table["rows"]:
+        raise CliError("Mw statistics failed")
+
+    if args.json:
+        print(json.dumps({
+            "success": True,
+            "files": selected_files,
+            "boundaries": list(analyzer.selectedpos),
+            **table,
+        }, ensure_ascii=False, indent=2))
+    else:
+        write_stats_csv(table, sys.stdout)
+    return EXIT_OK
+
+
 def _run_dsc(args: argparse.Namespace) -> int:
     from analyzer.dsc import DSCAnalyzer
 
@@ -401,6 +445,7 @@ def _run_dsc(args: argparse.Namespace) -> int:
     analyzer = DSCAnalyzer(
         datadir=datadir,
         save_seg_mode=args.save_segment_data,
+        segment_format=args.segment_format,
         draw_seg_mode=args.draw_segment_plots,
         draw_cycle=args.draw_cycle,
         save_cycle_pic=args.save_cycle_image,
@@ -415,6 +460,7 @@ def _run_dsc(args: argparse.Namespace) -> int:
         title_font_size=_resolve_setting_value(args, "title_font_size", setting, "title_font_size", 20),
         axis_font_size=_resolve_setting_value(args, "axis_font_size", setting, "axis_font_size", 14),
         transparent_back=_resolve_setting_value(args, "transparent_back", setting, "transparent_back", DEFAULT_TRANSPARENT_BACK),
+        jobs=args.jobs,
         progress_callback=_progress_callback(args),
     )
 
@@ -470,6 +516,7 @@ def _run_ir(args: argparse.Namespace) -> int:
             "normalization_peak",
             1450.0,
         ),
+        save_matrix=args.save_matrix,
         progress_callback=_progress_callback(args),
     )
 
@@ -487,6 +534,43 @@ def _run_ir(args: argparse.Namespace) -> int:
     return EXIT_OK
 
 
+def _run_ir_search(args: argparse.Namespace) -> int:
+    from analyzer.ir import DEFAULT_NORMALIZATION_PEAK
+    from analyzer.ir_search import search
+
+    datadir = _ensure_datadir(args.datadir)
+    query = os.path.abspath(args.query)
+    if not query.lower().endswith(".dpt") or not os.path.isfile(query):
+        raise CliError(f"Query must be an existing .dpt file: {query}", EXIT_ARGUMENT_ERROR)
+
+    try:
+        result = search(
+            datadir,
+            query,
+            top_k=args.top_k,
+            metric=args.metric,
+            normalization_peak=(
+                DEFAULT_NORMALIZATION_PEAK
+                if args.normalization_peak is None
+                else args.normalization_peak
+            ),
+            refresh=args.refresh,
+            jobs=args.jobs,
+            progress_callback=_progress_callback(args),
+        )
+    except ValueError as exc:
+        raise CliError(str(exc), EXIT_ARGUMENT_ERROR) from exc
+
+    if args.json:
+        print(json.dumps({"success": True, **result}, ensure_ascii=False, indent=2))
+        return EXIT_OK
+    index = result["index"]
+    print(f"index: {index['path']} ({index['entries']} spectra, +{index['added']} -{index['removed']})")
+    for rank, match in enumerate(result["matches"], start=1):
+        print(f"{rank:>3}  {match['score']:.4f}  {match['file']}")
+    return EXIT_OK
+
+
 def _run_clean(args: argparse.Namespace) -> int:
     datadir = _ensure_datadir(args.datadir)
     if not args.yes:
@@ -517,6 +601,29 @@ def _run_clean(args: argparse.Namespace) -> int:
     return EXIT_OK
 
 
+def _cache_info(args: argparse.Namespace) -> int:
+    stats = ParseCache().stats()
+    if args.json:
+        print(json.dumps({"success": True, **stats}, ensure_ascii=False, indent=2))
+        return EXIT_OK
+    print(f"cache_dir: {stats['cache_dir']}")
+    print(f"enabled: {stats['enabled']}")
+    print(f"entries: {stats['entries']}")
+    print(f"total_bytes: {stats['total_bytes']} / {stats['max_bytes']}")
+    for kind, bucket in sorted(stats["kinds"].items()):
+        print(f"  {kind}: {bucket['entries']} entries, {bucket['bytes']} bytes")
+    return EXIT_OK
+
+
+def _cache_purge(args: argparse.Namespace) -> int:
+    result = ParseCache().purge(args.kind)
+    if args.json:
+        print(json.dumps({"success": True, **result}, ensure_ascii=False, indent=2))
+    else:
+        print(f"Removed {result['removed_entries']} entries ({result['freed_bytes']} bytes)")
+    return EXIT_OK
+
+
 def _settings_list(args: argparse.Namespace) -> int:
     manager = _settings_manager(args.type)
     default_name, _default_content = _default_settings(args.type)
@@ -584,6 +691,10 @@ def _add_file_args(parser: argparse.ArgumentParser) -> None:
     )
 
 
+def _add_jobs_arg(parser: argparse.ArgumentParser, help_text: str) -> None:
+    parser.add_argument("--jobs", type=_parse_jobs, default=0, metavar="N", help=help_text)
+
+
 def _add_style_args(parser: argparse.ArgumentParser, *, include_bar: bool) -> None:
     if include_bar:
         parser.add_argument("--bar-color", help="Bar color, e.g. #002FA7.")
@@ -631,6 +742,7 @@ def build_parser() -> argparse.ArgumentParser:
     gpc.add_argument("--no-csv", dest="save_csv", action="store_false", default=True, help="Do not write GPC CSV summary.")
     gpc.add_argument("--no-image", dest="save_image", action="store_false", default=True, help="Do not write PNG image.")
     gpc.add_argument("--no-xlsx", dest="save_xlsx", action="store_false", default=True, help="Do not write XLSX plot data.")
+    _add_jobs_arg(gpc, "Worker processes for parsing input files (0 = one per CPU core, default).")
     gpc.set_defaults(func=_run_gpc)
 
     mw = subparsers.add_parser("mw", help="Run molecular-weight distribution analysis for .rst/.xls/.xlsx files.")
@@ -642,6 +754,12 @@ def build_parser() -> argparse.ArgumentParser:
     segment_group.add_argument("--segments", type=_parse_segments, help="Comma-separated molecular-weight segment positions.")
     segment_group.add_argument("--ranges", type=_parse_ranges, help="Continuous ranges such as 0-5000,5000-10000.")
     mw.add_argument("--no-image", dest="save_image", action="store_false", default=True, help="Do not write PNG image.")
+    mw.add_argument(
+        "--stats-only",
+        action="store_true",
+        help="Print segment percentages and Mn/Mw/PDI as CSV (or JSON with --json) without drawing figures.",
+    )
+    _add_jobs_arg(mw, "Worker processes for rendering figures (0 = one per CPU core, default).")
     _add_style_args(mw, include_bar=True)
     mw.set_defaults(func=_run_mw)
 
@@ -654,9 +772,16 @@ def build_parser() -> argparse.ArgumentParser:
     dsc.add_argument("--left-length", type=float, default=1.9, help="Left trim length for each cycle.")
     dsc.add_argument("--right-length", type=float, default=1.9, help="Right trim length for each cycle.")
     dsc.add_argument("--no-segment-data", dest="save_segment_data", action="store_false", default=True)
+    dsc.add_argument(
+        "--segment-format",
+        choices=["csv", "npy", "both"],
+        default="csv",
+        help="Format of saved cycle segments: text CSV, memory-mappable .npy, or both.",
+    )
     dsc.add_argument("--no-segment-plots", dest="draw_segment_plots", action="store_false", default=True)
     dsc.add_argument("--no-cycle", dest="draw_cycle", action="store_false", default=True)
     dsc.add_argument("--no-cycle-image", dest="save_cycle_image", action="store_false", default=True)
+    _add_jobs_arg(dsc, "Worker processes for processing input files (0 = one per CPU core, default).")
     _add_style_args(dsc, include_bar=False)
     dsc.set_defaults(func=_run_dsc)
 
@@ -686,14 +811,59 @@ def build_parser() -> argparse.ArgumentParser:
         type=float,
         help="Normalization peak in cm^-1 (400-4000).",
     )
+    ir_parser.add_argument(
+        "--save-matrix",
+        action="store_true",
+        help="Also save all spectra on a shared wavenumber grid as .npy files.",
+    )
     ir_parser.set_defaults(func=_run_ir)
 
+    ir_search = subparsers.add_parser(
+        "ir-search",
+        help="Find the .dpt spectra in --datadir most similar to a query spectrum.",
+    )
+    _add_common_output_args(ir_search)
+    ir_search.add_argument("--datadir", required=True, help="Reference directory of .dpt spectra to search.")
+    ir_search.add_argument("--query", required=True, help="Path of the .dpt spectrum to look up.")
+    ir_search.add_argument("--top-k", type=int, default=10, metavar="K", help="Number of matches to report (default 10).")
+    ir_search.add_argument(
+        "--metric",
+        choices=["correlation", "cosine"],
+        default="correlation",
+        help="Similarity measure (default correlation).",
+    )
+    ir_search.add_argument(
+        "--normalization-peak",
+        type=float,
+        help="Normalization peak in cm^-1 (400-4000, default 1450).",
+    )
+    ir_search.add_argument(
+        "--no-refresh",
+        dest="refresh",
+        action="store_false",
+        help="Query the stored index without rescanning --datadir for changes.",
+    )
+    _add_jobs_arg(ir_search, "Worker processes for indexing new spectra (0 = one per CPU core, default).")
+    ir_search.set_defaults(func=_run_ir_search)
+
     clean = subparsers.add_parser("clean", help="Clean known output directories next to --datadir.")
     _add_common_output_args(clean)
     clean.add_argument("--datadir", required=True, help="Data directory whose sibling output folders should be cleaned.")
     clean.add_argument("--yes", action="store_true", help="Confirm output directory cleanup.")
     clean.set_defaults(func=_run_clean)
 
+    cache = subparsers.add_parser("cache", help="Inspect or purge the parsed-input cache.")
+    cache_subparsers = cache.add_subparsers(dest="cache_command")
+
+    cache_info = cache_subparsers.add_parser("info", help="Show cache location, size and entries per kind.")
+    _add_common_output_args(cache_info)
+    cache_info.set_defaults(func=_cache_info)
+
+    cache_purge = cache_subparsers.add_parser("purge", help="Delete cached parse results.")
+    _add_common_output_args(cache_purge)
+    cache_purge.add_argument("--kind", choices=list(PARSE_CACHE_KINDS), help="Only purge entries of this input kind.")
+    cache_purge.set_defaults(func=_cache_purge)
+
     settings = subparsers.add_parser("settings", help="Manage MW/DSC/IR analysis profiles.")
     settings_subparsers = settings.add_subparsers(dest="settings_command")
 
@@ -754,4 +924,5 @@ def main(argv: list[str] | None = None) -> int:
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     raise SystemExit(main())
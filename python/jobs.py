@@ -0,0 +1,287 @@
+"""Asynchronous jobs for the JSON-RPC sidecar.
+
+A job wraps one long-running method call (``dsc.analyze``, ``ir.search`` ...).
+``job.submit`` answers with the job id straight away; the call runs on the
+dispatcher's worker pools, and its progress, per-file results and outcome are
+recorded on the ``Job``.
+
+Every job is journaled under ``<data root>/jobs``: ``<id>.json`` holds its
+state and is rewritten atomically on each state change, ``<id>.files.jsonl``
+gets one line per finished input file. A restarted sidecar reloads the
+journal, so finished jobs and the artifacts they produced stay reportable
+without re-running; jobs that were still queued or running are marked
+``interrupted``.
+"""
+
+from __future__ import annotations
+
+import glob
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_VERSION = 1
+JOB_STATES = ("queued", "running", "succeeded", "failed", "cancelled", "interrupted")
+ACTIVE_STATES = ("queued", "running")
+# Finished jobs kept in the journal; the oldest are pruned beyond this
+MAX_FINISHED_JOBS = 100
+
+STATE_SUFFIX = ".json"
+FILES_SUFFIX = ".files.jsonl"
+
+Notifier = Callable[[str, dict[str, Any]], None]
+
+
+@dataclass
+class Job:
+    """One submitted method call and everything known about its run."""
+
+    id: str
+    method: str
+    params: dict[str, Any]
+    state: str = "queued"
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    progress: float = 0.0
+    message: str = ""
+    files: list[dict[str, Any]] = field(default_factory=list)
+    result: Any = None
+    error: Optional[dict[str, Any]] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.state not in ACTIVE_STATES
+
+    def status(self) -> dict[str, Any]:
+        """Summary of the job without its per-file results and final result."""
+        return {
+            "id": self.id,
+            "method": self.method,
+            "state": self.state,
+            "progress": self.progress,
+            "message": self.message,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "files": len(self.files),
+            "error": self.error,
+        }
+
+    def artifacts(self) -> list[dict[str, Any]]:
+        """Output paths named in the result, with whether each still exists."""
+        if not isinstance(self.result, dict):
+            return []
+        paths: list[str] = []
+        output_dir = self.result.get("output_dir")
+        if isinstance(output_dir, str):
+            paths.append(output_dir)
+        generated = self.result.get("generated_files")
+        if isinstance(generated, list):
+            paths.extend(path for path in generated if isinstance(path, str))
+        return [{"path": path, "exists": os.path.exists(path)} for path in paths]
+
+    def to_record(self) -> dict[str, Any]:
+        record = {key: value for key, value in self.status().items() if key != "files"}
+        record.update(version=JOURNAL_VERSION, params=self.params, result=self.result)
+        return record
+
+    @classmethod
+    def from_record(cls, record: dict[str, Any]) -> "Job":
+        if record.get("version") != JOURNAL_VERSION or record.get("state") not in JOB_STATES:
+            raise ValueError("unsupported job record")
+        return cls(
+            id=str(record["id"]),
+            method=str(record["method"]),
+            params=dict(record.get("params") or {}),
+            state=record["state"],
+            created_at=float(record["created_at"]),
+            started_at=record.get("started_at"),
+            finished_at=record.get("finished_at"),
+            progress=float(record.get("progress", 0.0)),
+            message=str(record.get("message", "")),
+            result=record.get("result"),
+            error=record.get("error"),
+        )
+
+
+class JobManager:
+    """Registry of jobs backed by an on-disk journal.
+
+    The manager only records what happens to a job; running it is up to the
+    caller, which reports back through ``start``, ``report_progress``,
+    ``report_file`` and ``finish``. ``notify(method, params)`` receives a
+    ``job.state``, ``job.progress`` or ``job.partial`` notification for each.
+    """
+
+    def __init__(
+        self,
+        journal_dir: str,
+        notify: Optional[Notifier] = None,
+        max_finished: int = MAX_FINISHED_JOBS,
+    ) -> None:
+        self.journal_dir = journal_dir
+        self.max_finished = max_finished
+        self._notify = notify
+        self._jobs: dict[str, Job] = {}
+        self._lock = threading.Lock()
+        os.makedirs(journal_dir, exist_ok=True)
+        self._load()
+
+    # -- queries -----------------------------------------------------------
+
+    def get(self, job_id: Any) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id) if isinstance(job_id, str) else None
+
+    def list(self, state: Optional[str] = None) -> list[Job]:
+        """Jobs in submission order, optionally only those in ``state``."""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [job for job in jobs if state is None or job.state == state]
+
+    # -- lifecycle ---------------------------------------------------------
+
+    def create(self, method: str, params: dict[str, Any]) -> Job:
+        job = Job(id=uuid.uuid4().hex, method=method, params=dict(params))
+        with self._lock:
+            self._jobs[job.id] = job
+            expired = self._expired_jobs()
+            for old in expired:
+                del self._jobs[old.id]
+        for old in expired:
+            self._remove_journal(old.id)
+        self._save(job)
+        return job
+
+    def start(self, job: Job) -> None:
+        with self._lock:
+            job.state = "running"
+            job.started_at = time.time()
+        self._save(job)
+        self._send("job.state", job.status())
+
+    def report_progress(
+        self,
+        job: Job,
+        progress: float,
+        message: str,
+        stats: Optional[dict[str, Any]] = None,
+    ) -> None:
+        # Progress is frequent and only journaled with the next state change
+        with self._lock:
+            job.progress = progress
+            job.message = message
+        self._send(
+            "job.progress",
+            {"job_id": job.id, "progress": progress, "message": message, **(stats or {})},
+        )
+
+    def report_file(self, job: Job, item: dict[str, Any]) -> None:
+        line = json.dumps(item, ensure_ascii=False)
+        with self._lock:
+            index = len(job.files)
+            job.files.append(item)
+            with open(self._path(job.id, FILES_SUFFIX), "a", encoding="utf-8") as handle:
+                handle.write(line + "\n")
+        self._send("job.partial", {"job_id": job.id, "index": index, "item": item})
+
+    def finish(
+        self,
+        job: Job,
+        state: str,
+        result: Any = None,
+        error: Optional[dict[str, Any]] = None,
+    ) -> None:
+        if state in ACTIVE_STATES or state not in JOB_STATES:
+            raise ValueError(f"not a final job state: {state}")
+        with self._lock:
+            job.state = state
+            job.finished_at = time.time()
+            job.result = result
+            job.error = error
+            if state == "succeeded":
+                job.progress = 1.0
+        self._save(job)
+        self._send("job.state", job.status())
+
+    # -- journal -----------------------------------------------------------
+
+    def _path(self, job_id: str, suffix: str) -> str:
+        return os.path.join(self.journal_dir, job_id + suffix)
+
+    def _save(self, job: Job) -> None:
+        with self._lock:
+            payload = json.dumps(job.to_record(), ensure_ascii=False)
+        fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=STATE_SUFFIX, dir=self.journal_dir)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                handle.write(payload)
+            os.replace(tmp_path, self._path(job.id, STATE_SUFFIX))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _remove_journal(self, job_id: str) -> None:
+        for suffix in (STATE_SUFFIX, FILES_SUFFIX):
+            try:
+                os.remove(self._path(job_id, suffix))
+            except FileNotFoundError:
+                pass
+
+    def _load(self) -> None:
+        jobs = []
+        for path in glob.glob(os.path.join(self.journal_dir, "*" + STATE_SUFFIX)):
+            if os.path.basename(path).startswith("."):
+                continue
+            try:
+                with open(path, encoding="utf-8") as handle:
+                    job = Job.from_record(json.load(handle))
+            except (OSError, ValueError, KeyError, TypeError) as exc:
+                logger.warning("Ignoring unreadable job record %s: %s", path, exc)
+                continue
+            job.files = self._load_files(job.id)
+            jobs.append(job)
+
+        for job in sorted(jobs, key=lambda job: job.created_at):
+            self._jobs[job.id] = job
+            if not job.finished:
+                # The process that ran it is gone; its staging output was never committed
+                job.state = "interrupted"
+                job.finished_at = time.time()
+                job.error = {"message": "Sidecar stopped before the job finished"}
+                self._save(job)
+        for old in self._expired_jobs():
+            del self._jobs[old.id]
+            self._remove_journal(old.id)
+
+    def _load_files(self, job_id: str) -> list[dict[str, Any]]:
+        items = []
+        try:
+            with open(self._path(job_id, FILES_SUFFIX), encoding="utf-8") as handle:
+                for line in handle:
+                    try:
+                        items.append(json.loads(line))
+                    except ValueError:
+                        # A torn last line from a crash mid-write
+                        break
+        except FileNotFoundError:
+            pass
+        return items
+
+    def _expired_jobs(self) -> list[Job]:
+        finished = [job for job in self._jobs.values() if job.finished]
+        return finished[: max(0, len(finished) - self.max_finished)]
+
+    def _send(self, method: str, params: dict[str, Any]) -> None:
+        if self._notify is not None:
+            self._notify(method, params)
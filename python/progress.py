@@ -0,0 +1,120 @@
+"""Rate-limited progress reporting for the JSON-RPC sidecar.
+
+Analyzers call their progress callback several times per input file, so a
+batch of thousands of small files would otherwise write thousands of JSON
+lines to stdout. ``ProgressEmitter`` coalesces those calls: at most
+``max_rate`` updates per second are sent, an update held back by the limit is
+delivered once the interval has passed (the newest one wins), and a final
+update (progress 1.0) is always sent straight away.
+
+Every update carries throughput figures from the run loop: input files and
+bytes finished so far (reported through ``file_done``), their rate, and an
+estimated time remaining extrapolated from the progress fraction.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Any, Callable, Optional
+
+DEFAULT_MAX_RATE = 20.0
+
+# send(progress, message, stats)
+ProgressSender = Callable[[float, str, dict[str, Any]], None]
+
+
+def max_rate_from_env() -> float:
+    """Updates per second from ``POLYANALYZER_PROGRESS_HZ`` (default 20, 0 = unlimited)."""
+    raw = os.environ.get("POLYANALYZER_PROGRESS_HZ")
+    try:
+        value = float(raw) if raw else DEFAULT_MAX_RATE
+    except ValueError:
+        value = DEFAULT_MAX_RATE
+    return value if value >= 0 else DEFAULT_MAX_RATE
+
+
+class ProgressEmitter:
+    """Coalesce one request's progress updates to at most ``max_rate`` per second."""
+
+    def __init__(
+        self,
+        send: ProgressSender,
+        *,
+        max_rate: Optional[float] = None,
+        datadir: Optional[str] = None,
+        files_total: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        rate = max_rate_from_env() if max_rate is None else max_rate
+        self._interval = 1.0 / rate if rate > 0 else 0.0
+        self._send = send
+        self._datadir = datadir
+        self._clock = clock
+        self._started = clock()
+        self._last_sent: Optional[float] = None
+        self._pending: Optional[tuple[float, str]] = None
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+        self.files_total = files_total
+        self.files_done = 0
+        self.bytes_done = 0
+
+    def update(self, progress: float, message: str) -> None:
+        """Progress callback for analyzers (``progress`` is a 0–1 fraction)."""
+        with self._lock:
+            now = self._clock()
+            due = self._last_sent is None or now - self._last_sent >= self._interval
+            if progress >= 1.0 or due:
+                self._send_locked(progress, message, now)
+                return
+            self._pending = (progress, message)
+            if self._timer is None:
+                self._timer = threading.Timer(self._interval - (now - self._last_sent), self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def file_done(self, filename: str) -> None:
+        """Count one finished input file (and its size, when it lies in ``datadir``)."""
+        size = 0
+        if self._datadir:
+            try:
+                size = os.path.getsize(os.path.join(self._datadir, filename))
+            except (OSError, TypeError, ValueError):
+                size = 0
+        with self._lock:
+            self.files_done += 1
+            self.bytes_done += size
+
+    def flush(self) -> None:
+        """Send the update held back by the rate limit, if any."""
+        with self._lock:
+            if self._pending is not None:
+                progress, message = self._pending
+                self._send_locked(progress, message, self._clock())
+            self._timer = None
+
+    def stats(self, progress: float, now: Optional[float] = None) -> dict[str, Any]:
+        elapsed = (self._clock() if now is None else now) - self._started
+        eta = None
+        if progress >= 1.0:
+            eta = 0.0
+        elif progress > 0 and elapsed > 0:
+            eta = round(elapsed * (1.0 - progress) / progress, 3)
+        return {
+            "elapsed": round(elapsed, 3),
+            "files_done": self.files_done,
+            "files_total": self.files_total,
+            "files_per_second": round(self.files_done / elapsed, 3) if elapsed > 0 else None,
+            "bytes_per_second": round(self.bytes_done / elapsed, 1) if elapsed > 0 else None,
+            "eta_seconds": eta,
+        }
+
+    def _send_locked(self, progress: float, message: str, now: float) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._pending = None
+        self._last_sent = now
+        self._send(progress, message, self.stats(progress, now))
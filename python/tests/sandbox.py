@@ -0,0 +1,24 @@
+"""
+Shared bootstrap for the test modules: keep every test run out of the checkout.
+
+In development ``get_install_dir()`` is the project root, so anything the code
+under test persists there (parse cache, IR search indexes, job journals,
+settings profiles, log files) would land in the source tree. Importing this
+module first points ``POLYANALYZER_DATA_DIR`` at a temporary directory and
+turns the file logger off for the whole test process; worker processes
+started by the analyzers inherit both. Tests that need their own data root
+still patch ``POLYANALYZER_DATA_DIR`` locally.
+"""
+
+import atexit
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+DATA_ROOT = Path(tempfile.mkdtemp(prefix="polyanalyzer-tests-"))
+atexit.register(shutil.rmtree, DATA_ROOT, ignore_errors=True)
+
+os.environ["POLYANALYZER_DATA_DIR"] = str(DATA_ROOT / "data")
+os.environ["POLYANALYZER_DISABLE_FILE_LOG"] = "1"
+os.environ.setdefault("MPLCONFIGDIR", str(DATA_ROOT / "matplotlib"))
@@ -15,18 +15,18 @@ PYTHON_DIR = Path(__file__).resolve().parents[1]
 PROJECT_ROOT = PYTHON_DIR.parent
 sys.path.insert(0, str(PYTHON_DIR))
 
+import sandbox  # noqa: F401  (isolates the data root and log files)
+
 # Keep the legacy import-time logger away from the repository while RED tests run.
 _IMPORT_TMP = tempfile.TemporaryDirectory()
 _ORIGINAL_CWD = os.getcwd()
 os.chdir(_IMPORT_TMP.name)
-os.environ["POLYANALYZER_DISABLE_FILE_LOG"] = "1"
 os.environ["MPLCONFIGDIR"] = str(Path(_IMPORT_TMP.name, "matplotlib"))
 os.environ["XDG_CACHE_HOME"] = str(Path(_IMPORT_TMP.name, "xdg"))
 try:
     from analyzer import base, dsc, gpc, ir, mw
     import api
 finally:
-    os.environ.pop("POLYANALYZER_DISABLE_FILE_LOG", None)
     os.chdir(_ORIGINAL_CWD)
 
 
@@ -42,7 +42,9 @@ class InstallAndNameSafetyTests(unittest.TestCase):
         self.assertEqual(package_version, tauri_version)
 
     def test_development_install_dir_is_project_root(self):
-        self.assertEqual(str(PROJECT_ROOT), base.get_install_dir())
+        with patch.dict(os.environ):
+            os.environ.pop("POLYANALYZER_DATA_DIR", None)
+            self.assertEqual(str(PROJECT_ROOT), base.get_install_dir())
 
     def test_data_dir_override_applies_in_development(self):
         with tempfile.TemporaryDirectory() as temp_dir, \
@@ -91,7 +93,10 @@ class InstallAndNameSafetyTests(unittest.TestCase):
             try:
                 with patch.object(base.sys, "frozen", True, create=True), \
                         patch.object(base.sys, "executable", str(executable)), \
-                        patch.dict(os.environ, {"POLYANALYZER_DATA_DIR": str(user_data)}):
+                        patch.dict(os.environ, {
+                            "POLYANALYZER_DATA_DIR": str(user_data),
+                            "POLYANALYZER_DISABLE_FILE_LOG": "0",
+                        }):
                     logger = base.Logger(name=f"test-{uuid.uuid4()}")
             finally:
                 os.chdir(original_cwd)
@@ -307,6 +312,35 @@ class IrRegressionTests(unittest.TestCase):
         normalized_absorbance = 2.0 - np.log10(normalized)
         self.assertAlmostEqual(0.6, normalized_absorbance[1], places=6)
 
+    def test_ir_spectrum_template_matches_single_file_render(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            data_dir = Path(temp_dir, "data")
+            data_dir.mkdir()
+            for name, low in (("full.dpt", 400.0), ("partial.dpt", 2000.0)):
+                wavenumber = np.linspace(4000.0, low, 400)
+                absorbance = 0.3 + 0.4 * np.exp(-(((wavenumber - 2900.0) / 60.0) ** 2))
+                (data_dir / name).write_text(
+                    "".join(f"{a:.2f} {b:.5f}\n" for a, b in zip(wavenumber, absorbance)),
+                    encoding="utf-8",
+                )
+
+            def render(files):
+                with patch.object(ir, "get_install_dir", return_value=temp_dir):
+                    analyzer = ir.IRAnalyzer(str(data_dir), selected_files=files, draw_overlay=False)
+                self.assertTrue(analyzer.run())
+                return analyzer, Path(analyzer.individual_dir, "partial.png").read_bytes()
+
+            with patch.object(
+                ir.IRAnalyzer, "_build_spectrum_template",
+                autospec=True, side_effect=ir.IRAnalyzer._build_spectrum_template,
+            ) as build:
+                analyzer, batch = render(["full.dpt", "partial.dpt"])
+
+            self.assertEqual(1, build.call_count)
+            self.assertEqual(0, len(analyzer._templates))
+            # The low-wavenumber gap connector of the first spectrum must not leak
+            self.assertTrue(render(["partial.dpt"])[1] == batch)
+
     def test_ir_can_skip_overlay_generation(self):
         with tempfile.TemporaryDirectory() as temp_dir:
             root = Path(temp_dir)
@@ -351,6 +385,21 @@ class IrRegressionTests(unittest.TestCase):
                     with self.assertRaises(ValueError):
                         ir.IRAnalyzer.parse_dpt(str(path))
 
+    def test_dpt_parser_skips_non_numeric_rows_and_mixed_delimiters(self):
+        header = "Wavenumber;Absorbance\r\n\r\n"
+        cases = {
+            "block.dpt": header + "4000.5\t0.1\r\n3999,0.2\r\n3998; 0.3\r\n3997 0.4 9\r\n",
+            "interleaved.dpt": header + "4000.5\t0.1\r\n3999,0.2\r\n# note\r\n3998; 0.3\r\n7\r\n3997 0.4 9",
+        }
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for filename, content in cases.items():
+                path = Path(temp_dir, filename)
+                path.write_bytes(content.encode("utf-8"))
+                with self.subTest(filename=filename):
+                    wavenumber, absorbance = ir.IRAnalyzer.parse_dpt(str(path))
+                    self.assertEqual([4000.5, 3999.0, 3998.0, 3997.0], wavenumber.tolist())
+                    self.assertEqual([0.1, 0.2, 0.3, 0.4], absorbance.tolist())
+
     def test_ir_file_list_returns_regular_files_only(self):
         with tempfile.TemporaryDirectory() as temp_dir:
             Path(temp_dir, "sample.dpt").write_text("4000 0.1\n3900 0.2\n", encoding="utf-8")
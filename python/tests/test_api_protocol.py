@@ -3,6 +3,7 @@ import json
 import os
 import sys
 import tempfile
+import threading
 import unittest
 from pathlib import Path
 from unittest.mock import patch
@@ -11,15 +12,15 @@ from unittest.mock import patch
 PYTHON_DIR = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(PYTHON_DIR))
 
+import sandbox  # noqa: F401  (isolates the data root and log files)
+
 # Keep the legacy import-time logger away from the repository while RED tests run.
 _IMPORT_TMP = tempfile.TemporaryDirectory()
 _ORIGINAL_CWD = os.getcwd()
 os.chdir(_IMPORT_TMP.name)
-os.environ["POLYANALYZER_DISABLE_FILE_LOG"] = "1"
 try:
     import api
 finally:
-    os.environ.pop("POLYANALYZER_DISABLE_FILE_LOG", None)
     os.chdir(_ORIGINAL_CWD)
 
 
@@ -28,7 +29,19 @@ class JsonRpcProtocolTests(unittest.TestCase):
         output = io.StringIO()
         with patch.object(api.sys, "stdout", output):
             api.handle_line(json.dumps(payload))
-        return json.loads(output.getvalue())
+        # 跳过通知（如 batch.timing），只返回响应
+        messages = [json.loads(line) for line in output.getvalue().splitlines()]
+        responses = [message for message in messages if isinstance(message, list) or "method" not in message]
+        self.assertEqual(1, len(responses))
+        return responses[0]
+
+    def _notifications(self, output, method):
+        messages = [json.loads(line) for line in output.getvalue().splitlines()]
+        return [
+            message["params"]
+            for message in messages
+            if isinstance(message, dict) and message.get("method") == method
+        ]
 
     def test_non_object_request_returns_invalid_request(self):
         response = self._handle_line(1)
@@ -49,6 +62,65 @@ class JsonRpcProtocolTests(unittest.TestCase):
         self.assertEqual(api.INVALID_REQUEST, response[0]["error"]["code"])
         self.assertEqual(api.METHOD_NOT_FOUND, response[1]["error"]["code"])
 
+    def test_batch_items_run_concurrently_and_keep_request_order(self):
+        all_running = threading.Barrier(3, timeout=5)
+        finished = []
+
+        def slow(params):
+            all_running.wait()
+            threading.Event().wait(0.05)
+            finished.append("slow")
+            return {"name": "slow"}
+
+        def fast(params):
+            all_running.wait()
+            finished.append("fast")
+            return {"name": "fast"}
+
+        output = io.StringIO()
+        with patch.dict(api.METHOD_TABLE, {"test.slow": slow, "test.fast": fast}), \
+                patch.object(api.sys, "stdout", output):
+            api.handle_line(json.dumps([
+                {"jsonrpc": "2.0", "method": "test.slow", "id": 1},
+                {"jsonrpc": "2.0", "method": "test.fast"},
+                {"jsonrpc": "2.0", "method": "test.fast", "id": 3},
+            ]))
+
+        responses = json.loads(output.getvalue().splitlines()[-1])
+        self.assertEqual(["fast", "fast", "slow"], finished)
+        self.assertEqual([1, 3], [response["id"] for response in responses])
+        self.assertEqual(["slow", "fast"], [response["result"]["name"] for response in responses])
+
+        (timing,) = self._notifications(output, "batch.timing")
+        self.assertEqual(
+            [(0, 1, "test.slow"), (1, None, "test.fast"), (2, 3, "test.fast")],
+            [(item["index"], item["id"], item["method"]) for item in timing["items"]],
+        )
+        self.assertGreaterEqual(timing["items"][0]["ms"], 50)
+        self.assertGreaterEqual(timing["elapsed_ms"], timing["items"][0]["ms"])
+
+    def test_long_running_batch_items_obey_the_analyzer_pool_limit(self):
+        active = []
+        overlaps = []
+        guard = threading.Lock()
+
+        def analysis(params):
+            with guard:
+                active.append(params["n"])
+                overlaps.append(len(active))
+            threading.Event().wait(0.02)
+            with guard:
+                active.remove(params["n"])
+            return {"n": params["n"]}
+
+        with patch.dict(api.METHOD_TABLE, {"dsc.analyze": analysis}):
+            responses = self._handle_line([
+                {"jsonrpc": "2.0", "method": "dsc.analyze", "params": {"n": n}, "id": n}
+                for n in range(4)
+            ])
+        self.assertEqual([1, 1, 1, 1], overlaps)
+        self.assertEqual([0, 1, 2, 3], [response["result"]["n"] for response in responses])
+
     def test_progress_notification_identifies_analyzer_and_request(self):
         original_params = {"value": 3}
 
@@ -173,5 +245,197 @@ class ApiFilesystemTests(unittest.TestCase):
             self.assertNotIn(str(wrong.resolve()), {str(Path(p).resolve()) for p in result["cleaned"]})
 
 
+class RequestDispatcherTests(unittest.TestCase):
+    def setUp(self):
+        self.output = io.StringIO()
+        stdout = patch.object(api.sys, "stdout", self.output)
+        stdout.start()
+        self.addCleanup(stdout.stop)
+
+    def _responses(self):
+        return [json.loads(line) for line in self.output.getvalue().splitlines()]
+
+    def _request(self, method, request_id, **params):
+        return json.dumps({"jsonrpc": "2.0", "method": method, "params": params, "id": request_id})
+
+    def test_cheap_methods_are_answered_while_an_analysis_runs(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_analysis(params):
+            started.set()
+            release.wait(5)
+            return {"success": True}
+
+        dispatcher = api.RequestDispatcher()
+        self.addCleanup(dispatcher.shutdown)
+        with tempfile.TemporaryDirectory() as temp_dir, \
+                patch.dict(api.METHOD_TABLE, {"dsc.analyze": slow_analysis}):
+            api.handle_line(self._request("dsc.analyze", 1, datadir=temp_dir), dispatcher)
+            self.assertTrue(started.wait(5))
+            api.handle_line(self._request("dsc.list_files", 2, datadir=temp_dir), dispatcher)
+
+            # 分析仍在运行，文件列表请求已先行返回
+            self.assertEqual([2], [response["id"] for response in self._responses()])
+            release.set()
+            dispatcher.shutdown()
+
+        self.assertEqual([2, 1], [response["id"] for response in self._responses()])
+        self.assertEqual({"success": True}, self._responses()[1]["result"])
+
+    def test_analyses_sharing_an_output_dir_are_serialized(self):
+        active = []
+        overlaps = []
+        guard = threading.Lock()
+        both_running = threading.Barrier(2, timeout=1)
+
+        def analysis(params):
+            with guard:
+                active.append(params["datadir"])
+                overlaps.append(len(active))
+            try:
+                both_running.wait()
+            except threading.BrokenBarrierError:
+                pass
+            with guard:
+                active.remove(params["datadir"])
+            return {"success": True}
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            for name in ("a/data", "a/other", "b/data"):
+                (root / name).mkdir(parents=True)
+
+            dispatcher = api.RequestDispatcher({"dsc": 2})
+            with patch.dict(api.METHOD_TABLE, {"dsc.analyze": analysis}):
+                # a/data 与 a/other 写入同一个 a/DSC_Cycle，不能并行
+                api.handle_line(self._request("dsc.analyze", 1, datadir=str(root / "a/data")), dispatcher)
+                api.handle_line(self._request("dsc.analyze", 2, datadir=str(root / "a/other")), dispatcher)
+                dispatcher.shutdown()
+            self.assertEqual([1, 1], overlaps)
+
+            overlaps.clear()
+            both_running.reset()
+            dispatcher = api.RequestDispatcher({"dsc": 2})
+            with patch.dict(api.METHOD_TABLE, {"dsc.analyze": analysis}):
+                api.handle_line(self._request("dsc.analyze", 3, datadir=str(root / "a/data")), dispatcher)
+                api.handle_line(self._request("dsc.analyze", 4, datadir=str(root / "b/data")), dispatcher)
+                dispatcher.shutdown()
+            self.assertEqual([1, 2], overlaps)
+
+        self.assertEqual({1, 2, 3, 4}, {response["id"] for response in self._responses()})
+
+    def test_batch_analysis_shares_output_dir_locks_with_single_requests(self):
+        active = []
+        overlaps = []
+        guard = threading.Lock()
+        both_running = threading.Barrier(2, timeout=0.5)
+
+        def analysis(params):
+            with guard:
+                active.append(params["__request_id"])
+                overlaps.append(len(active))
+            try:
+                both_running.wait()
+            except threading.BrokenBarrierError:
+                pass
+            with guard:
+                active.remove(params["__request_id"])
+            return {"success": True}
+
+        dispatcher = api.RequestDispatcher({"dsc": 2})
+        self.addCleanup(dispatcher.shutdown)
+        with tempfile.TemporaryDirectory() as temp_dir, \
+                patch.dict(api.METHOD_TABLE, {"dsc.analyze": analysis}):
+            api.handle_line(self._request("dsc.analyze", 1, datadir=temp_dir), dispatcher)
+            api.handle_line(json.dumps([
+                {"jsonrpc": "2.0", "method": "dsc.analyze", "params": {"datadir": temp_dir}, "id": 2},
+                {"jsonrpc": "2.0", "method": "system.get_default_datapath", "id": 3},
+            ]), dispatcher)
+            dispatcher.shutdown()
+
+        # 批量请求中的分析与单个分析写入同一输出目录，必须串行
+        self.assertEqual([1, 1], overlaps)
+        batches = [message for message in self._responses() if isinstance(message, list)]
+        self.assertEqual([[2, 3]], [[response["id"] for response in batch] for batch in batches])
+        self.assertEqual({"success": True}, batches[0][0]["result"])
+
+    def test_batch_with_a_running_analysis_does_not_block_the_reader(self):
+        started = threading.Event()
+
+        def cancellable_analysis(params):
+            started.set()
+            token = params["__cancel_token"]
+            for _ in range(500):
+                token.raise_if_cancelled()
+                threading.Event().wait(0.01)
+            return {"success": True}
+
+        dispatcher = api.RequestDispatcher()
+        self.addCleanup(dispatcher.shutdown)
+        with tempfile.TemporaryDirectory() as temp_dir, \
+                patch.dict(api.METHOD_TABLE, {"ir.analyze": cancellable_analysis}):
+            api.handle_line(json.dumps([
+                {"jsonrpc": "2.0", "method": "ir.analyze", "params": {"datadir": temp_dir}, "id": 1},
+                {"jsonrpc": "2.0", "method": "ir.list_files", "params": {"datadir": temp_dir}, "id": 2},
+            ]), dispatcher)
+            self.assertTrue(started.wait(5))
+            # 批量请求仍在运行，后续的轻量请求与取消请求照常处理
+            api.handle_line(self._request("ir.list_files", 3, datadir=temp_dir), dispatcher)
+            api.handle_line(self._request("$/cancelRequest", 4, id=1), dispatcher)
+            dispatcher.shutdown()
+
+        messages = [message for message in self._responses() if "method" not in message]
+        self.assertEqual([3, 4], [message["id"] for message in messages[:2]])
+        self.assertEqual({"cancelled": True}, messages[1]["result"])
+        batch = messages[2]
+        self.assertEqual([1, 2], [response["id"] for response in batch])
+        self.assertEqual(api.REQUEST_CANCELLED, batch[0]["error"]["code"])
+        self.assertEqual({}, api._CANCELLATIONS._tokens)
+
+    def test_cancel_request_stops_running_and_queued_requests(self):
+        started = threading.Event()
+
+        def cancellable_analysis(params):
+            started.set()
+            token = params["__cancel_token"]
+            for _ in range(500):
+                token.raise_if_cancelled()
+                threading.Event().wait(0.01)
+            return {"success": True}
+
+        dispatcher = api.RequestDispatcher()
+        self.addCleanup(dispatcher.shutdown)
+        with tempfile.TemporaryDirectory() as temp_dir, \
+                patch.dict(api.METHOD_TABLE, {"ir.analyze": cancellable_analysis}):
+            api.handle_line(self._request("ir.analyze", 1, datadir=temp_dir), dispatcher)
+            # 单线程池中排队等待的请求
+            api.handle_line(self._request("ir.analyze", 2, datadir=temp_dir), dispatcher)
+            self.assertTrue(started.wait(5))
+            api.handle_line(self._request("$/cancelRequest", 3, id=2), dispatcher)
+            api.handle_line(self._request("$/cancelRequest", 4, id=1), dispatcher)
+            dispatcher.shutdown()
+
+        responses = {response["id"]: response for response in self._responses()}
+        self.assertEqual({"cancelled": True}, responses[3]["result"])
+        self.assertEqual({"cancelled": True}, responses[4]["result"])
+        for request_id in (1, 2):
+            self.assertEqual(api.REQUEST_CANCELLED, responses[request_id]["error"]["code"])
+        self.assertEqual({}, api._CANCELLATIONS._tokens)
+
+    def test_cancel_request_for_unknown_id(self):
+        api.handle_line(self._request("$/cancelRequest", 1, id=12345))
+        api.handle_line(self._request("$/cancelRequest", 2, id=[1]))
+        first, second = self._responses()
+        self.assertEqual({"cancelled": False}, first["result"])
+        self.assertEqual(api.INVALID_PARAMS, second["error"]["code"])
+
+    def test_pool_size_is_read_per_analyzer_from_the_environment(self):
+        with patch.dict(os.environ, {"POLYANALYZER_MAX_CONCURRENT_MW": "3", "POLYANALYZER_MAX_CONCURRENT_IR": "x"}):
+            self.assertEqual(3, api.max_concurrent_from_env("mw"))
+            self.assertEqual(1, api.max_concurrent_from_env("ir"))
+            self.assertEqual(1, api.max_concurrent_from_env("dsc"))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,78 @@
+"""
+Tests for cooperative cancellation (analyzer/cancellation.py, analyzer/parallel.py).
+"""
+
+import os
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+PYTHON_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PYTHON_DIR))
+
+import sandbox  # noqa: F401  (isolates the data root and log files)
+
+from analyzer.cancellation import AnalysisCancelled, CancellationToken
+from analyzer.parallel import run_ordered
+
+
+def _report_pid(seconds: float) -> int:
+    time.sleep(seconds)
+    return os.getpid()
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except OSError:
+        return False
+    return True
+
+
+class RunOrderedCancellationTests(unittest.TestCase):
+    def test_inline_run_stops_before_the_next_task(self) -> None:
+        token = CancellationToken()
+        done = []
+
+        def on_done(index, _result):
+            done.append(index)
+            if index == 1:
+                token.cancel()
+
+        with self.assertRaises(AnalysisCancelled):
+            run_ordered(_report_pid, [(0,)] * 5, workers=1, on_done=on_done, cancel_token=token)
+        self.assertEqual([0, 1], done)
+
+    def test_pool_workers_are_terminated_on_cancel(self) -> None:
+        token = CancellationToken()
+        pids = []
+
+        def on_done(_index, pid):
+            pids.append(pid)
+            # 首批任务完成后取消，其余任务仍在睡眠
+            threading.Timer(0.1, token.cancel).start()
+
+        start = time.monotonic()
+        with self.assertRaises(AnalysisCancelled):
+            run_ordered(
+                _report_pid,
+                [(0,)] + [(30,)] * 3,
+                workers=2,
+                on_done=on_done,
+                cancel_token=token,
+            )
+        self.assertLess(time.monotonic() - start, 10)
+        self.assertTrue(pids)
+        self.assertFalse([pid for pid in set(pids) if _pid_alive(pid)])
+
+    def test_uncancelled_token_does_not_change_results(self) -> None:
+        token = CancellationToken()
+        results = run_ordered(_report_pid, [(0,)] * 4, workers=2, cancel_token=token)
+        self.assertEqual(4, len(results))
+        self.assertNotIn(os.getpid(), results)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -14,15 +14,13 @@ from unittest.mock import patch
 PYTHON_DIR = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(PYTHON_DIR))
 
+import sandbox  # noqa: F401  (isolates the data root and log files)
+
 _IMPORT_TMP = tempfile.TemporaryDirectory()
-os.environ["POLYANALYZER_DISABLE_FILE_LOG"] = "1"
 os.environ["MPLCONFIGDIR"] = str(Path(_IMPORT_TMP.name, "matplotlib"))
-try:
-    import api
-    import build_sidecar
-    import cli
-finally:
-    os.environ.pop("POLYANALYZER_DISABLE_FILE_LOG", None)
+import api
+import build_sidecar
+import cli
 
 
 class ApiInputValidationTests(unittest.TestCase):
@@ -39,6 +37,10 @@ class ApiInputValidationTests(unittest.TestCase):
                     "datadir": temp_dir,
                     "selected_files": ["../outside.rst"],
                 },
+                "mw.compute": {
+                    "datadir": temp_dir,
+                    "selected_files": ["../outside.rst"],
+                },
                 "dsc.analyze": {
                     "datadir": temp_dir,
                     "selected_files": ["../outside.txt"],
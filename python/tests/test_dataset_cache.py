@@ -0,0 +1,152 @@
+"""
+Tests for analyzer/dataset_cache.py — the sidecar's in-memory dataset LRU.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+
+PYTHON_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PYTHON_DIR))
+
+import sandbox  # noqa: F401  (isolates the data root and log files)
+
+# Keep the legacy import-time logger away from the repository while tests run.
+_IMPORT_TMP = tempfile.TemporaryDirectory()
+_ORIGINAL_CWD = os.getcwd()
+os.chdir(_IMPORT_TMP.name)
+try:
+    from analyzer import dataset_cache, gpc, parse_cache
+    import api
+finally:
+    os.chdir(_ORIGINAL_CWD)
+
+
+def _write_rst(path: Path, sample: str) -> None:
+    rows = "".join(
+        f"{i}\t{i}.5\t1\t2\t{10 ** (i % 5 + 2)}\t{i % 5 + 2}\t{0.1 * i:.1f}\t0\t\n"
+        for i in range(12)
+    )
+    path.write_text(
+        f"Sample Name\t{sample}\n<MW_Averages>\nh\nu\n-\n"
+        "Peak 1\t1000\t900\t1100\t1200\t1300\t1050\t1.22\n"
+        "</MW_Averages>\n<Slice_Table>\nPeak 1\n" + rows + "</Slice_Table>\n",
+        encoding="ascii",
+    )
+
+
+def _encode(values):
+    return {"values": values}, {}
+
+
+def _decode(payload):
+    return payload[0]["values"]
+
+
+class DatasetCacheTests(unittest.TestCase):
+    def test_lru_eviction_respects_byte_budget(self) -> None:
+        cache = dataset_cache.DatasetCache(max_bytes=100)
+        cache.put("a", "A", 40)
+        cache.put("b", "B", 40)
+        self.assertEqual("A", cache.get("a"))  # a 变为最近使用
+        cache.put("c", "C", 40)
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual("A", cache.get("a"))
+        self.assertEqual("C", cache.get("c"))
+        cache.put("huge", "H", 101)
+        self.assertIsNone(cache.get("huge"))
+
+        stats = cache.stats()
+        self.assertEqual(
+            {"entries": 2, "bytes": 80, "hits": 3, "misses": 2, "evictions": 1},
+            {key: stats[key] for key in ("entries", "bytes", "hits", "misses", "evictions")},
+        )
+        cache.configure(50)
+        self.assertEqual(1, cache.stats()["entries"])
+
+    def test_disabled_cache_stores_nothing(self) -> None:
+        cache = dataset_cache.DatasetCache()
+        self.assertFalse(cache.enabled)
+        cache.put("a", "A", 1)
+        self.assertIsNone(cache.get("a"))
+
+
+class CachedParseMemoryTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp_path = Path(self._tmp.name)
+        self.memory = dataset_cache.get_dataset_cache()
+        self.memory.configure(1 << 20)
+        self.addCleanup(self.memory.configure, 0)
+        self.addCleanup(self.memory.clear)
+        env = patch.dict(os.environ, {"POLYANALYZER_DATA_DIR": str(self.tmp_path / "root")})
+        env.start()
+        self.addCleanup(env.stop)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_unchanged_file_is_served_from_memory(self) -> None:
+        source = self.tmp_path / "a.txt"
+        source.write_text("1 2 3\n", encoding="ascii")
+        calls = []
+
+        def parse(path):
+            calls.append(path)
+            return np.loadtxt(path)
+
+        first = parse_cache.cached_parse("dpt", 1, str(source), parse, _encode, _decode)
+        with patch.object(parse_cache.ParseCache, "load_or_parse") as disk:
+            second = parse_cache.cached_parse("dpt", 1, str(source), parse, _encode, _decode)
+        disk.assert_not_called()
+        self.assertIs(first, second)
+        self.assertFalse(second.flags.writeable)
+
+        source.write_text("4 5\n", encoding="ascii")
+        os.utime(source, ns=(1, 1))
+        third = parse_cache.cached_parse("dpt", 1, str(source), parse, _encode, _decode)
+        np.testing.assert_array_equal([4, 5], third)
+        self.assertEqual(2, len(calls))
+
+    def test_pooled_gpc_parse_populates_parent_memory_cache(self) -> None:
+        datapath = self.tmp_path / "data"
+        datapath.mkdir()
+        for name in ("a", "b"):
+            _write_rst(datapath / f"{name}.rst", f"S-{name}")
+
+        def run(jobs: int) -> None:
+            analyzer = gpc.GPCAnalyzer(
+                str(datapath), f"out-{jobs}",
+                save_file=True, save_picture=False,
+                save_figure_file_gpc=False, jobs=jobs,
+            )
+            analyzer.selected_file = ["a.rst", "b.rst"]
+            self.assertTrue(analyzer.run())
+
+        run(2)
+        self.assertEqual(2, self.memory.stats()["entries"])
+        hits_before = self.memory.stats()["hits"]
+        with patch.object(gpc, "run_ordered", wraps=gpc.run_ordered) as pooled:
+            run(2)
+        self.assertEqual(1, pooled.call_args.kwargs["workers"])
+        self.assertEqual(hits_before + 2, self.memory.stats()["hits"])
+
+    def test_system_cache_stats_rpc(self) -> None:
+        response = api._handle_request(
+            {"jsonrpc": "2.0", "method": "system.cache_stats", "id": 1}
+        )
+        result = response["result"]
+        self.assertTrue(result["enabled"])
+        self.assertEqual(1 << 20, result["max_bytes"])
+        for key in ("entries", "bytes", "hits", "misses", "evictions"):
+            self.assertIn(key, result)
+
+
+if __name__ == "__main__":
+    unittest.main()
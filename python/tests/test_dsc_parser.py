@@ -0,0 +1,180 @@
+"""
+Tests for the DSC export parser (analyzer/dsc.py).
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+
+PYTHON_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PYTHON_DIR))
+
+import sandbox  # noqa: F401  (isolates the data root and log files)
+
+# Keep the legacy import-time logger away from the repository while tests run.
+_IMPORT_TMP = tempfile.TemporaryDirectory()
+_ORIGINAL_CWD = os.getcwd()
+os.chdir(_IMPORT_TMP.name)
+try:
+    from analyzer import dsc
+finally:
+    os.chdir(_ORIGINAL_CWD)
+
+
+_HEADER = [
+    "Sig1 Time min",
+    "Sig2 Temperature °C",
+    "Sig3 Heat Flow W/g",
+    "OrgMethod1: Equilibrate at 25.00 °C",
+    "OrgMethod2: Ramp 10.00 °C/min to 200.00 °C",
+    "OrgMethod3: Isothermal for 2.00 min",
+    "OrgMethod4: Mark end of cycle 0",
+    "OrgMethod5: Ramp 10.00 °C/min to 25.00 °C",
+    "OrgMethod6: Mark end of cycle 1",
+    "StartOfData",
+]
+
+
+def _rows(first: int, last: int):
+    return [f"{0.1 * i:.4f}\t{25 + i:.3f}\t{np.sin(i / 7):.5f}" for i in range(first, last)]
+
+
+class DscDataBlockTests(unittest.TestCase):
+    def test_table_and_cycle_boundaries(self) -> None:
+        lines = _HEADER + _rows(1, 40) + ["comment without tabs", "-2\t0\t0"] + _rows(41, 90)
+
+        parsed = dsc.parse_dsc_lines(lines)
+
+        expected = np.array(
+            [[float(value) for value in row.split("\t")] for row in _rows(1, 40) + _rows(41, 90)],
+            dtype=np.float32,
+        )
+        self.assertEqual("", parsed.data_error)
+        self.assertEqual(np.float32, parsed.data.dtype)
+        np.testing.assert_array_equal(expected, parsed.data)
+        # 首个 cycle 的起点加上第 1 段方法的时长 (Ramp 17.5 min)
+        self.assertEqual(
+            [(17.6, 3.9, 0.0), (4.1, 8.9, 0.0)],
+            [tuple(round(value, 6) for value in bound) for bound in parsed.boundaries],
+        )
+
+    def test_single_row_and_empty_tables(self) -> None:
+        single = dsc.parse_dsc_lines(_HEADER + _rows(1, 2))
+        self.assertEqual((1, 3), single.data.shape)
+
+        empty = dsc.parse_dsc_lines(_HEADER + ["-2\t0\t0"])
+        self.assertEqual((0,), empty.data.shape)
+        self.assertEqual("", empty.data_error)
+
+    def test_malformed_rows_are_reported_not_raised(self) -> None:
+        for bad_row in ("0.5\t1.0\t2.0\t3.0", "abc\t1.0\t2.0"):
+            parsed = dsc.parse_dsc_lines(_HEADER + _rows(1, 5) + [bad_row] + _rows(6, 9))
+            self.assertIsNone(parsed.data)
+            self.assertTrue(parsed.data_error)
+            self.assertEqual(1, len(parsed.boundaries))
+
+
+class DscSegmentationTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        with patch.object(dsc, "get_install_dir", return_value=self._tmp.name):
+            self.analyzer = dsc.DSCAnalyzer(self._tmp.name, left_length=0.5, right_length=0.5)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _segments(self, lines):
+        self.analyzer.reset()
+        self.analyzer.parsed = dsc.parse_dsc_lines(lines)
+        self.analyzer.preprocess()
+        return self.analyzer.data, self.analyzer.data_seg
+
+    def test_segments_are_views_matching_time_masks(self) -> None:
+        data, segments = self._segments(
+            _HEADER + _rows(1, 200) + ["-2\t0\t0"] + _rows(201, 260) + ["-2\t0\t0"] + _rows(261, 400)
+        )
+
+        self.assertEqual(3, len(segments))
+        for (left, right), segment in zip(self.analyzer.region, segments):
+            expected = data[(data[:, 0] > left) & (data[:, 0] < right)]
+            np.testing.assert_array_equal(expected, segment)
+            if segment.size:
+                self.assertTrue(np.shares_memory(segment, data))
+
+    def test_non_monotonic_time_falls_back_to_masks(self) -> None:
+        rows = _rows(1, 300)
+        rows[200], rows[250] = rows[250], rows[200]
+        data, segments = self._segments(_HEADER + rows)
+
+        left, right = self.analyzer.region[0]
+        self.assertGreater(len(segments[0]), 100)
+        np.testing.assert_array_equal(data[(data[:, 0] > left) & (data[:, 0] < right)], segments[0])
+
+
+class DscEncodingTests(unittest.TestCase):
+    def test_sniffing_order(self) -> None:
+        text = "Sig1 Time min\nStartOfData\n0.1\t25.0\t-0.5\n"
+        self.assertEqual("utf-8-sig", dsc.sniff_encoding(text.encode("utf-8-sig")))
+        self.assertEqual("utf-16", dsc.sniff_encoding(text.encode("utf-16")))
+        self.assertEqual("utf-16-le", dsc.sniff_encoding(text.encode("utf-16-le")))
+        self.assertEqual("utf-16-be", dsc.sniff_encoding(text.encode("utf-16-be")))
+        self.assertEqual("utf-8", dsc.sniff_encoding(text.encode("ascii")))
+        # 前缀末尾被截断的多字节字符仍视为 UTF-8
+        self.assertEqual("utf-8", dsc.sniff_encoding(("°C " * 10).encode("utf-8")[:-1]))
+
+    def test_chardet_only_sees_bounded_prefix(self) -> None:
+        import chardet
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir, "run.txt")
+            path.write_bytes(("样品 温度 热流\n" * 20000).encode("gbk"))
+            with patch.object(chardet, "detect", wraps=chardet.detect) as detect:
+                first = dsc.detect_dsc_encoding(str(path))
+                lines = dsc.read_dsc_lines(str(path))
+
+            self.assertEqual(first, dsc.detect_dsc_encoding(str(path)))
+            self.assertEqual(20000, len(lines))
+            # 同一文件只探测一次，且只检查有限长度的前缀
+            self.assertEqual(1, detect.call_count)
+            self.assertLessEqual(len(detect.call_args.args[0]), dsc.ENCODING_SNIFF_BYTES)
+
+
+class DscStreamingTests(unittest.TestCase):
+    def test_chunked_stream_matches_single_pass(self) -> None:
+        lines = (
+            _HEADER + _rows(1, 40) + ["-2\t0\t0"] + ["-2\t0\t0"] + ["", "  note  "]
+            + _rows(41, 90) + ["-2\t0\t0"] + _rows(91, 120)
+        )
+        expected = dsc.parse_dsc_lines([line.strip() for line in lines if line.strip()])
+
+        for chunk_lines in (1, 2, 5, 39, 40, 41):
+            parsed = dsc.parse_dsc_stream(iter(lines), chunk_lines=chunk_lines)
+            self.assertEqual(expected.boundaries, parsed.boundaries)
+            self.assertEqual("", parsed.data_error)
+            np.testing.assert_array_equal(expected.data, parsed.data)
+
+    def test_columns_changing_between_chunks_is_reported(self) -> None:
+        lines = _HEADER + _rows(1, 10) + ["1.5\t2.0"] + _rows(11, 20)
+        parsed = dsc.parse_dsc_stream(iter(lines), chunk_lines=4)
+        self.assertIsNone(parsed.data)
+        self.assertIn("number of columns changed", parsed.data_error)
+
+    def test_file_is_parsed_without_materializing_lines(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir, "run.txt")
+            text = "\n".join(_HEADER + _rows(1, 40) + ["-2\t0\t0"] + _rows(41, 90)) + "\n"
+            path.write_text(text, encoding="utf-16")
+            with patch.object(dsc, "read_dsc_lines", side_effect=AssertionError("materialized")):
+                parsed = dsc.parse_dsc_file(str(path))
+
+        self.assertEqual({1: "Time/min", 2: "Temperature/°C", 3: "Heat Flow/W/g"}, parsed.heads)
+        self.assertEqual((88, 3), parsed.data.shape)
+
+
+if __name__ == "__main__":
+    unittest.main()
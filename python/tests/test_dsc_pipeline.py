@@ -0,0 +1,234 @@
+"""
+Tests for the DSC run pipeline (analyzer/dsc.py): cycle hand-off and CSV export.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+
+PYTHON_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PYTHON_DIR))
+
+import sandbox  # noqa: F401  (isolates the data root and log files)
+
+# Keep the legacy import-time logger away from the repository while tests run.
+_IMPORT_TMP = tempfile.TemporaryDirectory()
+_ORIGINAL_CWD = os.getcwd()
+os.chdir(_IMPORT_TMP.name)
+try:
+    from analyzer import dsc
+    from analyzer.cancellation import AnalysisCancelled, CancellationToken
+    import api
+finally:
+    os.chdir(_ORIGINAL_CWD)
+
+
+def _dsc_text(phase: float) -> str:
+    lines = [
+        "Sig1 Time min",
+        "Sig2 Temperature °C",
+        "Sig3 Heat Flow W/g",
+        "OrgMethod1: Equilibrate at 25.00 °C",
+        "OrgMethod2: Ramp 10.00 °C/min to 200.00 °C",
+        "OrgMethod3: Isothermal for 2.00 min",
+        "OrgMethod4: Mark end of cycle 0",
+        "OrgMethod5: Ramp 10.00 °C/min to 25.00 °C",
+        "OrgMethod6: Mark end of cycle 1",
+        "StartOfData",
+    ]
+    lines += [f"{0.1 * i:.4f}\t{25 + i:.3f}\t{np.sin(i / 7 + phase):.5f}" for i in range(1, 300)]
+    lines += ["-2\t0\t0"]
+    lines += [f"{0.1 * i:.4f}\t{325 - i:.3f}\t{np.cos(i / 7 + phase):.5f}" for i in range(300, 420)]
+    return "\n".join(lines) + "\n"
+
+
+class DscCycleHandOffTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.datapath = self.root / "data"
+        self.datapath.mkdir()
+        env = patch.dict(
+            os.environ,
+            {
+                "POLYANALYZER_DATA_DIR": str(self.root / "appdata"),
+                "POLYANALYZER_DISABLE_PARSE_CACHE": "1",
+            },
+        )
+        env.start()
+        self.addCleanup(env.stop)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _analyzer(self, files, **kwargs):
+        options = {"draw_seg_mode": False, "left_length": 1.0, "right_length": 1.0}
+        options.update(kwargs)
+        with patch.object(dsc, "get_install_dir", return_value=str(self.root)):
+            analyzer = dsc.DSCAnalyzer(str(self.datapath), **options)
+        analyzer.selected_file = list(files)
+        return analyzer
+
+    def _outputs(self):
+        return {
+            str(path.relative_to(self.root)): path.read_bytes()
+            for folder in ("DSC_Cycle", "DSC_Pic")
+            for path in sorted((self.root / folder).rglob("*"))
+            if path.is_file()
+        }
+
+    def test_overlay_uses_run_segments_and_matches_csv_rendering(self) -> None:
+        (self.datapath / "a.txt").write_text(_dsc_text(0.0), encoding="utf-8")
+        analyzer = self._analyzer(["a.txt"])
+
+        with patch.object(dsc.np, "loadtxt", wraps=np.loadtxt) as loadtxt:
+            self.assertTrue(analyzer.run())
+
+        # 叠加图不再回读本次运行刚导出的 CSV
+        self.assertFalse([call for call in loadtxt.call_args_list if isinstance(call.args[0], str)])
+
+        cycle_dir = self.root / "DSC_Cycle"
+        self.assertEqual(["Cycle1", "Cycle2"], sorted(os.listdir(cycle_dir)))
+        self.assertEqual({}, analyzer.cycle_segments)
+        in_memory = (cycle_dir / "Cycle1" / "result.png").read_bytes()
+        exported = np.loadtxt(cycle_dir / "Cycle1" / "a.csv", delimiter=",")
+        self.assertEqual(2, exported.shape[1])
+
+        # 不经过 run 时回退到读取已导出的 CSV，两条路径的叠加图一致
+        analyzer.cycle_draw()
+        self.assertEqual(in_memory, (cycle_dir / "Cycle1" / "result.png").read_bytes())
+
+    def test_background_csv_export_matches_segments(self) -> None:
+        for name, phase in (("a.txt", 0.0), ("b.txt", 1.0)):
+            (self.datapath / name).write_text(_dsc_text(phase), encoding="utf-8")
+        analyzer = self._analyzer(["a.txt", "b.txt"])
+        analyzer.draw_cycle = False
+        registered = {}
+        original = analyzer._finish_segment_writes
+
+        def finish() -> None:
+            registered.update({
+                (index, name): segment.copy()
+                for index, segments in analyzer.cycle_segments.items()
+                for name, segment in segments.items()
+            })
+            original()
+
+        with patch.object(analyzer, "_finish_segment_writes", side_effect=finish):
+            self.assertTrue(analyzer.run())
+
+        self.assertEqual(4, len(registered))
+        for (index, name), segment in registered.items():
+            exported = np.loadtxt(
+                self.root / "DSC_Cycle" / f"Cycle{index}" / f"{name}.csv", delimiter=","
+            )
+            np.testing.assert_array_equal(segment.astype(np.float64), exported)
+
+    def test_process_pool_matches_serial_run(self) -> None:
+        for name, phase in (("a.txt", 0.0), ("b.txt", 1.0), ("c.txt", 2.0)):
+            (self.datapath / name).write_text(_dsc_text(phase), encoding="utf-8")
+        (self.datapath / "bad.txt").write_text("StartOfData\nnot\tnumbers\n", encoding="utf-8")
+        files = ["a.txt", "bad.txt", "b.txt", "c.txt"]
+
+        self.assertTrue(self._analyzer(files, draw_seg_mode=True, jobs=1).run())
+        serial = self._outputs()
+
+        progress = []
+        analyzer = self._analyzer(
+            files, draw_seg_mode=True, jobs=2,
+            progress_callback=lambda value, _message: progress.append(value),
+        )
+        with patch.object(dsc, "run_ordered", wraps=dsc.run_ordered) as pooled:
+            self.assertTrue(analyzer.run())
+
+        self.assertEqual(2, pooled.call_args.kwargs["workers"])
+        self.assertEqual(sorted(progress), progress)
+        self.assertEqual(1.0, progress[-1])
+        self.assertIn("DSC_Cycle/Cycle1/result.png", serial)
+        self.assertIn("DSC_Pic/c/Cycle 2.png", serial)
+        pooled_outputs = self._outputs()
+        self.assertEqual(sorted(serial), sorted(pooled_outputs))
+        self.assertEqual(
+            [], [name for name in serial if serial[name] != pooled_outputs[name]]
+        )
+
+    def test_cycle_template_matches_single_file_render(self) -> None:
+        for name, phase in (("a.txt", 0.0), ("b.txt", 1.0)):
+            (self.datapath / name).write_text(_dsc_text(phase), encoding="utf-8")
+        analyzer = self._analyzer(["a.txt", "b.txt"], draw_seg_mode=True, jobs=1)
+        with patch.object(
+            dsc.DSCAnalyzer, "_build_cycle_template",
+            autospec=True, side_effect=dsc.DSCAnalyzer._build_cycle_template,
+        ) as build:
+            self.assertTrue(analyzer.run())
+        batch = self._outputs()
+
+        # 四张切片图共用一个模板，批次结束后释放
+        self.assertEqual(1, build.call_count)
+        self.assertEqual(0, len(analyzer._templates))
+        self.assertTrue(self._analyzer(["b.txt"], draw_seg_mode=True, jobs=1).run())
+        single = self._outputs()
+        for name in ("DSC_Pic/b/Cycle 1.png", "DSC_Pic/b/Cycle 2.png"):
+            self.assertTrue(single[name] == batch[name], name)
+
+    def test_npy_segments_are_memory_mapped_by_cycle_draw(self) -> None:
+        (self.datapath / "a.txt").write_text(_dsc_text(0.0), encoding="utf-8")
+        analyzer = self._analyzer(["a.txt"], segment_format="both")
+        self.assertTrue(analyzer.run())
+
+        cycle1 = self.root / "DSC_Cycle" / "Cycle1"
+        stored = np.load(cycle1 / "a.npy", mmap_mode="r")
+        self.assertIsInstance(stored, np.memmap)
+        self.assertEqual(np.float32, stored.dtype)
+        np.testing.assert_array_equal(np.loadtxt(cycle1 / "a.csv", delimiter=","), stored)
+        self.assertEqual([("a", str(cycle1 / "a.npy"))], dsc.segment_files(str(cycle1)))
+
+        rendered = (cycle1 / "result.png").read_bytes()
+        with patch.object(dsc.np, "loadtxt", side_effect=AssertionError("CSV parsed")):
+            analyzer.cycle_draw()
+        self.assertEqual(rendered, (cycle1 / "result.png").read_bytes())
+
+    def test_cancelled_run_discards_staging_output(self) -> None:
+        for name, phase in (("a.txt", 0.0), ("b.txt", 1.0)):
+            (self.datapath / name).write_text(_dsc_text(phase), encoding="utf-8")
+        (self.root / "DSC_Cycle").mkdir()
+        (self.root / "DSC_Cycle" / "previous.csv").write_text("1,2\n", encoding="utf-8")
+        token = CancellationToken()
+
+        def cancel_after_first_file(_value, message):
+            if message.startswith("处理进度 1/"):
+                token.cancel()
+
+        analyzer = self._analyzer(
+            ["a.txt", "b.txt"], jobs=1,
+            progress_callback=cancel_after_first_file, cancel_token=token,
+        )
+        with patch.object(analyzer, "_process_file", wraps=analyzer._process_file) as process:
+            with self.assertRaises(AnalysisCancelled):
+                analyzer.run()
+
+        self.assertEqual(1, process.call_count)
+        # 暂存目录被丢弃，上一次的输出保持原样
+        self.assertFalse([name for name in os.listdir(self.root) if "staging" in name])
+        self.assertFalse((self.root / "DSC_Pic").exists())
+        self.assertEqual(["previous.csv"], os.listdir(self.root / "DSC_Cycle"))
+
+    def test_unknown_segment_format_is_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            self._analyzer(["a.txt"], segment_format="parquet")
+        response = api._handle_request({
+            "jsonrpc": "2.0",
+            "method": "dsc.analyze",
+            "params": {"datadir": str(self.datapath), "segment_format": "parquet"},
+            "id": 1,
+        })
+        self.assertEqual(api.INVALID_PARAMS, response["error"]["code"])
+
+
+if __name__ == "__main__":
+    unittest.main()
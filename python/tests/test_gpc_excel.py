@@ -17,20 +17,18 @@ import pandas as pd
 PYTHON_DIR = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(PYTHON_DIR))
 
+import sandbox  # noqa: F401  (isolates the data root and log files)
+
 # Keep the legacy import-time logger away from the repository while tests run.
 _IMPORT_TMP = tempfile.TemporaryDirectory()
 _ORIGINAL_CWD = os.getcwd()
 os.chdir(_IMPORT_TMP.name)
-os.environ["POLYANALYZER_DISABLE_FILE_LOG"] = "1"
-os.environ["POLYANALYZER_DATA_DIR"] = str(Path(_IMPORT_TMP.name, "data"))
 try:
     from analyzer.excel_reader import parse_gpc_excel
     from analyzer import gpc, mw
     import api
     import cli
 finally:
-    os.environ.pop("POLYANALYZER_DISABLE_FILE_LOG", None)
-    os.environ.pop("POLYANALYZER_DATA_DIR", None)
     os.chdir(_ORIGINAL_CWD)
 
 
@@ -216,6 +214,48 @@ class GpcExcelAnalyzerTests(unittest.TestCase):
             self.assertTrue(png.is_file(), f"missing figure for {name}")
             self.assertGreater(png.stat().st_size, 0)
 
+    def test_mw_parallel_render_commits_every_sample(self) -> None:
+        _make_workbook(self.datapath / "gpc-export-2.xlsx", extra_sample=True)
+        progress: list = []
+        analyzer = mw.MolecularWeightAnalyzer(
+            str(self.datapath), draw_table=False, jobs=2,
+            progress_callback=lambda value, _msg: progress.append(value),
+        )
+        analyzer.selected_file = ["gpc-export.xlsx", "gpc-export-2.xlsx"]
+
+        self.assertTrue(analyzer.run())
+
+        outdir = self.tmp_path / "Mw_output"
+        self.assertEqual(
+            ["26-2611 (GPP-262-3#).png", "26-2612 (GPP-262-2#).png", "26-2613 (GPP-262-1#).png"],
+            sorted(path.name for path in outdir.iterdir()),
+        )
+        self.assertEqual(sorted(progress), progress)
+        self.assertEqual(1.0, progress[-1])
+        leftovers = [p.name for p in self.tmp_path.iterdir() if "staging" in p.name]
+        self.assertEqual([], leftovers)
+
+    def test_mw_statistics_cover_every_excel_sample_without_figures(self) -> None:
+        _make_workbook(self.datapath / "gpc-export-2.xlsx", extra_sample=True)
+        analyzer = mw.MolecularWeightAnalyzer(str(self.datapath), jobs=2)
+        analyzer.selected_file = ["gpc-export.xlsx", "gpc-export-2.xlsx"]
+        analyzer.selectedpos = [0, 1000000, 5000000, 10000000]
+
+        table = analyzer.compute_statistics()
+
+        self.assertEqual(["0-1000000", "1000000-5000000", "5000000-10000000"], table["segments"])
+        self.assertEqual(
+            ["26-2613 (GPP-262-1#)", "26-2612 (GPP-262-2#)"] * 2 + ["26-2611 (GPP-262-3#)"],
+            [row["sample"] for row in table["rows"]],
+        )
+        self.assertEqual("gpc-export-2.xlsx", table["rows"][-1]["file"])
+        self.assertEqual(("28600", "520600", "18.19"), tuple(
+            table["rows"][0][key] for key in ("Mn", "Mw", "PDI")
+        ))
+        for row in table["rows"]:
+            self.assertAlmostEqual(100.0, sum(row["percentages"]), places=6)
+        self.assertFalse((self.tmp_path / "Mw_output").exists())
+
     def test_gpc_summary_csv_accumulates_all_input_files(self) -> None:
         """多文件分析时汇总 CSV 必须覆盖每个输入文件，而不是只留最后一个。"""
         second = self.datapath / "gpc-export-2.xlsx"
@@ -237,6 +277,33 @@ class GpcExcelAnalyzerTests(unittest.TestCase):
         self.assertIn("520600", csv_text)   # 第一个文件的样品仍在
         self.assertIn("919000", csv_text)   # 第二个文件的第三个样品仍在
 
+    def test_gpc_parallel_parse_matches_serial_order(self) -> None:
+        """进程池解析必须按输入顺序合并，并报告每个文件的进度。"""
+        _make_workbook(self.datapath / "gpc-export-2.xlsx", extra_sample=True)
+        outputs = {}
+        for jobs in (1, 2):
+            progress: list = []
+            analyzer = gpc.GPCAnalyzer(
+                str(self.datapath), f"jobs-{jobs}",
+                save_file=True, save_picture=False,
+                save_figure_file_gpc=False, jobs=jobs,
+                progress_callback=lambda value, _msg: progress.append(value),
+            )
+            analyzer.selected_file = ["gpc-export-2.xlsx", "gpc-export.xlsx"]
+
+            self.assertTrue(analyzer.run())
+
+            self.assertEqual([0.5, 1.0], progress)
+            self.assertEqual(
+                ["26-2613 (GPP-262-1#)", "26-2612 (GPP-262-2#)", "26-2611 (GPP-262-3#)"],
+                list(analyzer.peak_data),
+            )
+            outputs[jobs] = (
+                self.tmp_path / "GPC_output" / f"jobs-{jobs}.csv"
+            ).read_text(encoding="utf-8")
+
+        self.assertEqual(outputs[1], outputs[2])
+
 
 class GpcExcelListingTests(unittest.TestCase):
     """Excel files must be listed and accepted by the GUI sidecar and CLI."""
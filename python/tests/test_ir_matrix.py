@@ -0,0 +1,128 @@
+"""
+Tests for the IR spectral matrix (analyzer/ir_matrix.py).
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+
+PYTHON_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PYTHON_DIR))
+
+import sandbox  # noqa: F401  (isolates the data root and log files)
+
+# Keep the legacy import-time logger away from the repository while tests run.
+_IMPORT_TMP = tempfile.TemporaryDirectory()
+_ORIGINAL_CWD = os.getcwd()
+os.chdir(_IMPORT_TMP.name)
+try:
+    from analyzer import ir
+    from analyzer.ir_matrix import SpectralMatrix, common_grid
+finally:
+    os.chdir(_ORIGINAL_CWD)
+
+
+def _absorbance(wavenumber, shift=0.0):
+    return (
+        0.2
+        + 0.5 * np.exp(-(((wavenumber - 1450.0 - shift) / 25.0) ** 2))
+        + 0.3 * np.exp(-(((wavenumber - 2900.0) / 40.0) ** 2))
+    )
+
+
+class SpectralMatrixTests(unittest.TestCase):
+    def test_shared_axis_matches_per_spectrum_processing(self) -> None:
+        wavenumber = np.linspace(4000.0, 400.0, 1801)
+        absorbances = [_absorbance(wavenumber, shift) for shift in (0.0, 10.0, -15.0)]
+        matrix = SpectralMatrix.from_spectra(["a", "b", "c"], [wavenumber] * 3, absorbances)
+
+        np.testing.assert_array_equal(wavenumber, matrix.wavenumber)
+        self.assertEqual((3, 1801), matrix.absorbance.shape)
+        self.assertEqual(np.float32, matrix.absorbance.dtype)
+
+        normalized = matrix.normalized_transmittance(
+            1450.0, ir.NORMALIZATION_WINDOW, ir.NORMALIZATION_TARGET_ABSORBANCE
+        )
+        for row, absorbance in enumerate(absorbances):
+            transmittance = ir.IRAnalyzer.absorbance_to_transmittance(absorbance)
+            np.testing.assert_allclose(transmittance, matrix.transmittance()[row], rtol=1e-5)
+            expected = ir.IRAnalyzer.normalize_to_peak(wavenumber, transmittance, center=1450.0)
+            np.testing.assert_allclose(expected, normalized[row], rtol=1e-5)
+
+            connectors, _x, gapped = ir.IRAnalyzer._gap_traces(wavenumber, transmittance)
+            values = matrix.transmittance()
+            triples = matrix.gap_connectors(values, ir.GAPS)
+            for (has_connector, x, y), segment in zip(triples, connectors):
+                self.assertTrue(has_connector[row])
+                np.testing.assert_allclose(segment[0], x[row])
+                np.testing.assert_allclose(segment[1], y[row], rtol=1e-5)
+            np.testing.assert_array_equal(np.isnan(gapped), matrix.gap_columns(ir.GAPS))
+
+    def test_mixed_axes_are_resampled_with_uncovered_points_as_nan(self) -> None:
+        coarse = np.linspace(4000.0, 400.0, 901)
+        fine_partial = np.linspace(3000.0, 1000.0, 2001)
+        grid = common_grid([coarse, fine_partial])
+        self.assertEqual((4000.0, 400.0), (grid[0], grid[-1]))
+        self.assertAlmostEqual(1.0, grid[0] - grid[1])
+
+        matrix = SpectralMatrix.from_spectra(
+            ["coarse", "partial"],
+            [coarse, fine_partial[::-1]],
+            [_absorbance(coarse), _absorbance(fine_partial[::-1])],
+        )
+        covered = ~np.isnan(matrix.absorbance[1])
+        np.testing.assert_array_equal((grid >= 1000.0) & (grid <= 3000.0), covered)
+        np.testing.assert_allclose(_absorbance(grid[covered]), matrix.absorbance[1, covered], rtol=1e-5)
+
+        # The partial spectrum ends at 3000 cm^-1, so nothing bridges its 2800-3000 gap
+        values = matrix.transmittance()
+        (high_gap, _, _), (low_gap, _, _) = matrix.gap_connectors(values, ir.GAPS)
+        self.assertEqual([True, False], high_gap.tolist())
+        self.assertEqual([True, True], low_gap.tolist())
+        with self.assertRaisesRegex(ValueError, "partial"):
+            matrix.normalized_transmittance(3500.0, 80.0, 0.6)
+
+    def test_save_and_memory_mapped_load(self) -> None:
+        wavenumber = np.linspace(4000.0, 400.0, 50)
+        matrix = SpectralMatrix.from_spectra(["样品-1", "b"], [wavenumber] * 2, [_absorbance(wavenumber)] * 2)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            paths = matrix.save(temp_dir)
+            self.assertEqual(
+                ["dpt_matrix.npy", "dpt_wavenumber.npy", "dpt_names.npy"],
+                [os.path.basename(path) for path in paths],
+            )
+            loaded = SpectralMatrix.load(temp_dir)
+            self.assertIsInstance(loaded.absorbance, np.memmap)
+            self.assertEqual(["样品-1", "b"], loaded.names)
+            np.testing.assert_array_equal(matrix.absorbance, loaded.absorbance)
+            del loaded
+
+    def test_run_exposes_and_optionally_saves_the_matrix(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            data_dir = Path(temp_dir, "data")
+            data_dir.mkdir()
+            wavenumber = np.linspace(4000.0, 400.0, 300)
+            for name in ("a.dpt", "b.dpt"):
+                (data_dir / name).write_text(
+                    "".join(f"{w:.2f} {a:.5f}\n" for w, a in zip(wavenumber, _absorbance(wavenumber))),
+                    encoding="utf-8",
+                )
+            with patch.dict(os.environ, {"POLYANALYZER_DISABLE_PARSE_CACHE": "1"}), \
+                    patch.object(ir, "get_install_dir", return_value=temp_dir):
+                analyzer = ir.IRAnalyzer(str(data_dir), selected_files=["a.dpt", "b.dpt"], save_matrix=True)
+                with patch.object(analyzer, "plot_spectrum"):
+                    self.assertTrue(analyzer.run())
+
+            self.assertEqual(["a", "b"], analyzer.spectral_matrix.names)
+            self.assertIn(os.path.join(analyzer.output_dir, "dpt_matrix.npy"), analyzer.generated_files)
+            stored = np.load(os.path.join(analyzer.output_dir, "dpt_matrix.npy"), allow_pickle=False)
+            np.testing.assert_array_equal(analyzer.spectral_matrix.absorbance, stored)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,195 @@
+"""
+Tests for the IR similarity search index (analyzer/ir_search.py).
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+
+PYTHON_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PYTHON_DIR))
+
+import sandbox  # noqa: F401  (isolates the data root and log files)
+
+# Keep the legacy import-time logger away from the repository while tests run.
+_IMPORT_TMP = tempfile.TemporaryDirectory()
+_ORIGINAL_CWD = os.getcwd()
+os.chdir(_IMPORT_TMP.name)
+try:
+    from analyzer import ir_search
+    import api
+finally:
+    os.chdir(_ORIGINAL_CWD)
+
+
+def _write_dpt(path: Path, peak: float, wavenumber=None) -> None:
+    if wavenumber is None:
+        wavenumber = np.linspace(4000.0, 400.0, 1801)
+    absorbance = (
+        0.1
+        + 0.5 * np.exp(-(((wavenumber - 1450.0) / 25.0) ** 2))
+        + 0.4 * np.exp(-(((wavenumber - peak) / 30.0) ** 2))
+    )
+    path.write_text(
+        "".join(f"{w:.2f}\t{a:.6f}\n" for w, a in zip(wavenumber, absorbance)),
+        encoding="utf-8",
+    )
+
+
+class SpectralIndexTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.library = self.root / "library"
+        self.library.mkdir()
+        env = patch.dict(
+            os.environ,
+            {
+                "POLYANALYZER_DATA_DIR": str(self.root / "appdata"),
+                "POLYANALYZER_DISABLE_PARSE_CACHE": "1",
+            },
+        )
+        env.start()
+        self.addCleanup(env.stop)
+        self.addCleanup(ir_search._OPEN_INDEXES.clear)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_query_ranks_the_closest_spectra_first(self) -> None:
+        for peak in (1000, 1200, 1700, 2200, 3300):
+            _write_dpt(self.library / f"p{peak}.dpt", peak)
+        query = self.root / "query.dpt"
+        _write_dpt(query, 1710, wavenumber=np.linspace(400.0, 4000.0, 3601))
+
+        for metric in ir_search.SEARCH_METRICS:
+            result = ir_search.search(str(self.library), str(query), top_k=2, metric=metric, jobs=1)
+            self.assertEqual(2, len(result["matches"]))
+            self.assertEqual("p1700.dpt", result["matches"][0]["file"])
+            self.assertGreater(result["matches"][0]["score"], result["matches"][1]["score"])
+            self.assertLessEqual(result["matches"][0]["score"], 1.0)
+
+        # A stored spectrum is its own best match
+        result = ir_search.search(str(self.library), str(self.library / "p2200.dpt"), top_k=1)
+        self.assertEqual("p2200.dpt", result["matches"][0]["file"])
+        self.assertAlmostEqual(1.0, result["matches"][0]["score"], places=5)
+
+    def test_sync_adds_and_removes_only_changed_files(self) -> None:
+        for peak in (1000, 1700, 2200):
+            _write_dpt(self.library / f"p{peak}.dpt", peak)
+        (self.library / "broken.dpt").write_text("no numbers here\n", encoding="utf-8")
+        index = ir_search.SpectralIndex(str(self.library))
+        first = index.sync(jobs=1)
+        self.assertEqual((3, 0), (first["added"], first["removed"]))
+        self.assertEqual(["broken.dpt"], list(first["skipped"]))
+
+        unchanged = index.sync()
+        self.assertEqual((0, 0), (unchanged["added"], unchanged["removed"]))
+
+        (self.library / "p1000.dpt").unlink()
+        _write_dpt(self.library / "p1700.dpt", 3300)
+        # Same size as before; the new mtime alone marks the file as changed
+        os.utime(self.library / "p1700.dpt", ns=(1, 1))
+        _write_dpt(self.library / "p2600.dpt", 2600)
+        with patch.object(ir_search, "load_features", wraps=ir_search.load_features) as loads:
+            changes = index.sync(jobs=1)
+        self.assertEqual(
+            ["p1700.dpt", "p2600.dpt"],
+            sorted(os.path.basename(call.args[0]) for call in loads.call_args_list),
+        )
+        self.assertEqual((2, 2), (changes["added"], changes["removed"]))
+        self.assertEqual(["p2200.dpt", "p1700.dpt", "p2600.dpt"], index.files)
+        self.assertEqual((3, ir_search.INDEX_GRID.size), index.features.shape)
+
+        features = ir_search.load_features(str(self.library / "p1700.dpt"))
+        self.assertEqual("p1700.dpt", index.query(features, top_k=1)[0]["file"])
+
+    def test_index_persists_and_rebuilds_when_stale(self) -> None:
+        for peak in (1000, 1700):
+            _write_dpt(self.library / f"p{peak}.dpt", peak)
+        index = ir_search.SpectralIndex(str(self.library))
+        index.sync(jobs=1)
+
+        reloaded = ir_search.SpectralIndex(str(self.library))
+        self.assertEqual(index.files, reloaded.files)
+        np.testing.assert_array_equal(index.features, reloaded.features)
+        with patch.object(ir_search, "load_features") as loads:
+            self.assertEqual(0, reloaded.sync()["added"])
+        loads.assert_not_called()
+
+        # A different normalization peak or a torn index is rebuilt from scratch
+        self.assertEqual(0, len(ir_search.SpectralIndex(str(self.library), normalization_peak=1700.0)))
+        meta_path = Path(index.index_dir, ir_search.META_FILENAME)
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        meta["entries"].pop()
+        meta_path.write_text(json.dumps(meta), encoding="utf-8")
+        self.assertEqual(0, len(ir_search.SpectralIndex(str(self.library))))
+
+    def test_each_normalization_peak_keeps_its_own_index(self) -> None:
+        for peak in (1000, 1700):
+            _write_dpt(self.library / f"p{peak}.dpt", peak)
+        ir_search.open_index(str(self.library)).sync(jobs=1)
+        ir_search.open_index(str(self.library), 1700.0).sync(jobs=1)
+        self.assertNotEqual(
+            ir_search.index_dir_for(str(self.library)), ir_search.index_dir_for(str(self.library), 1700.0)
+        )
+
+        # 重启后两个峰位的索引都能直接读取，无需重建
+        ir_search._OPEN_INDEXES.clear()
+        with patch.object(ir_search, "load_features") as loads:
+            for peak in (1450.0, 1700.0):
+                index = ir_search.open_index(str(self.library), peak)
+                self.assertEqual(2, len(index))
+                self.assertEqual(0, index.sync()["added"])
+        loads.assert_not_called()
+
+    def test_rpc_search_and_parameter_validation(self) -> None:
+        _write_dpt(self.library / "a.dpt", 1700)
+        _write_dpt(self.library / "b.dpt", 2200)
+        params = {"datadir": str(self.library), "query": str(self.library / "b.dpt"), "top_k": 1}
+        response = api._handle_request({"jsonrpc": "2.0", "method": "ir.search", "params": params, "id": 1})
+        self.assertEqual(2, response["result"]["index"]["entries"])
+        self.assertEqual("b.dpt", response["result"]["matches"][0]["file"])
+
+        for bad in (
+            {"top_k": 0},
+            {"top_k": True},
+            {"metric": "euclidean"},
+            {"query": str(self.library)},
+            {"normalization_peak": 5000},
+            {"refresh": "yes"},
+            {"jobs": -1},
+            {"datadir": str(self.root / "missing")},
+        ):
+            response = api._handle_request({
+                "jsonrpc": "2.0", "method": "ir.search", "params": {**params, **bad}, "id": 2,
+            })
+            self.assertEqual(api.INVALID_PARAMS, response["error"]["code"], bad)
+
+    def test_large_index_query_is_fast(self) -> None:
+        rows = np.random.default_rng(0).random((50_000, ir_search.INDEX_GRID.size), dtype=np.float32)
+        rows /= np.linalg.norm(rows, axis=1, keepdims=True)
+        index = ir_search.SpectralIndex(str(self.library))
+        index.features = rows
+        index.sums = rows.sum(axis=1, dtype=np.float64)
+        index.files = [f"s{row}.dpt" for row in range(len(rows))]
+
+        start = time.perf_counter()
+        matches = index.query(rows[4321], top_k=5)
+        elapsed = time.perf_counter() - start
+        self.assertEqual("s4321.dpt", matches[0]["file"])
+        runner_up = int(matches[1]["file"][1:-len(".dpt")])
+        expected = np.corrcoef(rows[runner_up], rows[4321])[0, 1]
+        self.assertAlmostEqual(expected, matches[1]["score"], places=4)
+        self.assertLess(elapsed, 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
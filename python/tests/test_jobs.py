@@ -0,0 +1,214 @@
+"""
+Tests for the asynchronous job subsystem (jobs.py and the job.* RPC methods).
+"""
+
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+
+PYTHON_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PYTHON_DIR))
+
+import sandbox  # noqa: F401  (isolates the data root and log files)
+
+# Keep the legacy import-time logger away from the repository while tests run.
+_IMPORT_TMP = tempfile.TemporaryDirectory()
+_ORIGINAL_CWD = os.getcwd()
+os.chdir(_IMPORT_TMP.name)
+try:
+    import api
+    import jobs
+finally:
+    os.chdir(_ORIGINAL_CWD)
+
+
+def _write_dpt(path: Path) -> None:
+    wavenumber = np.linspace(4000.0, 400.0, 300)
+    absorbance = 0.2 + 0.5 * np.exp(-(((wavenumber - 1450.0) / 25.0) ** 2))
+    path.write_text(
+        "".join(f"{w:.2f} {a:.5f}\n" for w, a in zip(wavenumber, absorbance)),
+        encoding="utf-8",
+    )
+
+
+class JobJournalTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.journal = self._tmp.name
+
+    def test_finished_jobs_survive_a_restart(self) -> None:
+        sent = []
+        manager = jobs.JobManager(self.journal, notify=lambda method, params: sent.append(method))
+        done = manager.create("dsc.analyze", {"datadir": "/data"})
+        manager.start(done)
+        manager.report_progress(done, 0.5, "half")
+        manager.report_file(done, {"file": "a.txt", "success": True, "error": None})
+        manager.finish(done, "succeeded", result={"success": True, "output_dir": self.journal})
+        running = manager.create("mw.analyze", {})
+        manager.start(running)
+        self.assertEqual(
+            ["job.state", "job.progress", "job.partial", "job.state", "job.state"], sent
+        )
+
+        # 模拟写入中途崩溃留下的残缺行
+        with open(os.path.join(self.journal, running.id + jobs.FILES_SUFFIX), "a", encoding="utf-8") as handle:
+            handle.write('{"file": "b.txt", "succ')
+
+        reloaded = jobs.JobManager(self.journal)
+        self.assertEqual([done.id, running.id], [job.id for job in reloaded.list()])
+        restored = reloaded.get(done.id)
+        self.assertEqual("succeeded", restored.state)
+        self.assertEqual(1.0, restored.progress)
+        self.assertEqual(done.files, restored.files)
+        self.assertEqual([{"path": self.journal, "exists": True}], restored.artifacts())
+
+        interrupted = reloaded.get(running.id)
+        self.assertEqual("interrupted", interrupted.state)
+        self.assertEqual([], interrupted.files)
+        self.assertEqual([interrupted.id], [job.id for job in reloaded.list("interrupted")])
+
+    def test_oldest_finished_jobs_are_pruned(self) -> None:
+        manager = jobs.JobManager(self.journal, max_finished=2)
+        created = []
+        for _ in range(4):
+            job = manager.create("ir.analyze", {})
+            manager.finish(job, "failed", error={"code": -1, "message": "boom"})
+            created.append(job.id)
+        manager.create("ir.analyze", {})
+
+        kept = [job.id for job in manager.list("failed")]
+        self.assertEqual(created[2:], kept)
+        journaled = {name.split(".")[0] for name in os.listdir(self.journal)}
+        self.assertEqual(3, len(journaled))
+        self.assertFalse(journaled & set(created[:2]))
+
+
+class JobRpcTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.root = Path(self._tmp.name)
+        env = patch.dict(
+            os.environ,
+            {
+                "POLYANALYZER_DATA_DIR": str(self.root / "appdata"),
+                "POLYANALYZER_DISABLE_PARSE_CACHE": "1",
+            },
+        )
+        env.start()
+        self.addCleanup(env.stop)
+        self.output = io.StringIO()
+        stdout = patch.object(api.sys, "stdout", self.output)
+        stdout.start()
+        self.addCleanup(stdout.stop)
+        jobs_patch = patch.object(api, "_JOBS", None)
+        jobs_patch.start()
+        self.addCleanup(jobs_patch.stop)
+
+    def _call(self, rpc_method, **params):
+        response = api._handle_request({"jsonrpc": "2.0", "method": rpc_method, "params": params, "id": 1})
+        return response.get("result", response.get("error"))
+
+    def _wait_for_jobs(self) -> None:
+        api._shared_dispatcher().shutdown(wait=True)
+
+    def _notifications(self, method):
+        messages = [json.loads(line) for line in self.output.getvalue().splitlines()]
+        return [message["params"] for message in messages if message.get("method") == method]
+
+    def test_submitted_analysis_reports_files_and_artifacts(self) -> None:
+        datadir = self.root / "data"
+        datadir.mkdir()
+        for name in ("a.dpt", "b.dpt"):
+            _write_dpt(datadir / name)
+        (datadir / "bad.dpt").write_text("not a spectrum\n", encoding="utf-8")
+
+        submitted = self._call(
+            "job.submit",
+            method="ir.analyze",
+            params={"datadir": str(datadir), "selected_files": ["a.dpt", "bad.dpt", "b.dpt"]},
+        )
+        self.assertIn(submitted["state"], ("queued", "running"))
+        self._wait_for_jobs()
+
+        status = self._call("job.status", id=submitted["id"])
+        self.assertEqual("succeeded", status["state"])
+        self.assertEqual(3, status["files"])
+        first = self._call("job.result", id=submitted["id"], since=0)
+        self.assertEqual(["a.dpt", "bad.dpt", "b.dpt"], [item["file"] for item in first["files"]])
+        self.assertEqual([True, False, True], [item["success"] for item in first["files"]])
+        self.assertTrue(first["artifacts"])
+        self.assertTrue(all(artifact["exists"] for artifact in first["artifacts"]))
+        self.assertEqual([], self._call("job.result", id=submitted["id"], since=first["next"])["files"])
+
+        self.assertEqual(3, len(self._notifications("job.partial")))
+        self.assertEqual(["running", "succeeded"], [n["state"] for n in self._notifications("job.state")])
+        progress = self._notifications("job.progress")
+        self.assertTrue(progress)
+        self.assertEqual({submitted["id"]}, {n["job_id"] for n in progress})
+        self.assertFalse(self._notifications("progress"))
+
+        # 重启后从日志读取结果，不再重新运行
+        with patch.object(api, "_JOBS", None), \
+                patch.object(api.RequestDispatcher, "submit_job") as submit_job:
+            restored = self._call("job.result", id=submitted["id"])
+            submit_job.assert_not_called()
+        self.assertEqual(first["artifacts"], restored["artifacts"])
+        self.assertEqual(first["files"], restored["files"])
+
+    def test_failed_and_cancelled_jobs(self) -> None:
+        started = threading.Event()
+
+        def cancellable(params):
+            started.set()
+            token = params["__cancel_token"]
+            for _ in range(500):
+                token.raise_if_cancelled()
+                threading.Event().wait(0.01)
+            return {"success": True}
+
+        with patch.dict(api.METHOD_TABLE, {"ir.analyze": cancellable}):
+            running = self._call("job.submit", method="ir.analyze", params={"__job": "x"})
+            queued = self._call("job.submit", method="ir.analyze")
+            self.assertTrue(started.wait(5))
+            self.assertEqual({"cancelled": True}, self._call("job.cancel", id=queued["id"]))
+            self.assertEqual({"cancelled": True}, self._call("job.cancel", id=running["id"]))
+            self._wait_for_jobs()
+        failed = self._call("job.submit", method="dsc.analyze", params={"datadir": ""})
+        self._wait_for_jobs()
+
+        for job_id in (running["id"], queued["id"]):
+            status = self._call("job.status", id=job_id)
+            self.assertEqual("cancelled", status["state"])
+            self.assertEqual(api.REQUEST_CANCELLED, status["error"]["code"])
+        self.assertEqual({"cancelled": False}, self._call("job.cancel", id=running["id"]))
+        status = self._call("job.status", id=failed["id"])
+        self.assertEqual("failed", status["state"])
+        self.assertEqual(api.INVALID_PARAMS, status["error"]["code"])
+        self.assertEqual(
+            [failed["id"]], [job["id"] for job in self._call("job.list", state="failed")["jobs"]]
+        )
+        self.assertEqual(3, len(self._call("job.list")["jobs"]))
+
+        for method, params in (
+            ("job.submit", {"method": "settings.list"}),
+            ("job.submit", {"method": "ir.analyze", "params": []}),
+            ("job.status", {"id": "missing"}),
+            ("job.status", {}),
+            ("job.list", {"state": "done"}),
+            ("job.result", {"id": failed["id"], "since": -1}),
+        ):
+            self.assertEqual(api.INVALID_PARAMS, self._call(method, **params)["code"], (method, params))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,174 @@
+"""
+Tests for incremental MW re-rendering in the sidecar (analyzer/mw.py).
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+
+PYTHON_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PYTHON_DIR))
+
+import sandbox  # noqa: F401  (isolates the data root and log files)
+
+# Keep the legacy import-time logger away from the repository while tests run.
+_IMPORT_TMP = tempfile.TemporaryDirectory()
+_ORIGINAL_CWD = os.getcwd()
+os.chdir(_IMPORT_TMP.name)
+try:
+    from analyzer import mw, parallel
+finally:
+    os.chdir(_ORIGINAL_CWD)
+
+
+_SEGMENTS_A = [0, 5000, 10000, 50000, 100000, 500000, 1000000, 5000000]
+_SEGMENTS_B = [0, 2000, 30000, 100000, 1000000, 5000000]
+
+
+def _write_rst(path: Path, sample: str, center: float = 4.5) -> None:
+    logm = np.linspace(2.5, 6.5, 120)
+    norm = np.exp(-((logm - center) ** 2) / 0.4)
+    rows = "".join(
+        f"{i}\t{i}.5\t{value:.6f}\t2\t{10 ** lm:.3f}\t{lm:.4f}\t0.1\t0\t\n"
+        for i, (value, lm) in enumerate(zip(norm, logm))
+    )
+    path.write_text(
+        f"Sample Name\t{sample}\n<MW_Averages>\nh\nu\n-\n"
+        "Peak 1\t1000\t900\t1100\t1200\t1300\t1050\t1.22\n"
+        "</MW_Averages>\n<Slice_Table>\nPeak 1\n" + rows + "</Slice_Table>\n",
+        encoding="ascii",
+    )
+
+
+class IncrementalMwRenderTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp_path = Path(self._tmp.name)
+        self.datapath = self.tmp_path / "data"
+        self.datapath.mkdir()
+        _write_rst(self.datapath / "a.rst", "PS-a")
+        env = patch.dict(
+            os.environ,
+            {
+                "POLYANALYZER_DATA_DIR": str(self.tmp_path / "root"),
+                "POLYANALYZER_DISABLE_PARSE_CACHE": "1",
+            },
+        )
+        env.start()
+        self.addCleanup(env.stop)
+        self.session = mw.get_mw_session()
+        self.session.clear()
+        self.addCleanup(self.session.clear)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _run(self, segments, incremental: bool = True, files=("a.rst",), **options) -> bytes:
+        options.setdefault("jobs", 1)
+        analyzer = mw.MolecularWeightAnalyzer(
+            str(self.datapath), incremental=incremental, **options
+        )
+        analyzer.selected_file = list(files)
+        analyzer.segmentpos = list(segments)
+        analyzer.selectedpos = list(segments)
+        self.assertTrue(analyzer.run())
+        return (self.tmp_path / "Mw_output" / "a.png").read_bytes()
+
+    def test_segment_change_reuses_samples_and_curve_layer(self) -> None:
+        expected = self._run(_SEGMENTS_B, incremental=False)
+
+        with patch.object(
+            mw.MolecularWeightAnalyzer, "_collect_samples",
+            autospec=True, side_effect=mw.MolecularWeightAnalyzer._collect_samples,
+        ) as collect, patch.object(
+            mw.MolecularWeightAnalyzer, "_build_curve_layer",
+            autospec=True, side_effect=mw.MolecularWeightAnalyzer._build_curve_layer,
+        ) as build:
+            self._run(_SEGMENTS_A)
+            incremental = self._run(_SEGMENTS_B)
+
+        self.assertEqual(1, collect.call_count)
+        self.assertEqual(1, build.call_count)
+        # 复用曲线图层后的输出与全新绘制逐字节一致
+        self.assertEqual(expected, incremental)
+
+    def test_multi_sample_segment_change_with_default_jobs_reuses_curve_layers(self) -> None:
+        _write_rst(self.datapath / "b.rst", "PS-b", center=5.2)
+        files = ("a.rst", "b.rst")
+        expected = self._run(_SEGMENTS_B, incremental=False, files=files, jobs=1)
+        expected_b = (self.tmp_path / "Mw_output" / "b.png").read_bytes()
+
+        # 前端不传 jobs：即使有多个 CPU，增量模式也应在进程内绘制并保留曲线图层
+        with patch.object(parallel.os, "cpu_count", return_value=4), patch.object(
+            mw.MolecularWeightAnalyzer, "_build_curve_layer",
+            autospec=True, side_effect=mw.MolecularWeightAnalyzer._build_curve_layer,
+        ) as build, patch.object(mw, "run_ordered", wraps=mw.run_ordered) as pooled:
+            self._run(_SEGMENTS_A, files=files, jobs=None)
+            incremental = self._run(_SEGMENTS_B, files=files, jobs=None)
+
+        self.assertEqual(2, build.call_count)
+        self.assertEqual({1}, {call.kwargs["workers"] for call in pooled.call_args_list})
+        self.assertEqual(expected, incremental)
+        self.assertEqual(expected_b, (self.tmp_path / "Mw_output" / "b.png").read_bytes())
+
+    def test_style_change_skips_parsing_and_rebuilds_curve(self) -> None:
+        self._run(_SEGMENTS_A)
+        with patch.object(
+            mw.MolecularWeightAnalyzer, "_collect_samples",
+            autospec=True, side_effect=mw.MolecularWeightAnalyzer._collect_samples,
+        ) as collect, patch.object(
+            mw.MolecularWeightAnalyzer, "_build_curve_layer",
+            autospec=True, side_effect=mw.MolecularWeightAnalyzer._build_curve_layer,
+        ) as build:
+            restyled = self._run(_SEGMENTS_A, mw_color="#123456", line_width=2.0)
+            # 柱状图颜色只属于区间图层，曲线图层继续复用
+            self._run(_SEGMENTS_A, mw_color="#123456", line_width=2.0, bar_color="#654321")
+
+        collect.assert_not_called()
+        self.assertEqual(1, build.call_count)
+        self.assertEqual(
+            self._run(_SEGMENTS_A, incremental=False, mw_color="#123456", line_width=2.0),
+            restyled,
+        )
+
+    def test_changed_input_is_parsed_again(self) -> None:
+        self._run(_SEGMENTS_A)
+        _write_rst(self.datapath / "a.rst", "PS-b")
+        os.utime(self.datapath / "a.rst", ns=(1, 1))
+
+        with patch.object(
+            mw.MolecularWeightAnalyzer, "_collect_samples",
+            autospec=True, side_effect=mw.MolecularWeightAnalyzer._collect_samples,
+        ) as collect:
+            self._run(_SEGMENTS_A)
+
+        self.assertEqual(1, collect.call_count)
+        self.assertEqual("PS-b", self.session.samples[0].mw_data[0][0])
+
+    def test_batch_template_matches_single_sample_render(self) -> None:
+        _write_rst(self.datapath / "b.rst", "PS-b", center=5.2)
+        analyzer = mw.MolecularWeightAnalyzer(str(self.datapath), jobs=1)
+        analyzer.selected_file = ["a.rst", "b.rst"]
+        with patch.object(
+            mw.MolecularWeightAnalyzer, "_build_sample_template",
+            autospec=True, side_effect=mw.MolecularWeightAnalyzer._build_sample_template,
+        ) as build:
+            self.assertTrue(analyzer.run())
+        batch = (self.tmp_path / "Mw_output" / "b.png").read_bytes()
+
+        # 同一批次只建一次模板，批次结束后释放
+        self.assertEqual(1, build.call_count)
+        self.assertEqual(0, len(analyzer._templates))
+        single = mw.MolecularWeightAnalyzer(str(self.datapath), jobs=1)
+        single.selected_file = ["b.rst"]
+        self.assertTrue(single.run())
+        self.assertEqual((self.tmp_path / "Mw_output" / "b.png").read_bytes(), batch)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+"""
+Tests for analyzer/mw_segments.py — searchsorted/bincount segment binning.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+
+PYTHON_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PYTHON_DIR))
+
+import sandbox  # noqa: F401  (isolates the data root and log files)
+
+# Keep the legacy import-time logger away from the repository while tests run.
+_IMPORT_TMP = tempfile.TemporaryDirectory()
+_ORIGINAL_CWD = os.getcwd()
+os.chdir(_IMPORT_TMP.name)
+try:
+    from analyzer import mw, mw_segments
+finally:
+    os.chdir(_ORIGINAL_CWD)
+
+
+_BOUNDARIES = [0, 5000, 10000, 50000, 100000]
+
+
+class SegmentBinningTests(unittest.TestCase):
+    def test_boundary_slices_count_towards_the_segment_they_open(self) -> None:
+        mw_values = np.array([0.0, 5000.0, 7000.0, 10000.0, 50000.0, 100000.0, 2e5, -1.0, np.nan])
+        norm = np.full(mw_values.size, 0.1)
+
+        np.testing.assert_array_equal(
+            [0, 1, 1, 2, 3, -1, -1, -1, -1],
+            mw_segments.segment_indices(mw_values, _BOUNDARIES),
+        )
+        np.testing.assert_allclose(
+            [10.0, 20.0, 10.0, 10.0],
+            mw_segments.segment_percentages(mw_values, norm, _BOUNDARIES),
+        )
+
+    def test_matches_interval_masks_away_from_boundaries(self) -> None:
+        rng = np.random.default_rng(7)
+        mw_values = 10 ** rng.uniform(2, 5.5, 500)
+        norm = rng.random(500)
+
+        expected = [
+            np.sum(norm[(mw_values >= low) & (mw_values < high)]) * 100
+            for low, high in zip(_BOUNDARIES[:-1], _BOUNDARIES[1:])
+        ]
+        np.testing.assert_allclose(
+            expected, mw_segments.segment_percentages(mw_values, norm, _BOUNDARIES)
+        )
+
+    def test_matrix_matches_per_sample_results(self) -> None:
+        rng = np.random.default_rng(3)
+        mw_stack = 10 ** rng.uniform(2, 5.5, (4, 50))
+        mw_stack[2, 40:] = np.nan  # 较短的样品以 NaN 补齐
+        norm_stack = rng.random((4, 50))
+
+        matrix = mw_segments.segment_percentage_matrix(mw_stack, norm_stack, _BOUNDARIES)
+
+        self.assertEqual((4, 4), matrix.shape)
+        for row in range(4):
+            np.testing.assert_allclose(
+                mw_segments.segment_percentages(mw_stack[row], norm_stack[row], _BOUNDARIES),
+                matrix[row],
+            )
+        shared = mw_segments.segment_percentage_matrix(mw_stack[0], norm_stack, _BOUNDARIES)
+        np.testing.assert_allclose(
+            mw_segments.segment_percentages(mw_stack[0], norm_stack[3], _BOUNDARIES), shared[3]
+        )
+
+    def test_invalid_boundaries_and_shapes_are_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            mw_segments.segment_percentages(np.ones(3), np.ones(3), [10, 5, 20])
+        with self.assertRaises(ValueError):
+            mw_segments.segment_percentages(np.ones(3), np.ones(3), [10])
+        with self.assertRaises(ValueError):
+            mw_segments.segment_percentage_matrix(np.ones(4), np.ones((2, 3)), _BOUNDARIES)
+
+    def test_analyzer_counts_slices_on_segment_boundaries(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with patch.object(mw, "get_install_dir", return_value=temp_dir):
+                analyzer = mw.MolecularWeightAnalyzer(temp_dir)
+        analyzer.selectedpos = list(_BOUNDARIES)
+        analyzer.mw = np.array([5000.0, 10000.0, 50000.0])
+        analyzer.norm = np.array([0.2, 0.3, 0.5])
+
+        self.assertEqual(
+            [0.0, 20.0, 30.0, 50.0],
+            [round(value, 10) for value in analyzer._calculate_segment_percentages()],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+"""
+Tests for headless MW statistics — ``mw.compute`` and ``poly mw --stats-only``.
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+
+PYTHON_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PYTHON_DIR))
+
+import sandbox  # noqa: F401  (isolates the data root and log files)
+
+# Keep the legacy import-time logger away from the repository while tests run.
+_IMPORT_TMP = tempfile.TemporaryDirectory()
+_ORIGINAL_CWD = os.getcwd()
+os.chdir(_IMPORT_TMP.name)
+try:
+    from analyzer import mw
+    import api
+    import cli
+finally:
+    os.chdir(_ORIGINAL_CWD)
+
+
+def _write_rst(path: Path, sample: str, mn: str) -> None:
+    # 三个数据切片的 MW 依次为 1000 / 5000（恰在边界上）/ 20000
+    rows = "".join(
+        f"{i}\t{i}.5\t{norm}\t2\t{mw_value}\t3\t0.1\t0\t\n"
+        for i, (norm, mw_value) in enumerate([(0.2, 1000), (0.3, 5000), (0.5, 20000)])
+    )
+    path.write_text(
+        f"Sample Name\t{sample}\n<MW_Averages>\nh\nu\n-\n"
+        f"Peak 1\t1000\t{mn}\t1100\t1200\t1300\t1050\t1.22\n"
+        "</MW_Averages>\n<Slice_Table>\nPeak 1\n" + rows + "</Slice_Table>\n",
+        encoding="ascii",
+    )
+
+
+class MwStatisticsTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp_path = Path(self._tmp.name)
+        self.datapath = self.tmp_path / "data"
+        self.datapath.mkdir()
+        _write_rst(self.datapath / "a.rst", "PS-a", "900")
+        _write_rst(self.datapath / "b.rst", "PS-b", "950")
+        env = patch.dict(os.environ, {"POLYANALYZER_DATA_DIR": str(self.tmp_path / "root")})
+        env.start()
+        self.addCleanup(env.stop)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_rpc_compute_returns_table_without_plotting(self) -> None:
+        with patch.object(mw, "configure_plotting") as plotting, patch.object(api, "send_notification"):
+            response = api._handle_request({
+                "jsonrpc": "2.0",
+                "method": "mw.compute",
+                "params": {
+                    "datadir": str(self.datapath),
+                    "selected_files": ["a.rst", "b.rst", "a.rst"],
+                    "segmentpos": [50000, 0, 5000],
+                    "jobs": 1,
+                },
+                "id": 1,
+            })
+
+        plotting.assert_not_called()
+        result = response["result"]
+        self.assertEqual([0, 5000, 50000], result["boundaries"])
+        self.assertEqual(["0-5000", "5000-50000"], result["segments"])
+        self.assertEqual(["PS-a", "PS-b", "PS-a"], [row["sample"] for row in result["rows"]])
+        self.assertEqual(["900", "950"], [row["Mn"] for row in result["rows"][:2]])
+        np.testing.assert_allclose([20.0, 80.0], result["rows"][0]["percentages"])
+        self.assertEqual([], result["errors"])
+        self.assertFalse((self.tmp_path / "Mw_output").exists())
+
+    def test_sample_with_incomplete_mw_data_is_reported(self) -> None:
+        _write_rst(self.datapath / "c.rst", "PS-c", "990")
+        path = self.datapath / "c.rst"
+        path.write_text(
+            path.read_text(encoding="ascii").replace(
+                "Peak 1\t1000\t990\t1100\t1200\t1300\t1050\t1.22\n", "Peak 1\t1000\t990\n"
+            ),
+            encoding="ascii",
+        )
+        with patch.object(api, "send_notification"):
+            response = api._handle_request({
+                "jsonrpc": "2.0",
+                "method": "mw.compute",
+                "params": {
+                    "datadir": str(self.datapath),
+                    "selected_files": ["a.rst", "c.rst"],
+                    "segmentpos": [0, 5000, 50000],
+                    "jobs": 1,
+                },
+                "id": 3,
+            })
+
+        table = response["result"]
+
+        self.assertEqual(["PS-a"], [row["sample"] for row in table["rows"]])
+        self.assertEqual(["c.rst"], [error["file"] for error in table["errors"]])
+        self.assertIn("分子量数据不完整", table["errors"][0]["error"])
+
+    def test_rpc_compute_rejects_invalid_segments(self) -> None:
+        response = api._handle_request({
+            "jsonrpc": "2.0",
+            "method": "mw.compute",
+            "params": {"datadir": str(self.datapath), "selected_files": ["a.rst"], "segmentpos": [1]},
+            "id": 2,
+        })
+        self.assertEqual(api.INVALID_PARAMS, response["error"]["code"])
+
+    def test_cli_stats_only_prints_csv(self) -> None:
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(io.StringIO()):
+            code = cli.main([
+                "mw", "--datadir", str(self.datapath),
+                "--segments", "0,5000,50000", "--stats-only", "--jobs", "1",
+            ])
+
+        self.assertEqual(cli.EXIT_OK, code)
+        self.assertEqual(
+            [
+                "file,sample,peak,Mn,Mw,PDI,0-5000,5000-50000",
+                "a.rst,PS-a,1,900,1100,1.22,20.0000,80.0000",
+                "b.rst,PS-b,1,950,1100,1.22,20.0000,80.0000",
+            ],
+            stdout.getvalue().splitlines(),
+        )
+        self.assertFalse((self.tmp_path / "Mw_output").exists())
+
+    def test_cli_stats_only_json(self) -> None:
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(io.StringIO()):
+            code = cli.main([
+                "mw", "--datadir", str(self.datapath), "--file", "b.rst",
+                "--segments", "0,5000,50000", "--stats-only", "--json",
+            ])
+
+        self.assertEqual(cli.EXIT_OK, code)
+        payload = json.loads(stdout.getvalue())
+        self.assertEqual(["b.rst"], payload["files"])
+        self.assertEqual("PS-b", payload["rows"][0]["sample"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,305 @@
+"""
+Tests for analyzer/parse_cache.py — content-addressed on-disk parse cache.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+
+PYTHON_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PYTHON_DIR))
+
+import sandbox  # noqa: F401  (isolates the data root and log files)
+
+# Keep the legacy import-time logger away from the repository while tests run.
+_IMPORT_TMP = tempfile.TemporaryDirectory()
+_ORIGINAL_CWD = os.getcwd()
+os.chdir(_IMPORT_TMP.name)
+try:
+    from analyzer import dsc, gpc, parse_cache, rst_parser
+    from analyzer.parallel import run_ordered
+    import api
+finally:
+    os.chdir(_ORIGINAL_CWD)
+
+
+def _encode(values):
+    return {"values": values}, {"count": int(values.size)}
+
+
+def _decode(payload):
+    arrays, meta = payload
+    assert meta["count"] == arrays["values"].size
+    return arrays["values"]
+
+
+def _store_in_worker(cache_dir: str, max_bytes: int, path: str) -> int:
+    cache = parse_cache.ParseCache(cache_dir, max_bytes=max_bytes)
+    return cache.load_or_parse("rst", 1, path, lambda name: np.loadtxt(name, ndmin=1), _encode, _decode).size
+
+
+_DSC_TEXT = "\n".join(
+    [
+        "Sig1 Time min",
+        "Sig2 Temperature °C",
+        "Sig3 Heat Flow W/g",
+        "OrgMethod1: Equilibrate at 25.00 °C",
+        "OrgMethod2: Ramp 10.00 °C/min to 200.00 °C",
+        "OrgMethod3: Isothermal for 2.00 min",
+        "OrgMethod4: Mark end of cycle 0",
+        "OrgMethod5: Ramp 10.00 °C/min to 25.00 °C",
+        "OrgMethod6: Mark end of cycle 1",
+        "StartOfData",
+    ]
+    + [f"{0.1 * i:.4f}\t{25 + i:.3f}\t{np.sin(i / 7):.5f}" for i in range(1, 80)]
+    + ["-2\t0\t0"]
+    + [f"{0.1 * i:.4f}\t{200 - i:.3f}\t{np.cos(i / 7):.5f}" for i in range(80, 160)]
+) + "\n"
+
+
+class ParseCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp_path = Path(self._tmp.name)
+        self.cache = parse_cache.ParseCache(str(self.tmp_path / "cache"), max_bytes=1 << 20)
+        self.calls: list = []
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _parse(self, path: str) -> np.ndarray:
+        self.calls.append(path)
+        return np.loadtxt(path, ndmin=1)
+
+    def _load(self, path: Path, kind: str = "rst", version: int = 1) -> np.ndarray:
+        return self.cache.load_or_parse(kind, version, str(path), self._parse, _encode, _decode)
+
+    def test_second_load_skips_parsing_and_content_change_reparses(self) -> None:
+        source = self.tmp_path / "a.txt"
+        source.write_text("1 2 3\n", encoding="ascii")
+
+        first = self._load(source)
+        second = self._load(source)
+        self.assertEqual(1, len(self.calls))
+        np.testing.assert_array_equal(first, second)
+
+        source.write_text("4 5 6 7\n", encoding="ascii")
+        os.utime(source, ns=(1, 1))
+        np.testing.assert_array_equal([4, 5, 6, 7], self._load(source))
+        self.assertEqual(2, len(self.calls))
+
+    def test_entries_are_content_addressed_and_versioned(self) -> None:
+        source = self.tmp_path / "a.txt"
+        source.write_text("1 2 3\n", encoding="ascii")
+        copy = self.tmp_path / "copy" / "b.txt"
+        copy.parent.mkdir()
+        shutil.copy(source, copy)
+
+        self._load(source)
+        self._load(copy)
+        self.assertEqual(1, len(self.calls))
+
+        self._load(source, version=2)
+        self.assertEqual(2, len(self.calls))
+
+    def test_parse_errors_propagate_and_are_not_cached(self) -> None:
+        source = self.tmp_path / "bad.txt"
+        source.write_text("not numbers\n", encoding="ascii")
+
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                self._load(source)
+        self.assertEqual(2, len(self.calls))
+        self.assertEqual(0, self.cache.stats()["entries"])
+
+    def test_least_recently_used_entries_are_evicted_over_cap(self) -> None:
+        paths = []
+        for index in range(3):
+            path = self.tmp_path / f"{index}.txt"
+            path.write_text(" ".join(str(value) for value in range(index, index + 2000)), encoding="ascii")
+            paths.append(path)
+
+        self._load(paths[0])
+        entry_size = self.cache.stats()["total_bytes"]
+        self.cache.max_bytes = entry_size * 2 + entry_size // 2
+        self._load(paths[1])
+        for entry in Path(self.cache.entries_dir).iterdir():
+            os.utime(entry, ns=(10**9, 10**9))
+        # 命中会刷新条目的 LRU 时间，使 paths[1] 成为最久未用的条目
+        self._load(paths[0])
+        self._load(paths[2])
+
+        self.assertEqual(2, self.cache.stats()["entries"])
+        self.calls.clear()
+        self._load(paths[0])
+        self._load(paths[1])
+        self.assertEqual([str(paths[1])], self.calls)
+
+    def test_stores_below_the_cap_do_not_rescan_entries(self) -> None:
+        paths = []
+        for index in range(5):
+            path = self.tmp_path / f"{index}.txt"
+            path.write_text(f"{index} {index + 1}\n", encoding="ascii")
+            paths.append(path)
+
+        with patch.object(
+            parse_cache.ParseCache, "_scan_entries", autospec=True,
+            side_effect=parse_cache.ParseCache._scan_entries,
+        ) as scan:
+            for path in paths:
+                self._load(path)
+        # 只在首次写入时统计一次目录
+        self.assertEqual(1, scan.call_count)
+        self.assertEqual(5, self.cache.stats()["entries"])
+
+    def test_cap_holds_when_pool_workers_store_entries(self) -> None:
+        paths = []
+        for index in range(24):
+            path = self.tmp_path / f"{index}.txt"
+            path.write_text(" ".join(str(value) for value in range(index, index + 2000)), encoding="ascii")
+            paths.append(str(path))
+        self._load(Path(paths[0]))
+        entry_size = self.cache.stats()["total_bytes"]
+        max_bytes = entry_size * 3
+        # 父进程先建立统计，之后的写入全部发生在工作进程中
+        self.cache._usage()
+
+        for start in range(0, len(paths), 4):
+            run_ordered(
+                _store_in_worker,
+                [(self.cache.cache_dir, max_bytes, path) for path in paths[start:start + 4]],
+                workers=2,
+            )
+            # 同一轮内各进程可能同时写入，超出量不超过一轮的条目数
+            self.assertLessEqual(self.cache.stats()["total_bytes"], max_bytes + 4 * entry_size)
+        self.assertNotIn(self.cache.cache_dir, parse_cache._USAGE)
+
+    def test_refs_of_edited_inputs_are_pruned(self) -> None:
+        source = self.tmp_path / "a.txt"
+        for index in range(6):
+            source.write_text(" ".join(str(value) for value in range(index, index + 2000)), encoding="ascii")
+            os.utime(source, ns=(10**9 * (index + 1), 10**9 * (index + 1)))
+            self._load(source)
+            if index == 0:
+                entry_size = self.cache.stats()["total_bytes"]
+                self.cache.max_bytes = entry_size * 2 + entry_size // 2
+        stats = self.cache.stats()
+        self.assertEqual(2, stats["entries"])
+        self.assertEqual(2, stats["refs"])
+
+        # 内容不变、仅修改时间也会留下新的指纹，超过上限时删除最久未用的
+        self.cache.max_refs = 3
+        for index in range(4):
+            os.utime(source, ns=(10**10 + index, 10**10 + index))
+            self._load(source)
+        self.assertLessEqual(self.cache.stats()["refs"], 3)
+        self.calls.clear()
+        self._load(source)
+        self.assertEqual([], self.calls)
+
+    def test_stats_and_purge_by_kind(self) -> None:
+        source = self.tmp_path / "a.txt"
+        source.write_text("1 2 3\n", encoding="ascii")
+        self._load(source, kind="rst")
+        self._load(source, kind="dpt")
+
+        stats = self.cache.stats()
+        self.assertEqual(2, stats["entries"])
+        self.assertEqual({"rst", "dpt"}, set(stats["kinds"]))
+
+        result = self.cache.purge("dpt")
+        self.assertEqual(1, result["removed_entries"])
+        self.assertEqual(["rst"], list(self.cache.stats()["kinds"]))
+
+        self.cache.purge()
+        self.assertEqual(0, self.cache.stats()["entries"])
+        self.assertEqual(0, self.cache.stats()["refs"])
+
+
+class AnalyzerParseCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp_path = Path(self._tmp.name)
+        self.datapath = self.tmp_path / "data"
+        self.datapath.mkdir()
+        env = patch.dict(os.environ, {"POLYANALYZER_DATA_DIR": str(self.tmp_path / "root")})
+        env.start()
+        self.addCleanup(env.stop)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_rst_reruns_reuse_cached_parse(self) -> None:
+        (self.datapath / "s.rst").write_text(
+            "Sample Name\tPS\n<MW_Averages>\nh\nu\n-\nPeak 1\t1\t2\t3\t4\t5\t6\t7\n"
+            "</MW_Averages>\n<Slice_Table>\nPeak 1\n"
+            + "".join(f"{i}\t{i}.5\t1\t2\t3\t4\t5\t6\t\n" for i in range(5))
+            + "</Slice_Table>\n",
+            encoding="ascii",
+        )
+        results = []
+        with patch.object(rst_parser, "parse_rst_file", wraps=rst_parser.parse_rst_file) as parse:
+            for _ in range(2):
+                analyzer = gpc.GPCAnalyzer(str(self.datapath), "out", save_file=False)
+                self.assertTrue(analyzer.read_file("s.rst"))
+                analyzer.preprocess()
+                results.append(analyzer.peak_data["PS"][0])
+        self.assertEqual(1, parse.call_count)
+        np.testing.assert_array_equal(results[0], results[1])
+        self.assertEqual((5, 7), results[1].shape)
+
+    def test_dsc_trim_change_reuses_cached_parse(self) -> None:
+        (self.datapath / "run.txt").write_text(_DSC_TEXT, encoding="utf-8")
+        regions = {}
+        with patch.object(dsc, "parse_dsc_stream", wraps=dsc.parse_dsc_stream) as parse:
+            for left in (1.0, 1.0, 0.5):
+                analyzer = dsc.DSCAnalyzer(str(self.datapath), left_length=left, right_length=0.5)
+                self.assertTrue(analyzer.read_file("run.txt"))
+                analyzer.preprocess()
+                self.assertTrue(analyzer._has_valid_processed_data())
+                regions.setdefault(left, []).append(
+                    (analyzer.region, [segment.shape for segment in analyzer.data_seg])
+                )
+        self.assertEqual(1, parse.call_count)
+        self.assertEqual(regions[1.0][0], regions[1.0][1])
+        self.assertNotEqual(regions[1.0][0][0], regions[0.5][0][0])
+        self.assertEqual({1: "Time/min", 2: "Temperature/°C", 3: "Heat Flow/W/g"}, analyzer.heads)
+
+    def test_disable_env_bypasses_cache(self) -> None:
+        source = self.tmp_path / "a.txt"
+        source.write_text("1 2\n", encoding="ascii")
+        calls = []
+
+        def parse(path):
+            calls.append(path)
+            return np.loadtxt(path)
+
+        with patch.dict(os.environ, {"POLYANALYZER_DISABLE_PARSE_CACHE": "1"}):
+            for _ in range(2):
+                parse_cache.cached_parse("rst", 1, str(source), parse, _encode, _decode)
+        self.assertEqual(2, len(calls))
+        self.assertFalse(os.path.exists(parse_cache.get_parse_cache_dir()))
+
+    def test_rpc_cache_info_and_purge(self) -> None:
+        info = api._handle_request({"jsonrpc": "2.0", "method": "cache.info", "id": 1})
+        self.assertEqual(0, info["result"]["entries"])
+
+        bad = api._handle_request(
+            {"jsonrpc": "2.0", "method": "cache.purge", "params": {"kind": "../x"}, "id": 2}
+        )
+        self.assertEqual(api.INVALID_PARAMS, bad["error"]["code"])
+
+        ok = api._handle_request(
+            {"jsonrpc": "2.0", "method": "cache.purge", "params": {"kind": "dsc"}, "id": 3}
+        )
+        self.assertTrue(ok["result"]["success"])
+
+
+if __name__ == "__main__":
+    unittest.main()
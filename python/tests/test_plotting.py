@@ -0,0 +1,79 @@
+"""
+Tests for line decimation before plotting (analyzer/plotting.py).
+"""
+
+import os
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+
+PYTHON_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PYTHON_DIR))
+
+import sandbox  # noqa: F401  (isolates the data root and log files)
+
+from analyzer import plotting
+
+
+def _trace(n: int = 200_000):
+    x = np.linspace(0.0, 300.0, n)
+    y = np.sin(x / 10.0) + 0.05 * np.random.default_rng(0).standard_normal(n)
+    y[123_457] = 5.0
+    y[98_765] = -4.0
+    return x, y
+
+
+class DecimateLineTests(unittest.TestCase):
+    def test_short_traces_pass_through(self) -> None:
+        x, y = np.arange(100.0), np.arange(100.0) ** 2
+        dx, dy = plotting.decimate_line(x, y, max_points=100)
+        self.assertIs(x, dx)
+        self.assertIs(y, dy)
+
+        with patch.dict(os.environ, {"POLYANALYZER_PLOT_MAX_POINTS": "0"}):
+            x, y = _trace()
+            self.assertIs(y, plotting.decimate_line(x, y)[1])
+
+    def test_minmax_keeps_extrema_and_endpoints(self) -> None:
+        x, y = _trace()
+        dx, dy = plotting.decimate_line(x, y, max_points=4000)
+
+        self.assertLessEqual(len(dy), 4000)
+        self.assertEqual((x[0], x[-1]), (dx[0], dx[-1]))
+        self.assertEqual((y.min(), y.max()), (dy.min(), dy.max()))
+        self.assertTrue(np.all(np.diff(dx) > 0))
+        # 每个像素列内的包络与原始曲线一致
+        columns = np.linspace(0.0, 300.0, 1001)
+        for lo, hi in zip(columns[:-1:97], columns[1::97]):
+            full = y[(x >= lo) & (x < hi)]
+            kept = dy[(dx >= lo) & (dx < hi)]
+            self.assertAlmostEqual(full.max(), kept.max(), delta=0.15)
+            self.assertAlmostEqual(full.min(), kept.min(), delta=0.15)
+
+    def test_nan_gaps_are_preserved(self) -> None:
+        x, y = _trace()
+        y[50_000:60_000] = np.nan
+        dx, dy = plotting.decimate_line(x, y, max_points=4000)
+
+        gaps = np.flatnonzero(np.isnan(dy))
+        self.assertEqual(1, len(gaps))
+        self.assertLess(dx[gaps[0] - 1], x[50_000])
+        self.assertGreater(dx[gaps[0] + 1], x[59_999])
+        self.assertEqual(np.nanmax(y), np.nanmax(dy))
+
+    def test_lttb_returns_requested_size(self) -> None:
+        x, y = _trace()
+        dx, dy = plotting.decimate_line(x, y, max_points=1000, method="lttb")
+
+        self.assertEqual(1000, len(dy))
+        self.assertEqual((x[0], x[-1]), (dx[0], dx[-1]))
+        self.assertIn(5.0, dy)
+        with self.assertRaises(ValueError):
+            plotting.decimate_line(x, y, max_points=1000, method="every-nth")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+"""
+Tests for rate-limited progress notifications (progress.py).
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+PYTHON_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PYTHON_DIR))
+
+import sandbox  # noqa: F401  (isolates the data root and log files)
+
+# Keep the legacy import-time logger away from the repository while tests run.
+_IMPORT_TMP = tempfile.TemporaryDirectory()
+_ORIGINAL_CWD = os.getcwd()
+os.chdir(_IMPORT_TMP.name)
+try:
+    import api
+    import progress
+finally:
+    os.chdir(_ORIGINAL_CWD)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class ProgressEmitterTests(unittest.TestCase):
+    def test_updates_are_coalesced_and_the_final_one_is_always_sent(self) -> None:
+        clock = FakeClock()
+        sent = []
+        emitter = progress.ProgressEmitter(
+            lambda value, message, _stats: sent.append((value, message)),
+            max_rate=20, clock=clock,
+        )
+        for step in range(10):
+            clock.now += 0.001
+            emitter.update(step / 100, f"step {step}")
+        self.assertEqual([(0.0, "step 0")], sent)
+
+        # 间隔内被挡下的更新只保留最新一条
+        emitter.flush()
+        self.assertEqual((0.09, "step 9"), sent[-1])
+        emitter.flush()
+        self.assertEqual(2, len(sent))
+
+        clock.now += 0.06
+        emitter.update(0.5, "half")
+        clock.now += 0.001
+        emitter.update(1.0, "done")
+        self.assertEqual([(0.5, "half"), (1.0, "done")], sent[2:])
+
+    def test_held_back_update_is_delivered_after_the_interval(self) -> None:
+        delivered = threading.Event()
+        sent = []
+
+        def send(value, message, _stats):
+            sent.append(message)
+            if message == "latest":
+                delivered.set()
+
+        emitter = progress.ProgressEmitter(send, max_rate=20)
+        emitter.update(0.1, "first")
+        emitter.update(0.2, "dropped")
+        emitter.update(0.3, "latest")
+        self.assertTrue(delivered.wait(2))
+        self.assertEqual(["first", "latest"], sent)
+
+    def test_throughput_and_eta(self) -> None:
+        with tempfile.TemporaryDirectory() as datadir:
+            for name, size in (("a.txt", 300), ("b.txt", 100)):
+                Path(datadir, name).write_bytes(b"x" * size)
+            clock = FakeClock()
+            stats = []
+            emitter = progress.ProgressEmitter(
+                lambda _value, _message, values: stats.append(values),
+                max_rate=0, datadir=datadir, files_total=4, clock=clock,
+            )
+            clock.now += 2.0
+            emitter.file_done("a.txt")
+            emitter.file_done("b.txt")
+            emitter.file_done("missing.txt")
+            emitter.update(0.25, "quarter")
+            emitter.update(1.0, "done")
+
+        self.assertEqual(
+            {
+                "elapsed": 2.0,
+                "files_done": 3,
+                "files_total": 4,
+                "files_per_second": 1.5,
+                "bytes_per_second": 200.0,
+                "eta_seconds": 6.0,
+            },
+            stats[0],
+        )
+        self.assertEqual(0.0, stats[1]["eta_seconds"])
+
+    def test_rate_is_read_from_the_environment(self) -> None:
+        for raw, expected in (("5", 5.0), ("0", 0.0), ("fast", 20.0), ("-1", 20.0)):
+            with patch.dict(os.environ, {"POLYANALYZER_PROGRESS_HZ": raw}):
+                self.assertEqual(expected, progress.max_rate_from_env(), raw)
+
+    def test_busy_request_sends_few_notifications(self) -> None:
+        def handler(params):
+            callback = api._make_progress_callback(params, "dsc")
+            on_file = api._make_file_callback(params, "dsc")
+            for index in range(2000):
+                on_file({"file": f"{index}.txt", "success": True, "error": None})
+                callback(index / 2000, f"file {index}")
+            callback(1.0, "complete")
+            return {"ok": True}
+
+        notifications = []
+        with patch.dict(api.METHOD_TABLE, {"test.progress": handler}), \
+                patch.object(api, "send_notification", side_effect=lambda _m, params: notifications.append(params)):
+            response = api._handle_request({
+                "jsonrpc": "2.0", "method": "test.progress", "params": {}, "id": 7,
+            })
+
+        self.assertEqual({"ok": True}, response["result"])
+        self.assertLess(len(notifications), 50)
+        self.assertEqual((1.0, "complete"), (notifications[-1]["progress"], notifications[-1]["message"]))
+        self.assertEqual(2000, notifications[-1]["files_done"])
+        self.assertEqual(7, notifications[-1]["request_id"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+"""
+Tests for analyzer/rst_parser.py — single-pass parsing of GPC ``.rst`` exports.
+
+The expected values mirror the historical line-list implementation: marker
+positions count stripped non-empty lines, the first collected row of every
+peak is treated as a header (the ``Peak 1`` label for the first peak, the
+first data row for later peaks), ``RT`` and ``-2`` rows are skipped and the
+trailing field of every row is dropped (an 8-value row yields 7 columns).
+"""
+
+import io
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+
+PYTHON_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PYTHON_DIR))
+
+import sandbox  # noqa: F401  (isolates the data root and log files)
+
+# Keep the legacy import-time logger away from the repository while tests run.
+_IMPORT_TMP = tempfile.TemporaryDirectory()
+_ORIGINAL_CWD = os.getcwd()
+os.chdir(_IMPORT_TMP.name)
+try:
+    from analyzer import gpc, rst_parser
+finally:
+    os.chdir(_ORIGINAL_CWD)
+
+
+def _peak_rows(count: int, columns: int = 8, offset: float = 0.0) -> list:
+    return [
+        "\t".join(f"{offset + row + col / 10:g}" for col in range(columns)) + "\t"
+        for row in range(count)
+    ]
+
+
+def _make_rst(peaks: list, sample: str = "PS-1") -> str:
+    lines = [
+        "Result File",
+        f"Sample Name\t{sample}",
+        "",
+        "<MW_Averages>",
+        "Peak\tMp\tMn\tMw\tMz\tMz+1\tMv\tPD",
+        "\t(g/mol)",
+        "---",
+    ]
+    for index in range(len(peaks)):
+        lines.append(f"Peak {index + 1}\t1000\t900\t1100\t1200\t1300\t1050\t1.22")
+    lines += ["</MW_Averages>", "<Slice_Table>"]
+    for index, rows in enumerate(peaks):
+        lines.append(f"Peak {index + 1}")  # 峰标签行，解析时作为表头丢弃
+        lines.append("RT\tVol\tNorm Ht\tCum\tMW\tlogMW\tdw/dlogM\t")
+        lines += rows
+    lines += ["</Slice_Table>", "End"]
+    return "\n".join("  " + line if line else line for line in lines) + "\n"
+
+
+class RstParserTests(unittest.TestCase):
+    def test_markers_mw_rows_and_peak_arrays(self) -> None:
+        first = _peak_rows(5)
+        first.insert(2, "-2\t0\t0\t0\t0\t0\t0\t0\t")
+        text = _make_rst([first, _peak_rows(3, offset=100.0)])
+
+        data = rst_parser.parse_rst_stream(io.StringIO(text))
+
+        self.assertEqual("PS-1", data.sample_name)
+        self.assertEqual((2, 8, 9), (data.mw_start, data.mw_end, data.slice_table_start))
+        self.assertEqual(
+            [["PS-1", "1000", "900", "1100", "1200", "1300", "1050", "1.22"],
+             ["PS-1", "1000", "900", "1100", "1200", "1300", "1050", "1.22"]],
+            data.mw_rows(),
+        )
+        self.assertEqual([], data.peak_errors)
+        self.assertEqual([(5, 7), (2, 7)], [peak.shape for peak in data.peaks])
+        self.assertEqual(np.float64, data.peaks[0].dtype)
+        np.testing.assert_array_equal([0.0, 0.1, 0.2], data.peaks[0][0, :3])
+        np.testing.assert_array_equal([102.0, 102.6], data.peaks[1][1, [0, 6]])
+
+    def test_inconsistent_or_non_numeric_peaks_are_reported(self) -> None:
+        ragged = _peak_rows(3) + ["1\t2\t"]
+        text_peak = _peak_rows(2) + ["1\tabc\t3\t4\t5\t6\t7\t8\t"]
+        text = _make_rst([ragged, text_peak, _peak_rows(3)])
+
+        data = rst_parser.parse_rst_stream(io.StringIO(text))
+
+        self.assertEqual(2, len(data.peak_errors))
+        self.assertEqual([(2, 7)], [peak.shape for peak in data.peaks])
+
+    def test_chunked_conversion_matches_single_chunk(self) -> None:
+        text = _make_rst([_peak_rows(25), _peak_rows(7, offset=3.0)])
+        expected = rst_parser.parse_rst_stream(io.StringIO(text))
+
+        with patch.object(rst_parser, "_CHUNK_ROWS", 4):
+            chunked = rst_parser.parse_rst_stream(io.StringIO(text))
+
+        self.assertEqual(len(expected.peaks), len(chunked.peaks))
+        for left, right in zip(expected.peaks, chunked.peaks):
+            np.testing.assert_array_equal(left, right)
+
+    def test_gpc_analyzer_reads_rst_through_parser(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            datapath = Path(tmp, "data")
+            datapath.mkdir()
+            (datapath / "sample.rst").write_text(
+                _make_rst([_peak_rows(6)], sample="PS-7"), encoding="ascii"
+            )
+            analyzer = gpc.GPCAnalyzer(str(datapath), "rst-out", save_file=False)
+
+            self.assertTrue(analyzer.read_file("sample.rst"))
+            analyzer.preprocess()
+
+            self.assertEqual(["PS-7"], list(analyzer.peak_data))
+            self.assertEqual((6, 7), analyzer.peak_data["PS-7"][0].shape)
+            self.assertEqual(1, analyzer.peak_num)
+
+    def test_non_ascii_file_is_rejected(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp, "bad.rst")
+            path.write_bytes("Sample Name\t样品\n".encode("utf-8"))
+
+            with self.assertRaises(UnicodeDecodeError):
+                rst_parser.parse_rst_file(str(path))
+
+
+if __name__ == "__main__":
+    unittest.main()
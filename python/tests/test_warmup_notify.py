@@ -15,15 +15,15 @@ from unittest.mock import patch
 PYTHON_DIR = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(PYTHON_DIR))
 
+import sandbox  # noqa: F401  (isolates the data root and log files)
+
 # Keep the legacy import-time logger away from the repository while tests run.
 _IMPORT_TMP = tempfile.TemporaryDirectory()
 _ORIGINAL_CWD = os.getcwd()
 os.chdir(_IMPORT_TMP.name)
-os.environ["POLYANALYZER_DISABLE_FILE_LOG"] = "1"
 try:
     import main
 finally:
-    os.environ.pop("POLYANALYZER_DISABLE_FILE_LOG", None)
     os.chdir(_ORIGINAL_CWD)
 
 
@@ -33,6 +33,11 @@ interface ProgressParams {
   progress: number;
   message: string;
   warmup?: boolean;
+  files_done?: number;
+  files_total?: number | null;
+  files_per_second?: number | null;
+  bytes_per_second?: number | null;
+  eta_seconds?: number | null;
 }
 
 export interface ProgressInfo {
@@ -40,6 +45,11 @@ export interface ProgressInfo {
   requestId?: number;
   progress: number;
   message: string;
+  filesDone?: number;
+  filesTotal?: number | null;
+  filesPerSecond?: number | null;
+  bytesPerSecond?: number | null;
+  etaSeconds?: number | null;
 }
 
 /** Sidecar engine warmup state shown as a global banner. */
@@ -58,6 +68,9 @@ type SidecarChild = Awaited<ReturnType<Command<string>["spawn"]>>;
 const progressListeners = new Map<BridgeAnalyzer, Set<(progress: ProgressInfo) => void>>();
 const engineStatusListeners = new Set<(status: EngineStatus) => void>();
 const pendingRequests = new Map<number, PendingRequest>();
+// Timed-out analyses that were asked to stop, with the grace timer that
+// restarts the sidecar if the cancelled request never answers.
+const cancellingRequests = new Map<number, ReturnType<typeof setTimeout>>();
 
 let sidecarChild: SidecarChild | null = null;
 let spawnPromise: Promise<void> | null = null;
@@ -70,6 +83,7 @@ const lastProgressSnapshots = new Map<BridgeAnalyzer, ProgressInfo>();
 
 const SHORT_REQUEST_TIMEOUT_MS = 30_000;
 const ANALYZE_REQUEST_TIMEOUT_MS = 5 * 60_000;
+const CANCEL_GRACE_MS = 10_000;
 
 function emitProgress(analyzer: BridgeAnalyzer, progress: ProgressInfo) {
   lastProgressSnapshots.set(analyzer, progress);
@@ -87,6 +101,8 @@ function rejectPending(reason: Error) {
     pending.reject(reason);
   });
   pendingRequests.clear();
+  cancellingRequests.forEach((timer) => clearTimeout(timer));
+  cancellingRequests.clear();
 }
 
 function clearSidecarState(generation: number, reason: Error) {
@@ -161,10 +177,23 @@ function processLine(line: string) {
       requestId: matchedRequestId,
       progress: params.progress ?? 0,
       message: params.message ?? "",
+      filesDone: params.files_done,
+      filesTotal: params.files_total,
+      filesPerSecond: params.files_per_second,
+      bytesPerSecond: params.bytes_per_second,
+      etaSeconds: params.eta_seconds,
     });
     return;
   }
 
+  const cancelling = cancellingRequests.get(msg.id);
+  if (cancelling !== undefined) {
+    // The sidecar stopped the timed-out request; it stays usable.
+    clearTimeout(cancelling);
+    cancellingRequests.delete(msg.id);
+    return;
+  }
+
   const pending = pendingRequests.get(msg.id);
   if (!pending) return;
   pendingRequests.delete(msg.id);
@@ -260,7 +289,23 @@ async function performJsonRpcRequest<M extends RpcMethod>(
       pendingRequests.delete(id);
       const error = new Error(`${method} timed out after ${Math.round(timeoutMs / 1000)}s`);
       pending.reject(error);
-      void resetSidecar(error);
+      if (!method.endsWith(".analyze") || !sidecarChild) {
+        void resetSidecar(error);
+        return;
+      }
+      // Ask the sidecar to stop the analysis (it discards the partial output);
+      // restart it only if the request does not wind down in time.
+      cancellingRequests.set(
+        id,
+        setTimeout(() => {
+          cancellingRequests.delete(id);
+          void resetSidecar(error);
+        }, CANCEL_GRACE_MS),
+      );
+      const cancel = { jsonrpc: "2.0", method: "$/cancelRequest", params: { id } };
+      sidecarChild.write(JSON.stringify(cancel) + "\n").catch(() => {
+        void resetSidecar(error);
+      });
     }, timeoutMs);
 
     pendingRequests.set(id, {
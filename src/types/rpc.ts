@@ -20,6 +20,37 @@ interface AnalyzeResult {
   success: boolean;
 }
 
+export type JobMethod =
+  | "gpc.analyze"
+  | "mw.analyze"
+  | "mw.compute"
+  | "dsc.analyze"
+  | "ir.analyze"
+  | "ir.search"
+  | "system.clean_output";
+
+export type JobState = "queued" | "running" | "succeeded" | "failed" | "cancelled" | "interrupted";
+
+export interface JobStatus {
+  id: string;
+  method: JobMethod;
+  state: JobState;
+  progress: number;
+  message: string;
+  created_at: number;
+  started_at: number | null;
+  finished_at: number | null;
+  files: number;
+  error: { code?: number; message: string; data?: unknown } | null;
+}
+
+export interface JobFileResult {
+  file: string;
+  success: boolean;
+  error: string | null;
+  [detail: string]: unknown;
+}
+
 export interface RpcContract {
   "system.get_default_datapath": {
     params: Record<string, never>;
@@ -33,6 +64,64 @@ export interface RpcContract {
     params: { datadir: string; confirm: true };
     result: { success: boolean; cleaned: string[] };
   };
+  "system.cache_stats": {
+    params: Record<string, never>;
+    result: {
+      enabled: boolean;
+      entries: number;
+      bytes: number;
+      max_bytes: number;
+      hits: number;
+      misses: number;
+      evictions: number;
+    };
+  };
+  "cache.info": {
+    params: Record<string, never>;
+    result: {
+      cache_dir: string;
+      enabled: boolean;
+      max_bytes: number;
+      entries: number;
+      total_bytes: number;
+      refs: number;
+      kinds: Record<string, { entries: number; bytes: number }>;
+    };
+  };
+  "cache.purge": {
+    params: { kind?: "rst" | "gpc_excel" | "dsc" | "dpt" };
+    result: { success: boolean; removed_entries: number; freed_bytes: number };
+  };
+  "$/cancelRequest": {
+    params: { id: number | string };
+    result: { cancelled: boolean };
+  };
+  "job.submit": {
+    params: { method: JobMethod; params?: Record<string, unknown> };
+    result: JobStatus;
+  };
+  "job.status": {
+    params: { id: string };
+    result: JobStatus;
+  };
+  "job.list": {
+    params: { state?: JobState };
+    result: { jobs: JobStatus[] };
+  };
+  "job.cancel": {
+    params: { id: string };
+    result: { cancelled: boolean };
+  };
+  "job.result": {
+    params: { id: string; since?: number };
+    result: {
+      job: JobStatus;
+      files: JobFileResult[];
+      next: number;
+      result: unknown;
+      artifacts: { path: string; exists: boolean }[];
+    };
+  };
   "settings.list": {
     params: { type: "mw" | "dsc" | "ir" };
     result: { settings: string[] };
@@ -66,6 +155,7 @@ export interface RpcContract {
       save_picture: boolean;
       save_figure_file_gpc: boolean;
       confirm_overwrite: boolean;
+      jobs?: number;
     };
     result: AnalyzeResult & { output_dir: string };
   };
@@ -81,14 +171,41 @@ export interface RpcContract {
       draw_bar: boolean;
       draw_mw: boolean;
       draw_table: boolean;
+      jobs?: number;
+      incremental?: boolean;
     };
     result: AnalyzeResult & { output_dir: string };
   };
+  "mw.compute": {
+    params: {
+      datadir: string;
+      selected_files: string[];
+      segmentpos?: number[];
+      setting_name?: string;
+      jobs?: number;
+    };
+    result: {
+      success: boolean;
+      boundaries: number[];
+      segments: string[];
+      rows: Array<{
+        file: string;
+        sample: string;
+        peak: number;
+        Mn: string;
+        Mw: string;
+        PDI: string;
+        percentages: number[];
+      }>;
+      errors: Array<{ file: string; error: string }>;
+    };
+  };
   "dsc.analyze": {
     params: PlotStyleParams & {
       datadir: string;
       selected_files: string[];
       save_seg_mode: boolean;
+      segment_format?: "csv" | "npy" | "both";
       draw_seg_mode: boolean;
       draw_cycle: boolean;
       save_cycle_pic: boolean;
@@ -97,6 +214,7 @@ export interface RpcContract {
       left_length: number;
       right_length: number;
       curve_color: string;
+      jobs?: number;
     };
     result: AnalyzeResult & { cycle_dir: string; pic_dir: string };
   };
@@ -108,6 +226,7 @@ export interface RpcContract {
       draw_overlay: boolean;
       normalize_overlay: boolean;
       normalization_peak: number;
+      save_matrix?: boolean;
     };
     result: AnalyzeResult & {
       output_dir: string;
@@ -115,6 +234,28 @@ export interface RpcContract {
       processed_count: number;
     };
   };
+  "ir.search": {
+    params: {
+      datadir: string;
+      query: string;
+      top_k?: number;
+      metric?: "correlation" | "cosine";
+      normalization_peak?: number;
+      refresh?: boolean;
+      jobs?: number;
+    };
+    result: {
+      success: boolean;
+      index: {
+        path: string;
+        entries: number;
+        added: number;
+        removed: number;
+        skipped: Record<string, string>;
+      };
+      matches: { file: string; score: number }[];
+    };
+  };
 }
 
 export type RpcMethod = keyof RpcContract;